@@ -29,6 +29,10 @@ DOCUMENTATION
     The idea is to highlight members that exist across all supported binding,
     and guarantee that code that runs on one binding runs on all others.
 
+    With QT_LAZY=1 submodules are only imported on first use, e.g.
+    QtNetwork or QtSql are never imported by an application that
+    doesn't touch them.
+
     For more details, visit https://github.com/mottosso/Qt.py
 
 LICENSE
@@ -52,6 +56,7 @@ __all__ = []
 QT_VERBOSE = bool(os.getenv("QT_VERBOSE"))
 QT_PREFERRED_BINDING = os.getenv("QT_PREFERRED_BINDING", "")
 QT_SIP_API_HINT = os.getenv("QT_SIP_API_HINT")
+QT_LAZY = bool(os.getenv("QT_LAZY"))
 
 # Reference to Qt.py
 Qt = sys.modules[__name__]
@@ -665,12 +670,75 @@ def _new_module(name):
     return types.ModuleType(__name__ + "." + name)
 
 
+class _LazyModule(types.ModuleType):
+    """Module filled in by `loader` on first attribute access
+
+    Used by QT_LAZY, such that only the submodules actually
+    used by an application are imported. Dunder lookups made
+    by the import system and introspection don't trigger it.
+
+    """
+
+    def __init__(self, name, loader):
+        super(_LazyModule, self).__init__(name)
+        self.__dict__["_loader"] = loader
+
+    def __getattr__(self, attr):
+        if attr.startswith("__") or "_loader" not in self.__dict__:
+            raise AttributeError("module '%s' has no attribute '%s'"
+                                 % (self.__name__, attr))
+
+        loader = self.__dict__.pop("_loader")
+        _log("Loading %s" % self.__name__)
+        loader(self)
+
+        return getattr(self, attr)
+
+
+def _find_submodule(module, name):
+    """Return whether `module` has submodule `name`, without importing it"""
+
+    try:
+        from importlib.util import find_spec
+    except ImportError:
+        # Python 2
+        import imp
+        try:
+            imp.find_module(name, module.__path__)
+        except ImportError:
+            return False
+        return True
+
+    return find_spec(module.__name__ + "." + name) is not None
+
+
+def _load_submodule(proxy):
+    """Import the original submodule standing behind `proxy`"""
+
+    submodule = importlib.import_module(proxy.__name__)
+    proxy.__dict__.update(submodule.__dict__)
+    setattr(Qt, "_" + proxy.__name__.rsplit(".", 1)[-1], submodule)
+
+
 def _setup(module, extras):
     """Install common submodules"""
 
     Qt.__binding__ = module.__name__
 
     for name in list(_common_members) + extras:
+        if QT_LAZY:
+            if not _find_submodule(module, name):
+                continue
+
+            setattr(Qt, "_" + name, _LazyModule(
+                module.__name__ + "." + name, _load_submodule))
+
+            if name not in extras:
+                setattr(Qt, name, _LazyModule(
+                    __name__ + "." + name, _install_members))
+
+            continue
+
         try:
             # print("Trying %s" % name)
             submodule = importlib.import_module(
@@ -1073,6 +1141,23 @@ def _cli(args):
         sys.stdout.write("Successfully converted \"%s\"\n" % args.convert)
 
 
+def _install_members(our_submodule):
+    """Copy the common members of the original submodule into ours"""
+
+    name = our_submodule.__name__.rsplit(".", 1)[-1]
+    their_submodule = getattr(Qt, "_%s" % name)
+
+    for member in _common_members[name]:
+        # Accept that a submodule may miss certain members.
+        try:
+            their_member = getattr(their_submodule, member)
+        except AttributeError:
+            _log("'%s.%s' was missing." % (name, member))
+            continue
+
+        setattr(our_submodule, member, their_member)
+
+
 def _install():
     # Default order (customise order and content via QT_PREFERRED_BINDING)
     default_order = ("PySide2", "PyQt5", "PySide", "PyQt4")
@@ -1115,10 +1200,8 @@ def _install():
         raise ImportError("No Qt binding were found.")
 
     # Install individual members
-    for name, members in _common_members.items():
-        try:
-            their_submodule = getattr(Qt, "_%s" % name)
-        except AttributeError:
+    for name in _common_members:
+        if not hasattr(Qt, "_%s" % name):
             continue
 
         our_submodule = getattr(Qt, name)
@@ -1130,15 +1213,9 @@ def _install():
         # e.g. import Qt.QtCore
         sys.modules[__name__ + "." + name] = our_submodule
 
-        for member in members:
-            # Accept that a submodule may miss certain members.
-            try:
-                their_member = getattr(their_submodule, member)
-            except AttributeError:
-                _log("'%s.%s' was missing." % (name, member))
-                continue
-
-            setattr(our_submodule, member, their_member)
+        # With QT_LAZY, members are installed on first access
+        if not isinstance(our_submodule, _LazyModule):
+            _install_members(our_submodule)
 
     # Backwards compatibility
     Qt.QtCompat.load_ui = Qt.QtCompat.loadUi
@@ -15,6 +15,7 @@
 ## Run these commands in python tab (or put them in a shelf:
 ## import assetLibrary
 ## assetLibrary.AssetLibraryUI().show()
+## Optionally set QT_LAZY=1 in Maya.env for a faster first start, Qt.py then imports only the Qt modules in use
 ##
 ## USAGE:
 ## TABS MENU:
@@ -27,7 +28,14 @@
                 ## At any time the removed library can be added again without any loss.
 
 ## MAIN MENU:
-## - Top search filter can be used to filter assets.
+## - Top search filter can be used to filter assets. It searches all the fields of the assets, not only the names:
+                ## wood          assets having a word starting with "wood" in any field
+                ## tex:oak       field query, assets having a texture file starting with "oak" (see SEARCH_FIELDS)
+                ## tri:<50000    numeric field query, <, <=, >, >=, = or a range like tri:1000..5000
+                ## plank~        fuzzy query, tolerates a typo or two
+                ## All the words of the query must match.
+## - Sort menu next to the search filter sorts the assets by name or by one of the numeric fields (faces, triangles,
+                ## texture count and size, bounding box size, export time).
 ## - Use the Export Import button to import selected asset. This will copy all texture files under the
                 ## sourceimages/<assetname> directory of currently set project
 ## - Use Refresh Button to manually refresh the library.
@@ -44,6 +52,31 @@
 ## - View As List / View As Icons : Toggles between Icon and List View
 ## - Show Folder In Explorer: Opens the asset folder in windows explorer
 
+## LIBRARY SETTINGS:
+## - Optional assetLibrarySettings.json file on the library root holds the options shared by everyone using that library.
+                ## See LIBRARY_DEFAULTS for the available options.
+## - "textureStore": true keeps the textures in a content addressed pool (.textureStore) on the library root. Same texture
+                ## used by many assets is uploaded and stored once.
+## - "previewProfile" sets the preview resolutions and captures of the library: "full", "fast", "minimal" or a dictionary
+                ## like {"base": "fast", "shotSize": 2048, "uvSnapshots": "none"}. See PREVIEW_PROFILES.
+
+## COMMAND LINE:
+## - assetLibraryCore.py works without Maya. "python assetLibraryCore.py scan|reindex|verify|stats|prune <library>"
+                ## for the nightly jobs. See the notes in assetLibraryCore.py
+
+## LOCAL MIRROR:
+## - Right click on a library tab > "Local Mirror..." keeps a local copy of a library on a network share. Json files and
+                ## thumbnails are mirrored after every scan, Maya/Obj files and textures are fetched when they are imported.
+## - Mirrored files are checked against the library by size and mtime before they are used. Least recently used files
+                ## are removed when the mirror grows over its size limit.
+## - Mirror folder and the size limit are personal, kept in the assetLibraryConfig.json next to the script.
+
+## PERFORMANCE REPORT:
+## - Right click on a library tab > "Performance Report..." shows the time spent in the library operations (scan, json,
+                ## copies, exports, playblasts, uv snapshots, thumbnails) with the moved bytes and item counts. Profiling
+                ## is enabled from there or with ASSETLIBRARY_PROFILE=1 in Maya.env. Timings can be exported as a Chrome
+                ## trace to compare sessions, ex. before and after a change on the file server.
+
 ## SHORTCUTS:
 ## - CTRL+i will import the file. Same action with the "import" button
 ## - CTRL+e will export selection. Same action with the "export" button
@@ -65,14 +98,29 @@
 
 import pymel.core as pm
 import json
-import os, fnmatch
+import collections
+import contextlib
+import threading
+import bisect
+import time
+import tempfile
+import shutil
+import uuid
+try:
+    import Queue as queue
+except ImportError:
+    import queue
+import os
 import pprint
-from shutil import copyfile
 import Qt
 import logging
 from Qt import QtWidgets, QtCore, QtGui
 from maya import OpenMayaUI as omui
 
+## file system side of the library, works without Maya (see assetLibraryCore.py for the command line tools)
+from assetLibraryCore import (libraryCore, assetRecord, catalogIndex, searchIndex, copyEngine, parallelMap, replaceFile, hashFile,
+                              textureBlobKey, numericFields, CATALOG_FILE, TEXTURE_STORE_FOLDER, SCAN_THREADS,
+                              COPY_THREADS, MIRROR_SIZE_LIMIT, NUMERIC_FIELDS, PROFILER, span, profiled)
 
 
 logging.basicConfig()
@@ -93,29 +141,41 @@ else:
     from Qt.QtCore import Signal
 
 DIRECTORY = os.path.normpath("M:\Projects\_AssetLibrary")
-
-
-def find(pattern, path):
-    result = []
-    for root, dirs, files in os.walk(path):
-        for name in files:
-            if fnmatch.fnmatch(name, pattern):
-                result.append(os.path.join(root, name))
-    return result
-
-
-class assetLibrary(dict):
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assetLibraryConfig.json") # Libraries of the user
+ATLAS_FILE = "assetLibraryThumbs" # Thumbnail atlas on the library root, <name>.json index and <name>_<page>_<id>.png pages
+ATLAS_VERSION = 2 # Atlases of other versions are rebuilt
+ATLAS_LOCK_TIMEOUT = 300 # Seconds after which the lock of an atlas writer which did not finish is taken over
+ATLAS_CELL = 128 # Size of a thumbnail in the atlas
+ATLAS_COLUMNS = 32 # Cells per row and per column of an atlas page
+THUMBNAIL_CACHE_LIMIT = 256 * 1024 * 1024 # Memory cap of the decoded thumbnails in bytes, shared by all tabs
+THUMBNAIL_THREADS = 4
+WATCH_POLL_INTERVAL = 15000 # Milliseconds between the polls of the library watcher
+WATCH_FOLDER_LIMIT = 500 # Above this many assets only the library root is watched, asset folders are polled
+STREAM_TIME_SLICE = 15 # Milliseconds the UI spends on adding the streamed assets per event loop cycle
+
+## Preview capture settings. Thumbnails are always downscaled from the screenshot instead of a separate playblast
+## uvSnapshots: "perShape" one snapshot for each shape, "perUvSet" one snapshot for all shapes per uv set, "none"
+PREVIEW_PROFILES = {
+    "full": {"thumbSize": 200, "shotSize": 1600, "wireframe": True, "uvSnapshots": "perShape", "uvSize": 1600},
+    "fast": {"thumbSize": 200, "shotSize": 1024, "wireframe": True, "uvSnapshots": "perUvSet", "uvSize": 1024},
+    "minimal": {"thumbSize": 200, "shotSize": 800, "wireframe": False, "uvSnapshots": "none", "uvSize": 1024},
+}
+
+class assetLibrary(libraryCore):
     """
     Asset Library Logical operations Class. This Class holds the main functions (save,import,scan)
+    Scanning, indexes and the file operations are inherited from the libraryCore, Maya parts are here.
+    Assets are kept as compact assetRecords, fields like textureFiles are read from the json file when they are used.
     """
+    compactRecords = True
 
     ##### TEMPORARY #####
     # assetName = "test"
 
-    def __init__(self, directory):
-        self.directory=directory
-        if not os.path.exists(directory):
-            logger.error("Cannot reach the library directory: \n" + directory)
+    def __init__(self, directory, mirror=None, mirrorLimit=MIRROR_SIZE_LIMIT):
+        super(assetLibrary, self).__init__(directory, mirror=mirror, mirrorLimit=mirrorLimit)
+        ## {shading engine: file nodes} while saving an asset
+        self.historyCache = None
 
     def saveAsset(self, assetName, screenshot=True, moveCenter=False, **info):
         """
@@ -130,6 +190,30 @@ class assetLibrary(dict):
         Returns:
             None
 
+        """
+        job = self.captureAsset(assetName, screenshot=screenshot, moveCenter=moveCenter, restoreTextures=False, **info)
+        if job is None:
+            return
+        self.finalizeAsset(job)
+        self.updateFolders([assetName])
+
+    @profiled("export.capture")
+    def captureAsset(self, assetName, screenshot=True, moveCenter=False, restoreTextures=True, **info):
+        """
+        First stage of saving an asset, the part which needs the Maya scene. Exports and preview images are written
+        into a local temporary folder, textures are only listed. finalizeAsset() does the rest and can run on
+        another thread.
+        Args:
+            assetName: (Unicode) Asset will be saved as with this name
+            screenshot: (Bool) If true, screenshots (Screenshot, Thumbnail, Wireframe, UV Snapshots) will be taken with playblast. Default True
+            moveCenter: (Bool) If True, selected object(s) will be moved to World 0 point. Pivot will be the center of selection. Default False
+            restoreTextures: (Bool) If True, file nodes of the scene are pointed back to their original textures after
+                the export. Otherwise they are left pointing to the library copies. Default True
+            **info: (Any) Extra information which will be hold in the .json file
+
+        Returns:
+            (Dictionary) Export job for finalizeAsset() or None if there is nothing to export
+
         """
         logger.info("Saving the asset")
         originalPath = pm.sceneName()
@@ -147,113 +231,113 @@ class assetLibrary(dict):
         selection = pm.ls(sl=True, type="transform")
         if len(selection) == 0:
             pm.warning("No object selected, nothing to do")
-            return
-
-        if not os.path.exists(assetDirectory):
-            os.mkdir(assetDirectory)
-
-        possibleFileHolders = pm.listRelatives(selection, ad=True, type=["mesh", "nurbsSurface"])
-
-        allFileTextures = []
-        for obj in possibleFileHolders:
-            fileNodes = self.findFileNodes(obj)
-            fileTextures = self.filePass(fileNodes, assetDirectory)
-            allFileTextures += fileTextures
-
-        allFileTextures = self.makeUnique(allFileTextures)
-
-        if moveCenter:
-            pm.select(selection)
-            slGrp = pm.group(name=assetName)
-
-            pm.xform(slGrp, cp=True)
-
-            tempLoc = pm.spaceLocator()
-            tempPo = pm.pointConstraint(tempLoc, slGrp)
-            pm.delete(tempPo)
-            pm.delete(tempLoc)
-
-        thumbPath, ssPath, swPath = self.previewSaver(assetName, assetDirectory)
-
-        pm.select(selection)
-        objName = pm.exportSelected(os.path.join(assetDirectory, assetName), type="OBJexport", force=True,
-                                    options="groups=1;ptgroups=1;materials=1;smoothing=1;normals=1", pr=True, es=True)
-        maName = pm.exportSelected(os.path.join(assetDirectory, assetName), type="mayaAscii")
-
-        # selection for poly evaluate
-        pm.select(possibleFileHolders)
-        polyCount = pm.polyEvaluate(f=True)
-        tiangleCount = pm.polyEvaluate(t=True)
-
-        ## Json stuff
-
-        info['assetName'] = assetName
-        info['objPath'] = self.pathOps(objName, "basename")
-        info['maPath'] = self.pathOps(maName, "basename")
-        info['thumbPath'] = self.pathOps(thumbPath, "basename")
-        info['ssPath'] = self.pathOps(ssPath, "basename")
-        info['swPath'] = self.pathOps(swPath, "basename")
-        info['textureFiles'] = allFileTextures
-        info['Faces/Trianges'] = ("%s/%s" % (str(polyCount), str(tiangleCount)))
-        info['sourceProject'] = originalPath
+            return None
 
-        # query the number of faces
-        pm.polyEvaluate(f=True)
-        # Result: 16
-
-        # query the number of triangles
-        pm.polyEvaluate(t=True)
-
-        propFile = os.path.join(assetDirectory, "%s.json" % assetName)
-
-        with open(propFile, "w") as f:
-            json.dump(info, f, indent=4)
+        localDirectory = tempfile.mkdtemp(prefix="assetLibrary_%s_" % assetName)
+        # the local folder is handed over with the job, it is removed here if the capture fails
+        try:
+            possibleFileHolders = pm.listRelatives(selection, ad=True, type=["mesh", "nurbsSurface"])
 
-        self[assetName] = info
+            ## shading networks are traversed once per save
+            self.historyCache = {}
+            try:
+                allFileNodes = self.findAllFileNodes(possibleFileHolders)
+            finally:
+                self.historyCache = None
+
+            ## textures are transferred by finalizeAsset, the file nodes are pointed to their final location for the exports
+            renames = []
+            if self.options["textureStore"]:
+                textureBlobs, transfers, renames, targets = self.planStoreTextures(allFileNodes)
+                allFileTextures = sorted(textureBlobs)
+                info['textureBlobs'] = textureBlobs
+            else:
+                allFileTextures, transfers, targets = self.planFileTextures(allFileNodes, assetDirectory)
+                allFileTextures = self.makeUnique(allFileTextures)
+            textureBytes = 0
+            for path in set(os.path.normpath(pm.getAttr(file.fileTextureName)) for file in allFileNodes):
+                try:
+                    textureBytes += os.path.getsize(path)
+                except OSError:
+                    # udim/sequence patterns or missing files
+                    pass
+
+            if moveCenter:
+                pm.select(selection)
+                slGrp = pm.group(name=assetName)
+
+                pm.xform(slGrp, cp=True)
+
+                tempLoc = pm.spaceLocator()
+                tempPo = pm.pointConstraint(tempLoc, slGrp)
+                pm.delete(tempPo)
+                pm.delete(tempLoc)
+
+            boundingBox = pm.exactWorldBoundingBox(selection)
+
+            # previews are captured with the original textures, the library copies are not there yet
+            thumbPath, ssPath, swPath = self.previewSaver(assetName, localDirectory)
+
+            originalTextures = [(file, pm.getAttr(file.fileTextureName)) for file in targets]
+            for file, target in targets.items():
+                pm.setAttr(file.fileTextureName, target)
+            exported = False
+            try:
+                pm.select(selection)
+                with span("export.obj"):
+                    objName = pm.exportSelected(os.path.join(localDirectory, assetName), type="OBJexport", force=True,
+                                                options="groups=1;ptgroups=1;materials=1;smoothing=1;normals=1", pr=True,
+                                                es=True)
+                with span("export.ma"):
+                    maName = pm.exportSelected(os.path.join(localDirectory, assetName), type="mayaAscii")
+                exported = True
+            finally:
+                if restoreTextures or not exported:
+                    for file, original in originalTextures:
+                        pm.setAttr(file.fileTextureName, original)
+
+            # selection for poly evaluate
+            pm.select(possibleFileHolders)
+            polyCount = pm.polyEvaluate(f=True)
+            tiangleCount = pm.polyEvaluate(t=True)
+
+            ## Json stuff
+
+            info['assetName'] = assetName
+            info['objPath'] = self.pathOps(objName, "basename")
+            info['maPath'] = self.pathOps(maName, "basename")
+            info['thumbPath'] = self.pathOps(thumbPath, "basename")
+            info['ssPath'] = self.pathOps(ssPath, "basename")
+            info['swPath'] = self.pathOps(swPath, "basename") if swPath else None
+            info['textureFiles'] = allFileTextures
+            info['sourceProject'] = originalPath
+            ## typed numeric fields, see NUMERIC_FIELDS
+            info['faces'] = int(polyCount)
+            info['triangles'] = int(tiangleCount)
+            info['textureCount'] = len(allFileTextures)
+            info['textureBytes'] = textureBytes
+            info['boundingBox'] = [round(boundingBox[i + 3] - boundingBox[i], 4) for i in range(3)]
+            info['boundingBoxSize'] = max(info['boundingBox'])
+            info['exportTime'] = int(time.time())
+        except:
+            shutil.rmtree(localDirectory, ignore_errors=True)
+            raise
 
         ## TODO // REVERT BACK
         # if not originalPath == "":
         #     pm.openFile(originalPath, force=True)
         #     os.remove(newScenePath)
 
-    def scan(self):
-        """
-        Scans the directory for .json files, and gather info.
-        Args:
-            directory: (Unicode) Default Library location. Default is predefined outside of this class
-
-        Returns:
-            None
-
-        """
-        if not os.path.exists(self.directory):
-            return
-        self.clear()
-        # first collect all the json files from second level subfolders
-        subDirs = next(os.walk(self.directory))[1]
-
-        # subDirs= (subDirs.sort())
-        allJson = []
-        for d in subDirs:
-            dir = os.path.join(self.directory, d)
-            for file in os.listdir(dir):
-                if file.endswith(".json"):
-                    # assetName, ext = os.path.splitext(file)
-                    file = os.path.join(dir, file)
-                    allJson.append(file)
-                    with open(file, 'r') as f:
-                        # The JSON module will read our file, and convert it to a python dictionary
-                        data = json.load(f)
-                        name = data["assetName"]
-                        self[name] = data
-
-                        # self[assetName] = "HEDE"
-                        # self[assetName] = data
-                        # for j in allJson:
-                        #     with open(infoFile, 'r') as f:
-                        #         # The JSON module will read our file, and convert it to a python dictionary
-                        #         data = json.load(f)
+        return {
+            "assetName": assetName,
+            "assetDirectory": assetDirectory,
+            "localDirectory": localDirectory,
+            "transfers": transfers,
+            "renames": renames,
+            "info": info,
+        }
 
+    @profiled("import")
     def importAsset(self, name, copyTextures, mode="maPath"):
         """
         Imports the selected asset into the current scene
@@ -269,9 +353,15 @@ class assetLibrary(dict):
 
         logger.info("Importing asset")
         path = os.path.join(self.directory, self[name]['assetName'], self[name][mode])
+        paths = [path]
+        if mode == "objPath":
+            # materials of the obj are in the mtl file next to it
+            paths.append(os.path.splitext(path)[0] + ".mtl")
+        path = self.localFiles(paths)[0]
 
         textureList = self[name]['textureFiles']
-        pm.importFile(path)
+        with span("import.file"):
+            newNodes = pm.importFile(path, returnNewNodes=True)
 
         ## if there are not textures files to handle, do not waste time
         if len(textureList) == 0 or copyTextures is False:
@@ -284,34 +374,47 @@ class assetLibrary(dict):
         if not os.path.exists(sourceImagesPath):
             os.mkdir(sourceImagesPath)
 
-        fileNodes = pm.ls(type="file")
+        ## index the imported file nodes by their texture path once, instead of querying every file node
+        ## in the scene for every texture
+        fileNodeIndex = {}
+        for file in pm.ls(newNodes, type="file"):
+            fileNodeIndex.setdefault(os.path.normpath(pm.getAttr(file.fileTextureName)), []).append(file)
+
+        newLocation = os.path.join(sourceImagesPath, name)
+        sources = []
+        newPaths = {}
         for texture in textureList:
-            path = os.path.join(self.directory, self[name]['assetName'], texture)
+            path = self.resolveTexture(name, texture)
             ## find the textures file Node
-            for file in fileNodes:
-                if os.path.normpath(pm.getAttr(file.fileTextureName)) == path:
-                    filePath, fileBase = os.path.split(path)
-                    newLocation = os.path.join(sourceImagesPath, name)
-                    if not os.path.exists(newLocation):
-                        os.mkdir(newLocation)
-                    newPath = os.path.normpath(os.path.join(newLocation, fileBase))
-                    print "path", path
-                    print "newPath", newPath
-                    copyfile(path, newPath)
+            if path not in fileNodeIndex:
+                continue
+            sources.append(path)
+            newPaths[path] = os.path.normpath(os.path.join(newLocation, texture))
+
+        ## file nodes still point to the library, the copies are made from the mirror if there is one
+        jobs = [(source, newPaths[path]) for path, source in zip(sources, self.localFiles(sources))]
+        fileNodes = dict((newPaths[path], fileNodeIndex[path]) for path in sources)
+        if jobs and not os.path.exists(newLocation):
+            os.mkdir(newLocation)
+        with mainProgress("Copying textures of %s" % name) as progress:
+            for source, newPath, copied in copyEngine(progress=progress).run(jobs):
+                for file in fileNodes[newPath]:
                     pm.setAttr(file.fileTextureName, newPath)
 
     def previewSaver(self, name, assetDirectory):
         """
-        Saves the preview files under the Asset Directory
+        Saves the preview files under the Asset Directory. Resolutions and the optional captures are defined by
+        the preview profile of the library.
         Args:
             name: (Unicode) Name of the Asset
             assetDirectory: (Unicode) Directory of Asset
 
         Returns:
-            (Tuple) Thumbnail path, Screenshot path, Wireframe path
+            (Tuple) Thumbnail path, Screenshot path, Wireframe path (None if the profile skips the wireframe)
 
         """
         logger.info("Saving Preview Images")
+        profile = self.previewProfile()
         selection = pm.ls(sl=True)
 
         validShapes = pm.listRelatives(selection, ad=True, type=["mesh", "nurbsSurface"])
@@ -343,34 +446,22 @@ class assetLibrary(dict):
         pm.select(d=True)
         pm.setAttr("defaultRenderGlobals.imageFormat", 8)  # This is the value for jpeg
 
-        frame = pm.currentTime(query=True)
-        # thumb
-        pm.playblast(completeFilename=thumbPath, forceOverwrite=True, format='image', width=200, height=200,
-                     showOrnaments=False, frame=[frame], viewer=False)
-
-        # screenshot
-        pm.playblast(completeFilename=SSpath, forceOverwrite=True, format='image', width=1600, height=1600,
-                     showOrnaments=False, frame=[frame], viewer=False)
+        # screenshot and the thumbnail from it
+        self.captureShot(SSpath, thumbPath, profile)
 
         # Wireframe
-        pm.modelEditor(panel, e=1, displayTextures=0)
-        pm.modelEditor(panel, e=1, wireframeOnShaded=1)
-        pm.playblast(completeFilename=WFpath, forceOverwrite=True, format='image', width=1600, height=1600,
-                     showOrnaments=False, frame=[frame], viewer=False)
+        if profile["wireframe"]:
+            frame = pm.currentTime(query=True)
+            pm.modelEditor(panel, e=1, displayTextures=0)
+            pm.modelEditor(panel, e=1, wireframeOnShaded=1)
+            with span("preview.playblast"):
+                pm.playblast(completeFilename=WFpath, forceOverwrite=True, format='image', width=profile["shotSize"],
+                             height=profile["shotSize"], showOrnaments=False, frame=[frame], viewer=False)
+        else:
+            WFpath = None
 
         pm.select(selection)
-        # UV Snapshot -- It needs
-        logger.info("Saving UV Snapshots")
-        for i in range(0, len(validShapes)):
-            print "validShape", validShapes[i]
-            # transformNode = validShapes[i].getParent()
-            objName = validShapes[i].name()
-            UVpath = os.path.join(assetDirectory, '%s_uv.jpg' % objName)
-            pm.select(validShapes[i])
-            try:
-                pm.uvSnapshot(o=True, ff="jpg", n=UVpath, xr=1600, yr=1600)
-            except:
-                logger.warning("UV snapshot is missed for %s" %validShapes[i])
+        self.uvSnapshots(validShapes, name, assetDirectory, profile)
 
         pm.isolateSelect(panel, state=0)
         pm.isolateSelect(panel, removeSelected=True)
@@ -379,6 +470,105 @@ class assetLibrary(dict):
 
         return thumbPath, SSpath, WFpath
 
+    def captureShot(self, SSpath, thumbPath, profile):
+        """
+        Playblasts the current frame as the screenshot, and makes the thumbnail by downscaling it
+        Args:
+            SSpath: (Unicode) Path of the screenshot
+            thumbPath: (Unicode) Path of the thumbnail
+            profile: (Dictionary) Preview profile
+
+        Returns:
+            None
+
+        """
+        frame = pm.currentTime(query=True)
+        with span("preview.playblast"):
+            pm.playblast(completeFilename=SSpath, forceOverwrite=True, format='image', width=profile["shotSize"],
+                         height=profile["shotSize"], showOrnaments=False, frame=[frame], viewer=False)
+        saved = False
+        with span("preview.thumbnail"):
+            image = QtGui.QImage(SSpath)
+            if not image.isNull():
+                thumb = image.scaled(profile["thumbSize"], profile["thumbSize"], QtCore.Qt.KeepAspectRatio,
+                                     QtCore.Qt.SmoothTransformation)
+                saved = thumb.save(thumbPath, "JPG")
+        if saved:
+            return
+        logger.warning("Cannot downscale the screenshot, playblasting the thumbnail")
+        pm.playblast(completeFilename=thumbPath, forceOverwrite=True, format='image', width=profile["thumbSize"],
+                     height=profile["thumbSize"], showOrnaments=False, frame=[frame], viewer=False)
+
+    def uvSnapshots(self, shapes, name, assetDirectory, profile):
+        """
+        Saves the UV snapshots as defined in the preview profile
+        Args:
+            shapes: (List) Meshes and nurbsSurfaces
+            name: (Unicode) Name of the Asset
+            assetDirectory: (Unicode) Directory of Asset
+            profile: (Dictionary) Preview profile
+
+        Returns:
+            (List) Paths of the snapshots
+
+        """
+        mode = profile["uvSnapshots"]
+        size = profile["uvSize"]
+        snapshots = []
+        if mode == "none" or not shapes:
+            return snapshots
+        logger.info("Saving UV Snapshots")
+        if mode == "perUvSet":
+            # all shapes in one snapshot for each uv set
+            uvSets = []
+            for shape in shapes:
+                try:
+                    shapeSets = pm.polyUVSet(shape, query=True, allUVSets=True) or []
+                except RuntimeError:
+                    shapeSets = []
+                uvSets += [uvSet for uvSet in shapeSets if uvSet not in uvSets]
+            for uvSet in uvSets:
+                UVpath = os.path.join(assetDirectory, '%s_%s_uv.jpg' % (name, uvSet))
+                pm.select(shapes)
+                try:
+                    with span("preview.uvSnapshot") as snapshot:
+                        pm.uvSnapshot(o=True, ff="jpg", n=UVpath, xr=size, yr=size, uvSetName=uvSet)
+                        snapshot.add(count=1)
+                    snapshots.append(UVpath)
+                except:
+                    logger.warning("UV snapshot is missed for %s" % uvSet)
+            return snapshots
+
+        for shape in shapes:
+            objName = shape.name()
+            UVpath = os.path.join(assetDirectory, '%s_uv.jpg' % objName)
+            pm.select(shape)
+            try:
+                with span("preview.uvSnapshot") as snapshot:
+                    pm.uvSnapshot(o=True, ff="jpg", n=UVpath, xr=size, yr=size)
+                    snapshot.add(count=1)
+                snapshots.append(UVpath)
+            except:
+                logger.warning("UV snapshot is missed for %s" % shape)
+        return snapshots
+
+    def previewProfile(self):
+        """
+        Returns:
+            (Dictionary) Preview profile of the library resolved from the previewProfile option
+
+        """
+        option = self.options.get("previewProfile", "full")
+        profile = dict(PREVIEW_PROFILES["full"])
+        if isinstance(option, dict):
+            profile.update(PREVIEW_PROFILES.get(option.get("base", "full"), {}))
+            profile.update((key, value) for key, value in option.items() if key != "base")
+        elif option in PREVIEW_PROFILES:
+            profile.update(PREVIEW_PROFILES[option])
+        else:
+            logger.warning("Unknown preview profile %s, using the full profile" % option)
+        return profile
+
     def updateScreenshot(self, name, assetDirectory):
 
         logger.info("Saving Preview Images")
@@ -386,67 +576,179 @@ class assetLibrary(dict):
         SSpath = os.path.join(assetDirectory, '%s_s.jpg' % name)
         # WFpath = os.path.join(assetDirectory, '%s_w.jpg' % name)
 
-        frame = pm.currentTime(query=True)
-        # thumb
-        pm.playblast(completeFilename=thumbPath, forceOverwrite=True, format='image', width=200, height=200,
-                     showOrnaments=False, frame=[frame], viewer=False)
-
-        # screenshot
-        pm.playblast(completeFilename=SSpath, forceOverwrite=True, format='image', width=1600, height=1600,
-                     showOrnaments=False, frame=[frame], viewer=False)
+        self.captureShot(SSpath, thumbPath, self.previewProfile())
+        if self.mirror is not None:
+            # the json is not re-read, mirrored copies of the old images are dropped here
+            folder = os.path.basename(os.path.normpath(assetDirectory))
+            self.mirror.invalidate(["%s/%s" % (folder, os.path.basename(path)) for path in (thumbPath, SSpath)])
 
 
+    @profiled("texture.filePass")
     def filePass(self, fileNodes, newPath, *args):
+        """
+        Copies the textures of the file nodes into the given folder and points the file nodes to the copies.
+        Transfers are done in parallel by the copyEngine, file nodes are updated on the main thread.
+        Args:
+            fileNodes: (List) File nodes
+            newPath: (Unicode) Destination folder
+
+        Returns:
+            (List) Base names of the textures
+
+        """
+        textures, transfers, targets = self.planFileTextures(fileNodes, newPath)
+        with mainProgress("Copying textures") as progress:
+            self.transferTextures(transfers, progress=progress)
+        for file, target in targets.items():
+            pm.setAttr(file.fileTextureName, target)
+        return textures
+
+    def planFileTextures(self, fileNodes, newPath):
+        """
+        Works out where the textures of the file nodes go in the asset folder, without copying anything
+        Args:
+            fileNodes: (List) File nodes
+            newPath: (Unicode) Destination folder
+
+        Returns:
+            (Tuple) Base names of the textures, [(source, destination), ...] to copy, {file node: new texture path}
+
+        """
         textures = []
+        transfers = []
+        targets = {}
         for file in fileNodes:
             fullPath = os.path.normpath(pm.getAttr(file.fileTextureName))
             filePath, fileBase = os.path.split(fullPath)
             newLocation = os.path.normpath(os.path.join(newPath, fileBase))
+            textureName = self.pathOps(newLocation, "basename")
+            textures.append(textureName)
 
-            if fullPath == newLocation:
-                pm.warning("File Node copy skipped")
-                textureName = self.pathOps(newLocation, "basename")
-                textures.append(textureName)
-                continue
+            ## a texture which is already in place is still transferred, a re-export stages it from the old asset
+            ## folder and the copyEngine skips it if it is the same file
+            transfers.append((fullPath, newLocation))
+            if fullPath != newLocation:
+                targets[file] = newLocation
+        return textures, transfers, targets
 
-            copyfile(fullPath, newLocation)
+    def storePass(self, fileNodes):
+        """
+        Puts the textures of the file nodes into the texture store of the library and points the file nodes to the
+        stored copies. Textures which are already in the store (same content) are not uploaded again.
+        Args:
+            fileNodes: (List) File nodes
 
-            pm.setAttr(file.fileTextureName, newLocation)
-            textureName = self.pathOps(newLocation, "basename")
-            textures.append(textureName)
-        return textures
+        Returns:
+            (Dictionary) {texture base name: blob key}
+
+        """
+        blobs, transfers, renames, targets = self.planStoreTextures(fileNodes)
+        self.transferTextures(transfers, renames)
+        for file, target in targets.items():
+            pm.setAttr(file.fileTextureName, target)
+        return blobs
+
+    def planStoreTextures(self, fileNodes):
+        """
+        Hashes the textures of the file nodes and works out which ones are missing in the texture store. Different
+        textures with the same base name are listed with their digest added to the name, ex. diffuse_3fa2b1c4.png
+        Args:
+            fileNodes: (List) File nodes
+
+        Returns:
+            (Tuple) {texture base name: blob key}, [(source, temporary blob path), ...] to upload,
+                [(temporary blob path, blob path), ...] to rename after the upload, {file node: blob path}
+
+        """
+        sources = collections.OrderedDict()
+        for file in fileNodes:
+            fullPath = os.path.normpath(pm.getAttr(file.fileTextureName))
+            sources.setdefault(fullPath, []).append(file)
+
+        hashes = parallelMap(hashFile, list(sources), COPY_THREADS)
+        blobs = {}
+        transfers = []
+        renames = []
+        targets = {}
+        uploads = set()
+        for (source, files), digest in zip(sources.items(), hashes):
+            blobKey = textureBlobKey(source, digest)
+            blobPath = self.texturePath(blobKey)
+            textureName = os.path.basename(source)
+            if blobs.get(textureName, blobKey) != blobKey:
+                # another texture with the same name from another folder
+                stem, extension = os.path.splitext(textureName)
+                textureName = "%s_%s%s" % (stem, digest[:8], extension)
+                logger.warning("%s has the same name with another texture of the asset, listed as %s" % (
+                    source, textureName))
+            blobs[textureName] = blobKey
+            for file in files:
+                targets[file] = blobPath
+            if source == blobPath or blobPath in uploads or os.path.exists(blobPath):
+                continue
+            uploads.add(blobPath)
+            # uploaded with a temporary name, a blob is never seen half written
+            tempPath = "%s.%s.tmp" % (blobPath, uuid.uuid4().hex[:8])
+            transfers.append((source, tempPath))
+            renames.append((tempPath, blobPath))
+        return blobs, transfers, renames, targets
 
     def findFileNodes(self, shape):
-        print "shape:", shape
-        def checkInputs(node):
-            inputNodes = node.inputs()
-            if len(inputNodes) == 0:
-                return []
-            else:
-                filteredNodes = [x for x in inputNodes if x.type() != "renderLayer"]
-                return filteredNodes
-        # geo = obj.getShape()
-        # Get the shading group from the selected mesh
+        """
+        Finds the file nodes in the shading networks of the shape
+        Args:
+            shape: (PyNode) Mesh or nurbsSurface
+
+        Returns:
+            (List) File nodes
+
+        """
+        return self.findAllFileNodes([shape])
+
+    def findAllFileNodes(self, shapes):
+        """
+        Finds the file nodes in the shading networks of all shapes. Shapes are grouped by their shading engines
+        first, so every shading network is traversed once no matter how many shapes share it.
+        Args:
+            shapes: (List) Meshes and nurbsSurfaces
+
+        Returns:
+            (List) Unique file nodes
+
+        """
+        if not shapes:
+            return []
+        # Get the shading groups of all shapes with a single query
         try:
-            sg = shape.outputs(type='shadingEngine')
-        except:
+            engines = pm.listConnections(shapes, type='shadingEngine', source=False, destination=True)
+        except RuntimeError:
             # if there is no sg, return en empty list
             return []
-        everyInput = []
-        for i in sg:
-            everyInput += pm.listHistory(i)
-
-        everyInput = self.makeUnique(everyInput)
-        print "everyInput", everyInput
+        fileNodes = []
+        with span("export.findFileNodes") as s:
+            for engine in self.makeUnique(engines):
+                fileNodes += self._engineFileNodes(engine)
+            fileNodes = self.makeUnique(fileNodes)
+            s.add(count=len(fileNodes))
+        return fileNodes
 
-        fileNodes = pm.ls(everyInput, type="file")
+    def _engineFileNodes(self, engine):
+        """
+        Returns the file nodes in the history of the shading engine. Results are memoized in historyCache while
+        saving an asset.
+        """
+        if self.historyCache is not None and engine in self.historyCache:
+            return self.historyCache[engine]
+        fileNodes = pm.ls(pm.listHistory(engine), type="file")
+        if self.historyCache is not None:
+            self.historyCache[engine] = fileNodes
         return fileNodes
 
     def makeUnique(self, fList):
         keys = {}
         for e in fList:
             keys[e] = 1
-        return keys.keys()
+        return list(keys)
 
     # def gatherAllinputs(self, node):
     #     allInputs = []
@@ -506,6 +808,36 @@ def getMayaMainWindow():
     ptr = wrapInstance(long(win), QtWidgets.QMainWindow)
     return ptr
 
+
+@contextlib.contextmanager
+def mainProgress(status):
+    """
+    Shows the progress of a copyEngine on the main progress bar of Maya while the block runs. The copyEngine calls
+    it on the calling thread, which is the main thread of Maya for the imports and the file passes.
+    Args:
+        status: (String) Text on the progress bar
+
+    Returns:
+        (Function) Progress callback for the copyEngine
+
+    """
+    try:
+        progressBar = pm.mel.eval("$tmp = $gMainProgressBar")
+        pm.progressBar(progressBar, edit=True, beginProgress=True, isInterruptable=False, status=status, maxValue=1)
+    except RuntimeError:
+        # batch mode, there is no main window
+        progressBar = None
+
+    def progress(done, total, *args):
+        if progressBar is not None:
+            pm.progressBar(progressBar, edit=True, maxValue=max(total, 1), progress=done)
+
+    try:
+        yield progress
+    finally:
+        if progressBar is not None:
+            pm.progressBar(progressBar, edit=True, endProgress=True)
+
 class bufferUI(QtWidgets.QDialog):
     def __init__(self):
         # for entry in QtWidgets.QApplication.allWidgets():
@@ -518,6 +850,83 @@ class bufferUI(QtWidgets.QDialog):
         self.setObjectName("assetLib")
         self.show()
 
+class profilerUI(QtWidgets.QDialog):
+    """
+    Summary table of the PROFILER. Refreshed every second while it is open.
+    """
+    COLUMNS = ["Operation", "Calls", "Total (ms)", "Mean (ms)", "Max (ms)", "MB", "Count"]
+
+    def __init__(self, parent=None):
+        super(profilerUI, self).__init__(parent=parent)
+        self.setWindowTitle("Asset Library - Performance Report")
+        self.resize(640, 420)
+        layout = QtWidgets.QVBoxLayout(self)
+
+        self.enableCheck = QtWidgets.QCheckBox("Enable Profiling")
+        self.enableCheck.setChecked(PROFILER.enabled)
+        self.enableCheck.toggled.connect(self.setEnabledProfiling)
+        layout.addWidget(self.enableCheck)
+
+        self.table = QtWidgets.QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        layout.addWidget(self.table)
+
+        btnWidget = QtWidgets.QWidget()
+        btnLayout = QtWidgets.QHBoxLayout(btnWidget)
+        layout.addWidget(btnWidget)
+
+        resetBtn = QtWidgets.QPushButton('Reset')
+        resetBtn.clicked.connect(self.reset)
+        btnLayout.addWidget(resetBtn)
+
+        exportBtn = QtWidgets.QPushButton('Export Chrome Trace...')
+        exportBtn.clicked.connect(self.exportTrace)
+        btnLayout.addWidget(exportBtn)
+
+        self.timer = QtCore.QTimer(self)
+        self.timer.setInterval(1000)
+        self.timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        self.refresh()
+        self.timer.start()
+        super(profilerUI, self).showEvent(event)
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super(profilerUI, self).hideEvent(event)
+
+    def setEnabledProfiling(self, state):
+        PROFILER.enabled = state
+
+    def refresh(self):
+        rows = PROFILER.summary()
+        self.table.setRowCount(len(rows))
+        for row, (name, calls, total, longest, size, count) in enumerate(rows):
+            values = [name, "%d" % calls, "%.1f" % (total * 1000), "%.2f" % (total * 1000 / calls),
+                      "%.2f" % (longest * 1000), "%.1f" % (size / 1048576.0), "%d" % count]
+            for column, value in enumerate(values):
+                item = QtWidgets.QTableWidgetItem(value)
+                if column:
+                    item.setTextAlignment(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+                self.table.setItem(row, column, item)
+        self.table.resizeColumnsToContents()
+
+    def reset(self):
+        PROFILER.reset()
+        self.refresh()
+
+    def exportTrace(self):
+        path, selectedFilter = QtWidgets.QFileDialog.getSaveFileName(self, "Export Chrome Trace",
+                                                                     "assetLibraryTrace.json", "Json (*.json)")
+        if not path:
+            return
+        count = PROFILER.exportChromeTrace(path)
+        logger.info("%s spans are written to %s (open with chrome://tracing or ui.perfetto.dev)" % (count, path))
+
+
 class AssetLibraryUI(QtWidgets.QTabWidget):
     tabID = 0
     def __init__(self):
@@ -539,6 +948,15 @@ class AssetLibraryUI(QtWidgets.QTabWidget):
         self.setWindowTitle("Asset Library")
         self.setObjectName("assetLib")
         self.tabDialog()
+        ## scan the other libraries in the background once the current tab is up
+        QtCore.QTimer.singleShot(0, self.prefetchTabs)
+
+    def prefetchTabs(self):
+        current = self.currentWidget()
+        for index in range(self.count()):
+            widget = self.widget(index)
+            if isinstance(widget, libraryTab) and widget is not current:
+                widget.prefetch()
 
     def tabDialog(self):
 
@@ -552,11 +970,12 @@ class AssetLibraryUI(QtWidgets.QTabWidget):
         for item in libs:
             name = item[0]
             path = item[1]
+            options = item[2] if len(item) > 2 else None
             if not os.path.exists(path):
                 logger.warning("Cannot reach library path: \n%s \n Removing from the database..." %(path))
                 junkPaths.append(item)
                 continue
-            preTab = libraryTab(path)
+            preTab = libraryTab(path, options)
             self.addTab(preTab, name)
             preTab.setLayout(preTab.layout)
 
@@ -590,10 +1009,24 @@ class AssetLibraryUI(QtWidgets.QTabWidget):
         # renameTabAction.triggered.connect(self.renameLibrary)
         repathTabAction.triggered.connect(lambda val="repath": self.settings(mode=val))
 
+        mirrorTabAction = QtWidgets.QAction('Local Mirror...', self)
+        self.tabsRightMenu.addAction(mirrorTabAction)
+        mirrorTabAction.triggered.connect(lambda val="mirror": self.settings(mode=val))
+
+        unmirrorTabAction = QtWidgets.QAction('Disable Local Mirror', self)
+        self.tabsRightMenu.addAction(unmirrorTabAction)
+        unmirrorTabAction.triggered.connect(lambda val="unmirror": self.settings(mode=val))
+
         removeTabAction = QtWidgets.QAction('Remove Selected Library', self)
         self.tabsRightMenu.addAction(removeTabAction)
         removeTabAction.triggered.connect(self.deleteCurrentTab)
 
+        self.tabsRightMenu.addSeparator()
+
+        profilerAction = QtWidgets.QAction('Performance Report...', self)
+        self.tabsRightMenu.addAction(profilerAction)
+        profilerAction.triggered.connect(self.showProfiler)
+
 
 
 
@@ -603,7 +1036,12 @@ class AssetLibraryUI(QtWidgets.QTabWidget):
     def on_context_menu(self, point):
         # show context menu
         self.tabsRightMenu.exec_(self.mapToGlobal(point))
-        print (QtWidgets.QApplication.widgetAt(self.mapToGlobal(point)))
+
+    def showProfiler(self):
+        if getattr(self, "profilerWindow", None) is None:
+            self.profilerWindow = profilerUI(self.buffer)
+        self.profilerWindow.show()
+        self.profilerWindow.raise_()
 
     def createNewTab(self):
         currentIndex=self.currentIndex()
@@ -667,12 +1105,18 @@ class AssetLibraryUI(QtWidgets.QTabWidget):
         
         Repath mode
         Opens a folder selection dialog, updates database with the selected folder
+
+        Mirror mode
+        Opens a folder selection dialog and asks the size limit for the local mirror of the selected library
+        
+        Unmirror mode
+        Disables the local mirror of the selected library. Mirrored files are left on the disk
         
         Load mode
         Returns the database list.
         
         Args:
-            mode: (String) Valid values are "add", "remove", "load".
+            mode: (String) Valid values are "add", "remove", "rename", "repath", "mirror", "unmirror", "load".
             name: (String) Tab Name of the Library to be added. Required by "add" mode
             path: (String) Absolute Path of the Library to be added. Required by "add" mode
             itemIndex: (Int) Index value of the item which will be removed from the database. Required by "remove" mode IF item flag is not set
@@ -683,7 +1127,7 @@ class AssetLibraryUI(QtWidgets.QTabWidget):
 
         """
         ## get the file location
-        settingsFile = os.path.join(os.path.dirname(os.path.abspath( __file__ )),"assetLibraryConfig.json")
+        settingsFile = CONFIG_FILE
         def dump(data,file):
             with open(file, "w") as f:
                 json.dump(data, f, indent=4)
@@ -694,8 +1138,7 @@ class AssetLibraryUI(QtWidgets.QTabWidget):
             dump(currentData, settingsFile)
             return
         if mode == "remove":
-            print "itemIndex", itemIndex
-            print "item", item
+            logger.debug("Removing library %s" % (item if item is not None else itemIndex))
             currentData = self.settings(mode="load")
             if itemIndex is not None:
                 currentData.pop(itemIndex)
@@ -737,6 +1180,34 @@ class AssetLibraryUI(QtWidgets.QTabWidget):
                 dump(currentData,settingsFile)
                 return
 
+        if mode == "mirror" or mode == "unmirror":
+            currentIndex = self.currentIndex()
+            if currentIndex == self.count():
+                return
+            currentData = self.settings(mode="load")
+            entry = currentData[currentIndex]
+            ## personal options of a library are the optional third element of its entry
+            options = entry[2] if len(entry) > 2 else {}
+            if mode == "mirror":
+                newDir = QtWidgets.QFileDialog.getExistingDirectory(self, "Select Local Mirror Directory",
+                                                                    options.get("mirror") or QtCore.QDir.homePath())
+                if not newDir:
+                    return
+                limit, ok = QtWidgets.QInputDialog.getInt(self, 'Local Mirror', 'Size Limit (GB):',
+                    options.get("mirrorLimit", MIRROR_SIZE_LIMIT) // (1024 ** 3), 1, 100000)
+                if not ok:
+                    return
+                options["mirror"] = newDir
+                options["mirrorLimit"] = limit * 1024 ** 3
+            else:
+                options.pop("mirror", None)
+            currentData[currentIndex] = entry[:2] + [options]
+            dump(currentData, settingsFile)
+            widget = self.widget(currentIndex)
+            if isinstance(widget, libraryTab):
+                widget.setOptions(options)
+            return
+
         if mode == "load":
             if os.path.isfile(settingsFile):
                 with open(settingsFile, 'r') as f:
@@ -748,78 +1219,1133 @@ class AssetLibraryUI(QtWidgets.QTabWidget):
         logger.warning("Settings file not changed")
 
 
-class libraryTab(QtWidgets.QWidget):
-    viewModeState = 1
+class thumbnailAtlas(object):
+    """
+    Packs the thumbnails of a library into a few large images on the library root, so opening a library is a few
+    sequential reads instead of a read for every thumbnail. Cells of the changed thumbnails are repainted when the
+    atlas is updated. Pages are lossless, the cells which are not changed stay as they are. Uses QImage only, safe
+    to use outside of the GUI thread.
+    Each update writes its pages under new names and then the index pointing to them, so a reader always gets the
+    pages of the same writer with the index. Writers of the sessions take turns with a lock file.
+    """
     def __init__(self, directory):
         self.directory = directory
+        self.indexPath = os.path.join(directory, "%s.json" % ATLAS_FILE)
+        self.lockPath = os.path.join(directory, "%s.lock" % ATLAS_FILE)
+        self.cell = ATLAS_CELL
+        self.columns = ATLAS_COLUMNS
+        self.pages = 0
+        ## file names of the pages in the page order
+        self.pageFiles = []
+        ## {"assetName/thumb.jpg": [page, slot, mtime, size]}
+        self.entries = {}
+
+    def pagePath(self, page):
+        return os.path.join(self.directory, self.pageFiles[page])
+
+    def load(self):
+        """
+        Reads the atlas index
+        Returns:
+            (Bool) True if there is a usable atlas
 
-        # super is an interesting function
-        # It gets the class that our class is inheriting from
-        # This is called the superclass
-        # The reason is that because we redefined __init__ in our class, we no longer call the code in the super's init
-        # So we need to call our super's init to make sure we are initialized like it wants us to be
-        # me=self
-        # for entry in QtWidgets.QApplication.allWidgets():
-        #     if entry.objectName() == "assetLib":
-        #         # print entry
-        #         entry.close()
+        """
+        self.pages = 0
+        self.pageFiles = []
+        self.entries = {}
+        if not os.path.isfile(self.indexPath):
+            return False
+        try:
+            with open(self.indexPath, 'r') as f:
+                data = json.load(f)
+        except (IOError, ValueError) as e:
+            logger.warning("Cannot read the thumbnail atlas %s (%s)" % (self.indexPath, e))
+            return False
+        if data.get("version") != ATLAS_VERSION or data.get("cell") != self.cell or \
+                data.get("columns") != self.columns:
+            # made with other settings, will be rebuilt
+            return False
+        self.pageFiles = data["pageFiles"]
+        self.pages = len(self.pageFiles)
+        self.entries = data["entries"]
+        return True
+
+    @profiled("thumbnail.atlasRead")
+    def read(self):
+        """
+        Reads the atlas pages and slices the thumbnails
+        Returns:
+            (Dictionary) {thumbnail key ("assetName/thumb.jpg"): (mtime, QImage)}
 
-        # parent = getMayaMainWindow()
+        """
+        thumbnails = {}
+        byPage = {}
+        for key, (page, slot, mtime, size) in self.entries.items():
+            byPage.setdefault(page, []).append((key, slot, mtime))
+        for page, cells in byPage.items():
+            image = QtGui.QImage(self.pagePath(page))
+            if image.isNull():
+                continue
+            for key, slot, mtime in cells:
+                thumbnails[key] = (mtime, image.copy(self.cellRect(slot)))
+        return thumbnails
 
-        super(libraryTab, self).__init__()
+    @profiled("thumbnail.atlasUpdate")
+    def update(self, thumbnails, threads=SCAN_THREADS):
+        """
+        Repaints the cells of the new and changed thumbnails and drops the removed ones. Nothing is written if the
+        atlas is up to date or another session is updating it, otherwise only the pages having a changed cell.
+        Args:
+            thumbnails: (List) Keys ("assetName/thumb.jpg") of all the current thumbnails of the library
+            threads: (Int) Number of workers checking the thumbnail files
 
-        self.library = assetLibrary(directory)
-        self.buildTabUI()
+        Returns:
+            (Bool) True if the atlas is changed
 
+        """
+        def statThumbnail(key):
+            try:
+                return os.stat(self.thumbnailPath(key))
+            except OSError:
+                return None
+
+        stats = dict(zip(thumbnails, parallelMap(statThumbnail, list(thumbnails), threads)))
+        self.load()
+        if not any(self._changes(stats)):
+            return False
+        if not self._lock():
+            logger.debug("Thumbnail atlas %s is being updated by another session" % self.indexPath)
+            return False
+        try:
+            # the last writer may have brought it up to date already
+            self.load()
+            changed, removed = self._changes(stats)
+            if not changed and not removed:
+                return False
+            return self._write(stats, changed, removed)
+        finally:
+            try:
+                os.remove(self.lockPath)
+            except OSError:
+                pass
 
-    def buildTabUI(self):
+    def _changes(self, stats):
+        """
+        Returns:
+            (Tuple) Keys of the changed (or lost with their page) thumbnails, keys of the removed ones
 
-        self.layout = QtWidgets.QVBoxLayout(self)
+        """
+        lostPages = set(page for page in range(self.pages) if not os.path.isfile(self.pagePath(page)))
+        removed = [key for key in self.entries if stats.get(key) is None]
+        changed = [key for key, st in sorted(stats.items()) if st is not None and (
+            key not in self.entries or self.entries[key][2] != st.st_mtime or self.entries[key][3] != st.st_size or
+            self.entries[key][0] in lostPages)]
+        return changed, removed
+
+    def _lock(self):
+        """
+        Returns:
+            (Bool) True if the lock file is made by this writer
 
-        searchWidget = QtWidgets.QWidget()
-        searchLayout = QtWidgets.QHBoxLayout(searchWidget)
+        """
+        for attempt in range(2):
+            try:
+                os.close(os.open(self.lockPath, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return True
+            except OSError:
+                try:
+                    if time.time() - os.stat(self.lockPath).st_mtime < ATLAS_LOCK_TIMEOUT:
+                        return False
+                    # the writer is gone without removing its lock
+                    os.remove(self.lockPath)
+                except OSError:
+                    pass
+        return False
+
+    def _write(self, stats, changed, removed):
+        perPage = self.columns * self.columns
+        freeSlots = sorted(self._slotIndex(self.entries.pop(key)) for key in removed)
+        used = [self._slotIndex(entry) for entry in self.entries.values()]
+        nextSlot = max(used) + 1 if used else 0
+        painted = {}
+        for key in changed:
+            if key in self.entries:
+                index = self._slotIndex(self.entries[key])
+            elif freeSlots:
+                index = freeSlots.pop(0)
+            else:
+                index = nextSlot
+                nextSlot += 1
+            page, slot = divmod(index, perPage)
+            st = stats[key]
+            self.entries[key] = [page, slot, st.st_mtime, st.st_size]
+            painted.setdefault(page, []).append((key, slot))
+
+        token = uuid.uuid4().hex[:8]
+        pageFiles = list(self.pageFiles)
+        for page, cells in sorted(painted.items()):
+            image = QtGui.QImage()
+            if page < self.pages:
+                image.load(self.pagePath(page))
+            if image.isNull():
+                image = QtGui.QImage(self.columns * self.cell, self.columns * self.cell, QtGui.QImage.Format_RGB32)
+                image.fill(QtGui.QColor(80, 80, 80))
+            painter = QtGui.QPainter(image)
+            for key, slot in cells:
+                rect = self.cellRect(slot)
+                painter.fillRect(rect, QtGui.QColor(80, 80, 80))
+                thumb = QtGui.QImage(self.thumbnailPath(key))
+                if thumb.isNull():
+                    continue
+                thumb = thumb.scaled(self.cell, self.cell, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
+                painter.drawImage(rect.x() + (self.cell - thumb.width()) // 2,
+                                  rect.y() + (self.cell - thumb.height()) // 2, thumb)
+            painter.end()
+            # a new file for each update, the readers of the previous index still find their pages
+            pageFile = "%s_%s_%s.png" % (ATLAS_FILE, page, token)
+            if not image.save(os.path.join(self.directory, pageFile), "PNG"):
+                logger.warning("Cannot write the thumbnail atlas page %s" % os.path.join(self.directory, pageFile))
+                return False
+            if page < len(pageFiles):
+                pageFiles[page] = pageFile
+            else:
+                # new pages come after the last one, in order
+                pageFiles.append(pageFile)
+
+        replaced = [self.pageFiles[page] for page in painted if page < self.pages]
+        self.pageFiles = pageFiles
+        self.pages = len(pageFiles)
+        tempPath = "%s.%s.tmp" % (self.indexPath, token)
+        with open(tempPath, "w") as f:
+            json.dump({"version": ATLAS_VERSION, "cell": self.cell, "columns": self.columns,
+                       "pageFiles": self.pageFiles, "entries": self.entries}, f)
+        replaceFile(tempPath, self.indexPath)
+        for pageFile in replaced:
+            try:
+                os.remove(os.path.join(self.directory, pageFile))
+            except OSError:
+                # still open by a reader on Windows
+                pass
+        return True
 
-        self.layout.addWidget(searchWidget)
+    def thumbnailPath(self, key):
+        return os.path.join(self.directory, *key.split("/"))
 
-        self.searchLabel = QtWidgets.QLabel("Seach Filter: ")
-        searchLayout.addWidget(self.searchLabel)
-        self.searchNameField = QtWidgets.QLineEdit()
+    def cellRect(self, slot):
+        row, column = divmod(slot, self.columns)
+        return QtCore.QRect(column * self.cell, row * self.cell, self.cell, self.cell)
 
-        self.searchNameField.textEdited.connect(self.populate)
-        searchLayout.addWidget(self.searchNameField)
-        self.size = 64
-        self.listWidget = QtWidgets.QListWidget()
-        self.listWidget.setViewMode(QtWidgets.QListWidget.IconMode)
-        self.listWidget.setMinimumSize(350, 600)
-        self.listWidget.setIconSize(QtCore.QSize(self.size, self.size))
-        self.listWidget.setMovement(QtWidgets.QListView.Static)
-        self.listWidget.setResizeMode(QtWidgets.QListWidget.Adjust)
-        self.listWidget.setGridSize(QtCore.QSize(self.size *1.2, self.size *1.4))
-        self.layout.addWidget(self.listWidget)
-        self.listWidget.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
-        self.listWidget.customContextMenuRequested.connect(self.on_context_menu)
-        self.popMenu = QtWidgets.QMenu()
-        ssAction = QtWidgets.QAction('Show Screenshot', self)
-        self.popMenu.addAction(ssAction)
-        ssAction.triggered.connect(lambda item='ssPath': self.actionTrigger(item))
+    def _slotIndex(self, entry):
+        return entry[0] * self.columns * self.columns + entry[1]
 
-        swAction = QtWidgets.QAction('Show Wireframe', self)
-        self.popMenu.addAction(swAction)
-        swAction.triggered.connect(lambda item='swPath': self.actionTrigger(item))
 
-        self.popMenu.addSeparator()
+class thumbnailCache(object):
+    """
+    LRU cache of decoded thumbnail pixmaps keyed by (path, mtime). Least recently used pixmaps are dropped
+    once the total pixmap memory exceeds the limit.
+    """
+    def __init__(self, limit=THUMBNAIL_CACHE_LIMIT):
+        self.limit = limit
+        self.size = 0
+        self.items = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def __contains__(self, key):
+        with self.lock:
+            return key in self.items
+
+    def get(self, key):
+        with self.lock:
+            if key not in self.items:
+                return None
+            # re-insert to mark as most recently used
+            pixmap, cost = self.items.pop(key)
+            self.items[key] = (pixmap, cost)
+            return pixmap
+
+    def put(self, key, pixmap):
+        cost = pixmap.width() * pixmap.height() * pixmap.depth() // 8
+        with self.lock:
+            if key in self.items:
+                self.size -= self.items.pop(key)[1]
+            self.items[key] = (pixmap, cost)
+            self.size += cost
+            self._evict()
+
+    def setLimit(self, limit):
+        """
+        Changes the memory cap of the cache
+        Args:
+            limit: (Int) Maximum memory of the cached pixmaps in bytes
 
-        importWithCopyAction = QtWidgets.QAction('Import and Copy Textures', self)
-        self.popMenu.addAction(importWithCopyAction)
-        importWithCopyAction.triggered.connect(lambda item='importWithCopy': self.actionTrigger(item))
+        Returns:
+            None
 
-        importOnlyAction = QtWidgets.QAction('Import Maya File', self)
-        self.popMenu.addAction(importOnlyAction)
-        importOnlyAction.triggered.connect(lambda item='importOnly': self.actionTrigger(item))
+        """
+        with self.lock:
+            self.limit = limit
+            self._evict()
 
-        importObjAction = QtWidgets.QAction('Import Obj', self)
-        self.popMenu.addAction(importObjAction)
-        importObjAction.triggered.connect(lambda item='importObj': self.actionTrigger(item))
+    def _evict(self):
+        while self.size > self.limit and len(self.items) > 1:
+            key, (pixmap, cost) = self.items.popitem(last=False)
+            self.size -= cost
+
+
+class thumbnailJob(QtCore.QRunnable):
+    """
+    Reads and decodes a single thumbnail on the thread pool. Decoding is skipped if the file is not changed
+    since it went into the cache.
+    """
+    def __init__(self, loader, path):
+        super(thumbnailJob, self).__init__()
+        self.loader = loader
+        self.path = path
+
+    def run(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            self.loader.loaded.emit(self.path, None, None)
+            return
+        mtime = st.st_mtime
+        if (self.path, mtime) in self.loader.cache:
+            self.loader.loaded.emit(self.path, mtime, None)
+            return
+        # QImage is safe to use outside of the GUI thread, QPixmap is not
+        with span("thumbnail.decode") as s:
+            image = QtGui.QImage(self.path)
+            s.add(size=st.st_size, count=1)
+        self.loader.loaded.emit(self.path, mtime, image)
+
+
+class thumbnailLoader(QtCore.QObject):
+    """
+    Loads the thumbnails in the background and keeps them in the shared thumbnailCache.
+    Use getThumbnailLoader() instead of creating new instances.
+    """
+    loaded = Signal(object, object, object)
+    thumbnailReady = Signal(object, object)
+
+    def __init__(self):
+        super(thumbnailLoader, self).__init__()
+        self.cache = thumbnailCache()
+        self.pool = QtCore.QThreadPool()
+        self.pool.setMaxThreadCount(THUMBNAIL_THREADS)
+        ## last known mtime for each path. Lets the views show the cached pixmap while it is validated
+        self.latest = {}
+        self.pending = set()
+        self.placeholderIcon = None
+        self.loaded.connect(self._onLoaded)
+
+    def placeholder(self):
+        """
+        Returns:
+            (QIcon) Icon to show until the thumbnail is loaded
+
+        """
+        if self.placeholderIcon is None:
+            pixmap = QtGui.QPixmap(200, 200)
+            pixmap.fill(QtGui.QColor(80, 80, 80))
+            self.placeholderIcon = QtGui.QIcon(pixmap)
+        return self.placeholderIcon
+
+    def cached(self, path):
+        """
+        Gets the last loaded pixmap of the path without touching the disk
+        Args:
+            path: (Unicode) Absolute path of the thumbnail
+
+        Returns:
+            (QPixmap) or None
+
+        """
+        mtime = self.latest.get(path)
+        if mtime is None:
+            return None
+        return self.cache.get((path, mtime))
+
+    def seed(self, path, mtime, pixmap):
+        """
+        Puts a thumbnail which is read from somewhere else (thumbnail atlas) into the cache. Ignored if a different
+        version of the thumbnail is already loaded.
+        Args:
+            path: (Unicode) Absolute path of the thumbnail
+            mtime: (Float) mtime of the thumbnail file the pixmap is made from
+            pixmap: (QPixmap) Thumbnail
+
+        Returns:
+            None
+
+        """
+        if self.latest.get(path, mtime) != mtime:
+            return
+        if (path, mtime) not in self.cache:
+            self.cache.put((path, mtime), pixmap)
+        self.latest[path] = mtime
+
+    def request(self, path):
+        """
+        Queues the thumbnail to be loaded (or validated if it is already in the cache). thumbnailReady signal
+        is emitted with (path, pixmap) when it is done.
+        Args:
+            path: (Unicode) Absolute path of the thumbnail
+
+        Returns:
+            None
+
+        """
+        if path in self.pending:
+            return
+        self.pending.add(path)
+        self.pool.start(thumbnailJob(self, path))
+
+    def _onLoaded(self, path, mtime, image):
+        self.pending.discard(path)
+        if mtime is None:
+            return
+        if image is None:
+            pixmap = self.cache.get((path, mtime))
+            if pixmap is None:
+                # evicted in the meantime
+                self.request(path)
+                return
+        else:
+            if image.isNull():
+                return
+            pixmap = QtGui.QPixmap.fromImage(image)
+            self.cache.put((path, mtime), pixmap)
+        changed = self.latest.get(path) != mtime
+        self.latest[path] = mtime
+        if image is not None or changed:
+            self.thumbnailReady.emit(path, pixmap)
+
+
+_thumbnailLoader = None
+
+
+def getThumbnailLoader():
+    """
+    Returns:
+        (thumbnailLoader) Thumbnail loader instance shared by all the library tabs
+
+    """
+    global _thumbnailLoader
+    if _thumbnailLoader is None:
+        _thumbnailLoader = thumbnailLoader()
+    return _thumbnailLoader
+
+
+class AssetListModel(QtCore.QAbstractListModel):
+    """
+    List model of the assets in an assetLibrary. Only the sorted asset names are held in the model, tooltips and
+    icons are created in data() which the views call for the visible rows only. Sorted by name, or by one of the
+    NUMERIC_FIELDS with setSort().
+    """
+    def __init__(self, library, parent=None):
+        super(AssetListModel, self).__init__(parent)
+        self.library = library
+        self.names = []
+        ## sort keys of the rows in the same order with the names, and by the asset name
+        self.keys = []
+        self.sortKeys = {}
+        ## None sorts by name
+        self.sortField = None
+        self.descending = False
+        self.thumbnails = getThumbnailLoader()
+        ## {thumbnail path: asset name} of the thumbnails requested from the loader
+        self.requested = {}
+        self.thumbnails.thumbnailReady.connect(self._onThumbnailReady)
+
+    def refresh(self):
+        """
+        Resets the model with the current content of the library
+        Returns:
+            None
+
+        """
+        self.setNames(self.library.keys())
+
+    def setNames(self, names):
+        """
+        Resets the model with the given asset names
+        Args:
+            names: (List) Asset names
+
+        Returns:
+            None
+
+        """
+        self.beginResetModel()
+        self._setKeys(sorted(self.sortKey(name) for name in names))
+        self.requested = {}
+        self.endResetModel()
+
+    def setSort(self, field, descending=False):
+        """
+        Sorts the rows by a numeric field of the assets. Assets without the field go to the end.
+        Args:
+            field: (String) Json key of one of the NUMERIC_FIELDS, None to sort by name
+            descending: (Bool) Largest values first. Names are always ascending
+
+        Returns:
+            None
+
+        """
+        if field == self.sortField and descending == self.descending:
+            return
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        names = [self.names[index.row()] for index in persistent]
+        self.sortField = field
+        self.descending = descending
+        self._setKeys(sorted(self.sortKey(name) for name in self.names))
+        ## selection and the current item follow the assets
+        self.changePersistentIndexList(persistent, [self.index(self.row(name)) for name in names])
+        self.layoutChanged.emit()
+
+    def sortKey(self, name):
+        """
+        Returns:
+            (Tuple) Sort key of the asset for the current sort field
+
+        """
+        if self.sortField is None:
+            return (0, 0, name)
+        value = self.library.get(name, {}).get(self.sortField)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return (1, 0, name)
+        return (0, -value if self.descending else value, name)
+
+    def addAssets(self, names):
+        """
+        Inserts the rows of the newly added assets
+        Args:
+            names: (List) Asset names which are already in the library
+
+        Returns:
+            None
+
+        """
+        keys = sorted(self.sortKey(name) for name in set(names) if name not in self.sortKeys)
+        if not keys:
+            return
+        if not self.keys or keys[0] > self.keys[-1]:
+            # streamed assets mostly come in order, append them in one go
+            self.beginInsertRows(QtCore.QModelIndex(), len(self.names), len(self.names) + len(keys) - 1)
+            self._setKeys(self.keys + keys)
+            self.endInsertRows()
+            return
+        if len(keys) > 64:
+            # many assets all over the list (streaming while sorted by a field), cheaper to lay out again
+            self.layoutAboutToBeChanged.emit()
+            persistent = self.persistentIndexList()
+            names = [self.names[index.row()] for index in persistent]
+            self._setKeys(sorted(self.keys + keys))
+            self.changePersistentIndexList(persistent, [self.index(self.row(name)) for name in names])
+            self.layoutChanged.emit()
+            return
+        for key in keys:
+            row = bisect.bisect_left(self.keys, key)
+            self.beginInsertRows(QtCore.QModelIndex(), row, row)
+            self.keys.insert(row, key)
+            self.names.insert(row, key[2])
+            self.sortKeys[key[2]] = key
+            self.endInsertRows()
+
+    def removeAssets(self, names):
+        """
+        Removes the rows of the given assets
+        Args:
+            names: (List) Asset names
+
+        Returns:
+            None
+
+        """
+        for name in names:
+            row = self.row(name)
+            if row is None:
+                continue
+            self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+            del self.names[row]
+            del self.keys[row]
+            del self.sortKeys[name]
+            self.endRemoveRows()
+
+    def updateAssets(self, names):
+        """
+        Refreshes the rows of the changed assets. Their thumbnails are validated again.
+        Args:
+            names: (List) Asset names
+
+        Returns:
+            None
+
+        """
+        names = set(names)
+        for path, name in list(self.requested.items()):
+            if name in names:
+                del self.requested[path]
+        # assets whose sort field is changed move to their new place
+        moved = [name for name in names if name in self.sortKeys and self.sortKey(name) != self.sortKeys[name]]
+        self.removeAssets(moved)
+        self.addAssets(moved)
+        for name in names:
+            row = self.row(name)
+            if row is not None:
+                index = self.index(row)
+                self.dataChanged.emit(index, index)
+
+    def refreshThumbnails(self):
+        """
+        Lets the views fetch the icons again, after the thumbnail cache is filled from the atlas
+        Returns:
+            None
+
+        """
+        if self.names:
+            self.dataChanged.emit(self.index(0), self.index(len(self.names) - 1))
+
+    def thumbnailKeys(self):
+        """
+        Returns:
+            (List) Atlas keys ("assetName/thumb.jpg") of the assets having a thumbnail
+
+        """
+        keys = []
+        for info in self.library.values():
+            if info.get('thumbPath'):
+                keys.append("%s/%s" % (info.get('assetName'), info.get('thumbPath')))
+        return keys
+
+    def row(self, name):
+        """
+        Returns:
+            (Int) Row of the asset or None if it is not in the model
+
+        """
+        key = self.sortKeys.get(name)
+        if key is None:
+            return None
+        return bisect.bisect_left(self.keys, key)
+
+    def _setKeys(self, keys):
+        self.keys = keys
+        self.names = [key[2] for key in keys]
+        self.sortKeys = dict((key[2], key) for key in keys)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.names)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.names):
+            return None
+        name = self.names[index.row()]
+        if role == QtCore.Qt.DisplayRole or role == QtCore.Qt.UserRole:
+            return name
+        if role == QtCore.Qt.ToolTipRole:
+            # The pprint.pformat will format our dictionary nicely
+            info = self.library.get(name)
+            if isinstance(info, assetRecord):
+                # hovering should not read the json file, only the fields in the memory are shown
+                info = info.loaded()
+            return pprint.pformat(info)
+        if role == QtCore.Qt.DecorationRole:
+            return self.thumbnail(name)
+        return None
+
+    def thumbnail(self, name):
+        info = self.library.get(name, {})
+        thumb = info.get('thumbPath')
+        if not thumb:
+            return None
+        thumbPath = self.library.readPath("%s/%s" % (info.get('assetName'), thumb))
+        if thumbPath not in self.requested:
+            # load, or validate the cached one once per refresh
+            self.requested[thumbPath] = name
+            self.thumbnails.request(thumbPath)
+        pixmap = self.thumbnails.cached(thumbPath)
+        if pixmap is None:
+            return self.thumbnails.placeholder()
+        return QtGui.QIcon(pixmap)
+
+    def _onThumbnailReady(self, path, pixmap):
+        name = self.requested.get(path)
+        if name is None:
+            return
+        row = self.row(name)
+        if row is None:
+            return
+        index = self.index(row)
+        self.dataChanged.emit(index, index)
+
+
+class AssetFilterModel(QtCore.QSortFilterProxyModel):
+    """
+    Shows the rows of an AssetListModel whose names are in the result of a search
+    """
+    def __init__(self, parent=None):
+        super(AssetFilterModel, self).__init__(parent)
+        ## None shows everything
+        self.matches = None
+
+    def setMatches(self, matches):
+        """
+        Args:
+            matches: (Set) Names of the assets to show. None to show all
+
+        Returns:
+            None
+
+        """
+        self.matches = matches
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, sourceRow, sourceParent):
+        if self.matches is None:
+            return True
+        return self.sourceModel().names[sourceRow] in self.matches
+
+
+class libraryPollJob(QtCore.QRunnable):
+    """
+    Compares the library with its last scan on the thread pool and hands the changed folders to the watcher
+    """
+    def __init__(self, watcher, deep=True):
+        super(libraryPollJob, self).__init__()
+        self.watcher = watcher
+        self.library = watcher.library
+        self.deep = deep
+
+    def run(self):
+        try:
+            folders = self.library.detectChanges(deep=self.deep)
+        except OSError as e:
+            logger.warning("Cannot poll the library %s (%s)" % (self.library.directory, e))
+            folders = []
+        try:
+            self.watcher.polled.emit(folders)
+        except RuntimeError:
+            # watcher is deleted in the meantime
+            pass
+
+
+class libraryWatcher(QtCore.QObject):
+    """
+    Watches the library folder and patches the assetLibrary for the added, changed and removed asset folders
+    instead of rescanning the whole library. Uses QFileSystemWatcher for immediate updates, and polls the
+    folder mtimes of the library in the background as a fallback (and for the libraries which are too big to
+    watch each asset folder). Exports replace the whole asset folder, so the folder mtimes catch them. Json files
+    edited in place are only picked up by a deep poll or the Refresh button.
+    """
+    assetsAdded = Signal(object)
+    assetsChanged = Signal(object)
+    assetsRemoved = Signal(object)
+    polled = Signal(object)
+
+    def __init__(self, library, parent=None, useFileSystemWatcher=True):
+        super(libraryWatcher, self).__init__(parent)
+        self.library = library
+        self.pending = set()
+        self.polling = False
+        ## the library folder changed while a poll was running, it is listed once more after it
+        self.pollAgain = False
+        self.fsWatcher = None
+        if useFileSystemWatcher:
+            self.fsWatcher = QtCore.QFileSystemWatcher(self)
+            self.fsWatcher.directoryChanged.connect(self._onDirectoryChanged)
+        ## collects the bursts of file system events of an export into one update
+        self.flushTimer = QtCore.QTimer(self)
+        self.flushTimer.setSingleShot(True)
+        self.flushTimer.setInterval(500)
+        self.flushTimer.timeout.connect(self.flush)
+        self.pollTimer = QtCore.QTimer(self)
+        self.pollTimer.setInterval(WATCH_POLL_INTERVAL)
+        self.pollTimer.timeout.connect(lambda: self.poll(deep=False))
+        self.polled.connect(self._onPolled)
+
+    def start(self):
+        """
+        Starts watching. Call again after a full rescan to update the watched folders
+        Returns:
+            None
+
+        """
+        self._watchFolders()
+        self.pollTimer.start()
+        if self.pending:
+            # changes which came in while the watcher was stopped
+            self.flushTimer.start()
+
+    def stop(self):
+        self.pollTimer.stop()
+        self.flushTimer.stop()
+        self.pollAgain = False
+        if self.fsWatcher is not None and self.fsWatcher.directories():
+            self.fsWatcher.removePaths(self.fsWatcher.directories())
+
+    def poll(self, deep=True):
+        """
+        Compares the library with its last scan on the thread pool, the changed folders come back to _onPolled
+        Args:
+            deep: (Bool) If False, only the folder mtimes are compared. See assetLibrary.detectChanges()
+
+        Returns:
+            None
+
+        """
+        if self.polling:
+            # the running poll may have listed the folder before the change
+            self.pollAgain = self.pollAgain or not deep
+            return
+        self.polling = True
+        QtCore.QThreadPool.globalInstance().start(libraryPollJob(self, deep=deep))
+
+    def flush(self):
+        """
+        Updates the library for the pending folders and emits the asset events. While the watcher is stopped (the
+        library is being rescanned) the folders stay pending until start()
+        Returns:
+            None
+
+        """
+        if not self.pollTimer.isActive():
+            return
+        folders = sorted(self.pending)
+        self.pending = set()
+        if not folders:
+            return
+        stateBefore = set(self.library.folderState)
+        added, changed, removed = self.library.updateFolders(folders)
+        # a folder event without any json change may still be a new thumbnail
+        for folder in folders:
+            if folder in stateBefore:
+                for name in self.library.folderState.get(folder, (None, None, []))[2]:
+                    if name not in changed and name not in added:
+                        changed.append(name)
+        if set(self.library.folderState) != stateBefore:
+            self._watchFolders()
+        if removed:
+            self.assetsRemoved.emit(removed)
+        if added:
+            self.assetsAdded.emit(added)
+        if changed:
+            self.assetsChanged.emit(changed)
+
+    def _watchFolders(self):
+        if self.fsWatcher is None:
+            return
+        paths = [self.library.directory]
+        if len(self.library.folderState) <= WATCH_FOLDER_LIMIT:
+            paths += [os.path.join(self.library.directory, folder) for folder in self.library.folderState]
+        watched = self.fsWatcher.directories()
+        if watched:
+            self.fsWatcher.removePaths(watched)
+        self.fsWatcher.addPaths(paths)
+
+    def _onDirectoryChanged(self, path):
+        if os.path.normpath(path) == os.path.normpath(self.library.directory):
+            # added or removed asset folders, listed on the thread pool comparing only the folder mtimes
+            self.poll(deep=False)
+            return
+        self.pending.add(os.path.basename(os.path.normpath(path)))
+        self.flushTimer.start()
+
+    def _onPolled(self, folders):
+        self.polling = False
+        if folders:
+            self.pending.update(folders)
+            self.flush()
+        if self.pollAgain:
+            self.pollAgain = False
+            self.poll(deep=False)
+
+
+class exportQueue(QtCore.QObject):
+    """
+    Finalizes the captured exports (assetLibrary.finalizeAsset) one by one on a background thread, so the artist
+    gets Maya back as soon as the scene part of the export is done. The library is not touched on the thread, the
+    receiver of jobFinished reads the exported asset folder into it on the main thread.
+    """
+    jobStarted = Signal(object)
+    jobProgress = Signal(object, object, object)
+    jobFinished = Signal(object, object)
+
+    def __init__(self, library, parent=None):
+        super(exportQueue, self).__init__(parent)
+        self.library = library
+        self.jobs = queue.Queue()
+        self.pendingCount = 0
+        self.thread = None
+        self.jobFinished.connect(self._onFinished)
+
+    def put(self, job):
+        """
+        Queues an export job
+        Args:
+            job: (Dictionary) Export job returned by assetLibrary.captureAsset()
+
+        Returns:
+            None
+
+        """
+        self.pendingCount += 1
+        self.jobs.put(job)
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._work, name="assetLibraryExport")
+            self.thread.daemon = True
+            self.thread.start()
+
+    def _work(self):
+        while True:
+            job = self.jobs.get()
+            name = job["assetName"]
+            self.jobStarted.emit(name)
+            try:
+                self.library.finalizeAsset(job, progress=lambda done, total: self.jobProgress.emit(name, done, total))
+                error = None
+            except Exception as e:
+                logger.exception("Export of %s is failed" % name)
+                error = str(e)
+            self.jobFinished.emit(name, error)
+
+    def _onFinished(self, name, error):
+        self.pendingCount -= 1
+
+
+class libraryStreamJob(QtCore.QRunnable):
+    """
+    Runs assetLibrary.iterScan() on the thread pool and puts the asset names into a queue for the UI to consume.
+    The queue ends with None, or with the exception if the scan fails.
+    """
+    def __init__(self, library, outQueue):
+        super(libraryStreamJob, self).__init__()
+        self.library = library
+        self.queue = outQueue
+
+    def run(self):
+        try:
+            with span("scan.stream") as s:
+                for name, info in self.library.iterScan():
+                    self.queue.put(name)
+                    s.add(count=1)
+        except Exception as e:
+            self.queue.put(e)
+            return
+        self.queue.put(None)
+
+
+class atlasJob(QtCore.QRunnable):
+    """
+    Reads the thumbnail atlas of a libraryTab on the thread pool and hands the thumbnails back with the atlasLoaded
+    signal. If thumbnail keys are given, updates the atlas for them instead.
+    """
+    def __init__(self, tab, keys=None):
+        super(atlasJob, self).__init__()
+        self.tab = tab
+        self.directory = tab.directory
+        self.keys = keys
+
+    def run(self):
+        atlas = thumbnailAtlas(self.directory)
+        try:
+            if self.keys is not None:
+                atlas.update(self.keys)
+                return
+            if not atlas.load():
+                return
+            thumbnails = atlas.read()
+        except (IOError, OSError) as e:
+            logger.warning("Thumbnail atlas of %s is not available (%s)" % (self.directory, e))
+            return
+        try:
+            self.tab.atlasLoaded.emit(thumbnails)
+        except RuntimeError:
+            # tab is deleted in the meantime
+            pass
+
+
+class mirrorJob(QtCore.QRunnable):
+    """
+    Brings the json files and the thumbnails of a library up to date in its local mirror on the thread pool
+    """
+    def __init__(self, library):
+        super(mirrorJob, self).__init__()
+        self.library = library
+
+    def run(self):
+        try:
+            count = self.library.syncMirror()
+        except (IOError, OSError) as e:
+            logger.warning("Cannot update the local mirror of %s (%s)" % (self.library.directory, e))
+            return
+        logger.debug("%s files are up to date in the local mirror of %s" % (count, self.library.directory))
+
+
+class libraryScanJob(QtCore.QRunnable):
+    """
+    Scans the library of a libraryTab on the thread pool and hands the result back with the prefetched signal
+    """
+    def __init__(self, tab):
+        super(libraryScanJob, self).__init__()
+        self.tab = tab
+        self.directory = tab.directory
+        self.options = dict(tab.options)
+
+    def run(self):
+        library = assetLibrary(self.directory, mirror=self.options.get("mirror"),
+                               mirrorLimit=self.options.get("mirrorLimit", MIRROR_SIZE_LIMIT))
+        library.scan()
+        try:
+            self.tab.prefetched.emit(library)
+        except RuntimeError:
+            # tab is deleted in the meantime
+            pass
+
+
+class libraryTab(QtWidgets.QWidget):
+    viewModeState = 1
+    prefetched = Signal(object)
+    atlasLoaded = Signal(object)
+    def __init__(self, directory, options=None):
+        self.directory = directory
+        ## personal options of the library from the assetLibraryConfig.json, ex. {"mirror": path, "mirrorLimit": bytes}
+        self.options = dict(options or {})
+
+        # super is an interesting function
+        # It gets the class that our class is inheriting from
+        # This is called the superclass
+        # The reason is that because we redefined __init__ in our class, we no longer call the code in the super's init
+        # So we need to call our super's init to make sure we are initialized like it wants us to be
+        # me=self
+        # for entry in QtWidgets.QApplication.allWidgets():
+        #     if entry.objectName() == "assetLib":
+        #         # print entry
+        #         entry.close()
+
+        # parent = getMayaMainWindow()
+
+        super(libraryTab, self).__init__()
+
+        self.library = assetLibrary(directory, mirror=self.options.get("mirror"),
+                                    mirrorLimit=self.options.get("mirrorLimit", MIRROR_SIZE_LIMIT))
+        self.layout = QtWidgets.QVBoxLayout(self)
+        ## The UI is built and the library is scanned when the tab is shown for the first time
+        self.built = False
+        self.prefetching = False
+        self.prefetched.connect(self._onPrefetched)
+        self.atlasLoaded.connect(self._onAtlasLoaded)
+
+    def setOptions(self, options):
+        """
+        Applies the personal options of the library
+        Args:
+            options: (Dictionary) {"mirror": local mirror folder or None, "mirrorLimit": size cap in bytes}
+
+        Returns:
+            None
+
+        """
+        self.options = dict(options)
+        self.library.setMirror(self.options.get("mirror"), self.options.get("mirrorLimit", MIRROR_SIZE_LIMIT))
+        if self.built and self.library.mirror is not None:
+            QtCore.QThreadPool.globalInstance().start(mirrorJob(self.library))
+
+    def showEvent(self, event):
+        if not self.built:
+            self.buildTabUI()
+        super(libraryTab, self).showEvent(event)
+
+    def prefetch(self):
+        """
+        Scans the library in the background so the tab opens instantly when it is shown. Does nothing if the tab
+        is already built.
+        Returns:
+            None
+
+        """
+        if self.built or self.prefetching:
+            return
+        self.prefetching = True
+        QtCore.QThreadPool.globalInstance().start(libraryScanJob(self))
+
+    def _onPrefetched(self, library):
+        self.prefetching = False
+        ## tab may be built while the scan is running, it did its own scan in that case
+        if not self.built:
+            self.library = library
+
+    def buildTabUI(self):
+        self.built = True
+
+        searchWidget = QtWidgets.QWidget()
+        searchLayout = QtWidgets.QHBoxLayout(searchWidget)
+
+        self.layout.addWidget(searchWidget)
+
+        self.searchLabel = QtWidgets.QLabel("Seach Filter: ")
+        searchLayout.addWidget(self.searchLabel)
+        self.searchNameField = QtWidgets.QLineEdit()
+
+        self.searchNameField.setPlaceholderText("wood  tex:oak  tri:<50000  plank~")
+        self.searchNameField.textEdited.connect(self.filterItems)
+        searchLayout.addWidget(self.searchNameField)
+
+        self.sortLabel = QtWidgets.QLabel("Sort: ")
+        searchLayout.addWidget(self.sortLabel)
+        self.sortCombo = QtWidgets.QComboBox()
+        self.sortCombo.addItem("Name", None)
+        for key, label in NUMERIC_FIELDS:
+            self.sortCombo.addItem(label, key)
+        self.sortCombo.currentIndexChanged.connect(self.sortItems)
+        searchLayout.addWidget(self.sortCombo)
+        self.descendingCheck = QtWidgets.QCheckBox("Descending")
+        self.descendingCheck.toggled.connect(self.sortItems)
+        searchLayout.addWidget(self.descendingCheck)
+        self.size = 64
+        self.model = AssetListModel(self.library, self)
+        ## search filter works on the proxy, the library is not rescanned while typing
+        self.proxyModel = AssetFilterModel(self)
+        self.proxyModel.setSourceModel(self.model)
+        self.listView = QtWidgets.QListView()
+        self.listView.setModel(self.proxyModel)
+        self.listView.setViewMode(QtWidgets.QListView.IconMode)
+        self.listView.setMinimumSize(350, 600)
+        self.listView.setIconSize(QtCore.QSize(self.size, self.size))
+        self.listView.setMovement(QtWidgets.QListView.Static)
+        self.listView.setResizeMode(QtWidgets.QListView.Adjust)
+        self.listView.setGridSize(QtCore.QSize(self.size *1.2, self.size *1.4))
+        ## all items are the same size, lets the view lay out only the visible rows
+        self.listView.setUniformItemSizes(True)
+        self.listView.setLayoutMode(QtWidgets.QListView.Batched)
+        self.layout.addWidget(self.listView)
+        self.listView.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
+        self.listView.customContextMenuRequested.connect(self.on_context_menu)
+        self.popMenu = QtWidgets.QMenu()
+        ssAction = QtWidgets.QAction('Show Screenshot', self)
+        self.popMenu.addAction(ssAction)
+        ssAction.triggered.connect(lambda item='ssPath': self.actionTrigger(item))
+
+        swAction = QtWidgets.QAction('Show Wireframe', self)
+        self.popMenu.addAction(swAction)
+        swAction.triggered.connect(lambda item='swPath': self.actionTrigger(item))
+
+        self.popMenu.addSeparator()
+
+        importWithCopyAction = QtWidgets.QAction('Import and Copy Textures', self)
+        self.popMenu.addAction(importWithCopyAction)
+        importWithCopyAction.triggered.connect(lambda item='importWithCopy': self.actionTrigger(item))
+
+        importOnlyAction = QtWidgets.QAction('Import Maya File', self)
+        self.popMenu.addAction(importOnlyAction)
+        importOnlyAction.triggered.connect(lambda item='importOnly': self.actionTrigger(item))
+
+        importObjAction = QtWidgets.QAction('Import Obj', self)
+        self.popMenu.addAction(importObjAction)
+        importObjAction.triggered.connect(lambda item='importObj': self.actionTrigger(item))
 
         openFileAction = QtWidgets.QAction('Open File', self)
         self.popMenu.addAction(openFileAction)
@@ -862,23 +2388,76 @@ class libraryTab(QtWidgets.QWidget):
         self.exportBtn.clicked.connect(self.export)
         btnLayout.addWidget(self.exportBtn)
 
+        ## progress of the exports finishing in the background
+        self.exportProgress = QtWidgets.QProgressBar()
+        self.exportProgress.setVisible(False)
+        self.layout.addWidget(self.exportProgress)
+        self.exportQueue = exportQueue(self.library, self)
+        self.exportQueue.jobStarted.connect(self._onExportStarted)
+        self.exportQueue.jobProgress.connect(self._onExportProgress)
+        self.exportQueue.jobFinished.connect(self._onExportFinished)
+
         shortcutExport = Qt.QtWidgets.QShortcut(Qt.QtGui.QKeySequence("Ctrl+E"), self, self.export)
         shortcutImport = Qt.QtWidgets.QShortcut(Qt.QtGui.QKeySequence("Ctrl+I"), self, lambda val=True: self.load(val))
         scIncreaseIconSize = Qt.QtWidgets.QShortcut(Qt.QtGui.QKeySequence("Ctrl++"), self, lambda val=10: self.adjustIconSize(val))
         scDecreaseIconSize = Qt.QtWidgets.QShortcut(Qt.QtGui.QKeySequence("Ctrl+-"), self, lambda val=-10: self.adjustIconSize(val))
 
-        self.populate()
+        ## assets read by the stream job are added to the model in time slices
+        self.streamQueue = None
+        ## asset folders to patch once the stream is finished, ex. the exports finished during the stream
+        self.deferredFolders = set()
+        self.streamTimer = QtCore.QTimer(self)
+        self.streamTimer.setInterval(30)
+        self.streamTimer.timeout.connect(self._consumeStream)
+
+        ## keeps the library and the view up to date with the exports from other sessions
+        self.watcher = libraryWatcher(self.library, self)
+        self.watcher.assetsAdded.connect(self.model.addAssets)
+        self.watcher.assetsChanged.connect(self.model.updateAssets)
+        self.watcher.assetsRemoved.connect(self.model.removeAssets)
+
+        # thumbnails of the whole library in a few reads, before the single thumbnails are requested
+        QtCore.QThreadPool.globalInstance().start(atlasJob(self))
+
+        if self.library.scanned:
+            # already scanned by prefetch
+            self.model.refresh()
+            self.watcher.start()
+        else:
+            self.populate()
 
 
     def adjustIconSize(self, value):
         self.size += value
-        self.listWidget.setIconSize(QtCore.QSize(self.size, self.size))
-        self.listWidget.setGridSize(QtCore.QSize(self.size *1.2, self.size *1.4))
+        self.listView.setIconSize(QtCore.QSize(self.size, self.size))
+        self.listView.setGridSize(QtCore.QSize(self.size *1.2, self.size *1.4))
 
 
+    def currentAssetName(self):
+        """
+        Returns:
+            (Unicode) Name of the selected asset or None if nothing is selected
+
+        """
+        index = self.listView.currentIndex()
+        if not index.isValid():
+            return None
+        return index.data(QtCore.Qt.UserRole)
+
     def actionTrigger(self, item):
-        currentItem = self.listWidget.currentItem()
-        name = currentItem.text()
+        if item == 'viewModeChange':
+            self.viewModeState = self.viewModeState * -1
+            if self.viewModeState == 1:
+                self.viewAsListAction.setText("View As List")
+                self.listView.setViewMode(QtWidgets.QListView.IconMode)
+            elif self.viewModeState == -1:
+                self.viewAsListAction.setText("View As Icons")
+                self.listView.setViewMode(QtWidgets.QListView.ListMode)
+            return
+
+        name = self.currentAssetName()
+        if not name:
+            return
         info = self.library[name]
 
         if item == 'openFolder':
@@ -898,20 +2477,12 @@ class libraryTab(QtWidgets.QWidget):
             filepath = os.path.join(self.directory, asset, filename)
             pm.openFile(filepath, force=True)
 
-        elif item == 'viewModeChange':
-            self.viewModeState = self.viewModeState * -1
-            if self.viewModeState == 1:
-                self.viewAsListAction.setText("View As List")
-                self.listWidget.setViewMode(QtWidgets.QListWidget.IconMode)
-            elif self.viewModeState == -1:
-                self.viewAsListAction.setText("View As Icons")
-                self.listWidget.setViewMode(QtWidgets.QListWidget.ListMode)
-
         elif item == 'replaceScrWithCurrentView':
             asset = info.get('assetName')
             path = os.path.join(self.directory, asset)
             self.library.updateScreenshot(asset, path)
-            self.populate()
+            # json is not changed, only the thumbnail needs to be loaded again
+            self.model.updateAssets([name])
 
         elif item == 'replaceScrWithLastRender':
             # //TODO
@@ -919,13 +2490,16 @@ class libraryTab(QtWidgets.QWidget):
 
         else:
             ss = info.get(item)
+            if not ss:
+                logger.warning("%s has no %s" % (name, item))
+                return
             asset = info.get('assetName')
             ssPath = os.path.join(self.directory, asset, ss)
             os.startfile(ssPath)
 
     def on_context_menu(self, point):
         # show context menu
-        self.popMenu.exec_(self.listWidget.mapToGlobal(point))
+        self.popMenu.exec_(self.listView.mapToGlobal(point))
 
     def export(self):
 
@@ -938,10 +2512,31 @@ class libraryTab(QtWidgets.QWidget):
             if not name.strip():
                 logger.warn("You must give a name!")
                 return
-            self.library.saveAsset(name)
-            self.populate()
+            job = self.library.captureAsset(name)
+            if job is None:
+                return
+            # files are copied to the library in the background
+            self.exportQueue.put(job)
             # self.exportWindow.show()
+            logger.info("Asset captured, finishing the export in the background")
+
+    def _onExportStarted(self, name):
+        self.exportProgress.setFormat("Exporting %s - %%p%% (%s queued)" % (name, self.exportQueue.pendingCount - 1))
+        self.exportProgress.setValue(0)
+        self.exportProgress.setVisible(True)
+
+    def _onExportProgress(self, name, done, total):
+        self.exportProgress.setMaximum(max(total, 1))
+        self.exportProgress.setValue(done)
+
+    def _onExportFinished(self, name, error):
+        if error:
+            logger.error("Export of %s is failed: %s" % (name, error))
+        else:
             logger.info("Asset Exported")
+        self.updateAssets([name])
+        if self.exportQueue.pendingCount <= 0:
+            self.exportProgress.setVisible(False)
 
     def load(self, copy_textures, mode="maPath"):
         """
@@ -950,52 +2545,115 @@ class libraryTab(QtWidgets.QWidget):
             None
 
         """
-        # We will ask the listWidget what our currentItem is
-        currentItem = self.listWidget.currentItem()
+        # We will ask the listView what our current asset is
+        name = self.currentAssetName()
 
         # If we don't have anything selected, it will tell us None is selected, so we can skip this method
-        if not currentItem:
+        if not name:
             return
 
-        # We then get the text label of the current item. This will be the name of our control
-        name = currentItem.text()
         # Then we tell our library to load it
         self.library.importAsset(name, copy_textures, mode=mode)
 
     def populate(self):
         """
-        UI populate function - linkes to the assetLibrary.scan()
+        UI populate function - linkes to the assetLibrary.iterScan()
+        Rescans the library in the background and fills the view as the assets are read. Only meant for the
+        initial load, Refresh and after changes on the library. Search filter is handled by filterItems()
         Returns:
 
         """
-        filterWord = self.searchNameField.text()
-
-        self.listWidget.clear()
-        self.library.scan()
-        # Now we iterate through the dictionary
-        for name, info in sorted(self.library.items()):
+        if self.streamQueue is not None:
+            # already scanning
+            return
+        self.watcher.stop()
+        self.model.setNames([])
+        self.streamQueue = queue.Queue()
+        QtCore.QThreadPool.globalInstance().start(libraryStreamJob(self.library, self.streamQueue))
+        self.streamTimer.start()
+
+    def _consumeStream(self):
+        timer = QtCore.QElapsedTimer()
+        timer.start()
+        names = []
+        finished = False
+        while timer.elapsed() < STREAM_TIME_SLICE:
+            try:
+                name = self.streamQueue.get_nowait()
+            except queue.Empty:
+                break
+            if name is None or isinstance(name, Exception):
+                if name is not None:
+                    logger.error("Cannot scan the library %s (%s)" % (self.directory, name))
+                finished = True
+                break
+            names.append(name)
+        with span("ui.addAssets") as s:
+            self.model.addAssets(names)
+            s.add(count=len(names))
+        if names and self.proxyModel.matches is not None:
+            self.filterItems()
+        if finished:
+            self.streamTimer.stop()
+            self.streamQueue = None
+            if self.deferredFolders:
+                folders = sorted(self.deferredFolders)
+                self.deferredFolders = set()
+                self.updateAssets(folders)
+            self.watcher.start()
+            # bring the atlas up to date for the next time the library is opened
+            QtCore.QThreadPool.globalInstance().start(atlasJob(self, self.model.thumbnailKeys()))
+            if self.library.mirror is not None:
+                QtCore.QThreadPool.globalInstance().start(mirrorJob(self.library))
+
+    def _onAtlasLoaded(self, thumbnails):
+        thumbnailLoader = getThumbnailLoader()
+        for key, (mtime, image) in thumbnails.items():
+            # mirrored thumbnails keep the mtime of the library file, the atlas entries are valid for them too
+            thumbnailLoader.seed(self.library.readPath(key), mtime, QtGui.QPixmap.fromImage(image))
+        self.model.refreshThumbnails()
+
+    def updateAssets(self, folders):
+        """
+        Patches the library and the view for the given asset folders without a full rescan. While the library is
+        streamed by populate() the folders are only collected, they are patched when the stream is finished.
+        Args:
+            folders: (List) Names of the asset folders
 
-            # if there is a filterword, filter the item
-            if filterWord != "" and filterWord.lower() not in name.lower():
-                continue
-            # We create an item for the list widget and tell it to have our controller name as a label
-            item = QtWidgets.QListWidgetItem(name)
+        Returns:
+            None
 
-            # We set its tooltip to be the info from the json
-            # The pprint.pformat will format our dictionary nicely
-            item.setToolTip(pprint.pformat(info))
+        """
+        if self.streamQueue is not None:
+            # iterScan is filling the same library on the thread pool
+            self.deferredFolders.update(folders)
+            return
+        added, changed, removed = self.library.updateFolders(folders)
+        self.model.removeAssets(removed)
+        self.model.addAssets(added)
+        self.model.updateAssets(changed)
+        if self.proxyModel.matches is not None:
+            self.filterItems()
+
+    def sortItems(self, *args):
+        """
+        Sorts the view with the sort field selection
+        Returns:
+            None
 
-            # Finally we check if there's a screenshot available
-            thumb = info.get('thumbPath')
-            asset = info.get('assetName')
-            thumbPath = os.path.join(self.directory, asset, thumb)
-            # If there is, then we will load it
-            if thumb:
-                # So first we make an icon with the path to our screenshot
-                icon = QtGui.QIcon(thumbPath)
-                # then we set the icon onto our item
-                item.setIcon(icon)
+        """
+        field = self.sortCombo.itemData(self.sortCombo.currentIndex())
+        with span("ui.sort"):
+            self.model.setSort(field, self.descendingCheck.isChecked())
 
-            # Finally we add our item to the list
-            self.listWidget.addItem(item)
+    def filterItems(self):
+        """
+        Filters the view with the search field through the search index of the library. Works on the already
+        loaded assets only.
+        Returns:
+            None
 
+        """
+        query = self.searchNameField.text().strip()
+        with span("ui.filter"):
+            self.proxyModel.setMatches(self.library.search(query) if query else None)
@@ -0,0 +1,2543 @@
+#####################################################################################################################
+## Asset Library Core - Python Script
+## Title: Asset Library Core
+## AUTHOR:	Arda Kutlu
+## e-mail: ardakutlu@gmail.com
+## Web: http://www.ardakutlu.com
+##
+## DESCRIPTION: File system side of the Asset Library. Scanning, catalog and search indexes, texture store, local
+                ## mirror and the library maintenance. Imports without Maya and Qt, works with Python 2 and 3.
+                ## assetLibrary.py builds the Maya parts (export, import, previews) and the UI on top of it.
+## COMMAND LINE:
+## python assetLibraryCore.py <command> <library path> [options]
+## - scan: Scans the library and brings the catalog index up to date
+## - reindex: Rebuilds the catalog index from the json files
+## - verify: Checks the json files, the asset files and the textures. Exits with 1 if there is a problem.
+                ## --hashes checks the content of the texture store too
+## - stats: Prints the asset, texture and disk usage numbers. --json for machine readable output
+## - prune: Removes the leftovers of the failed exports (.staging_*, .trash_* folders), temporary uploads and the
+                ## texture store files which no asset uses. Only the ones older than --age hours (default 24) are removed.
+                ## --dry-run lists them without removing
+## - sidecars: Writes the missing and stale binary sidecars of the json files, ex. after the json files are edited
+                ## by hand or for the assets saved before the sidecars
+## - --trace <file.json> writes the timings of the command as a Chrome trace (open in chrome://tracing or Perfetto),
+                ## --profile prints the summary table of them
+
+## PROFILING:
+## - Library operations (scan, json read/parse, catalog, copies, mirror, exports, previews, thumbnails) are timed in
+                ## spans by the PROFILER. Spans cost next to nothing while it is disabled. Set ASSETLIBRARY_PROFILE=1 to
+                ## enable it from the start, or use the Performance Report of the UI.
+
+## METADATA:
+## - Asset json files are written indented by the json module. They are read with orjson or ujson when one of them is
+                ## installed, ASSETLIBRARY_JSON=json|orjson|ujson picks one.
+## - When the msgpack package (with its C extension) is installed, each export writes a binary sidecar
+                ## (<asset name>.mpk, msgpack format) next to the json and scans read it instead of the json while it is
+                ## fresh (made from the current mtime and size of the json). Without it the pure python decoder is
+                ## slower than the json parsers, sidecars are neither written nor read. Run the sidecars command once
+                ## for the assets saved before them, or by the sessions without msgpack.
+
+#####################################################################################################################
+
+import json
+import io
+import collections
+import threading
+import stat
+import bisect
+import time
+import hashlib
+import shutil
+import uuid
+import functools
+import struct
+import array
+from multiprocessing.pool import ThreadPool
+import os, fnmatch
+import re
+import sys
+import sqlite3
+import argparse
+from shutil import copyfile
+import logging
+
+try:
+    from os import scandir
+except ImportError:
+    try:
+        # backport for python 2
+        from scandir import scandir
+    except ImportError:
+        scandir = None
+
+## optional faster json and msgpack decoders, the json module and the pure python sidecar decoder are used without them
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import ujson
+except ImportError:
+    ujson = None
+try:
+    import msgpack
+    if msgpack.Unpacker.__module__.endswith("fallback"):
+        # pure python build of the package, slower than the sidecar decoder here
+        msgpack = None
+except ImportError:
+    msgpack = None
+
+logger = logging.getLogger('AssetLibrary')
+
+CATALOG_FILE = "assetLibraryCatalog.db"
+LIBRARY_SETTINGS_FILE = "assetLibrarySettings.json" # Per library options, shared by everyone using the library
+TEXTURE_STORE_FOLDER = ".textureStore"
+CATALOG_VERSION = 4
+SCAN_THREADS = 8 # Number of workers listing the asset folders and reading json files
+COPY_THREADS = 4 # Number of parallel texture transfers
+MTIME_TOLERANCE = 2 # Seconds. File systems (FAT, some SMB servers) keep the mtime with a 2 second resolution
+MIRROR_MANIFEST = "mirrorManifest.json" # Sizes and last access times of the files in a local mirror
+MIRROR_SIZE_LIMIT = 20 * 1024 * 1024 * 1024 # Default size cap of the local mirror of a library in bytes
+PROFILE_EVENTS = 100000 # Number of the last spans the profiler keeps for the trace export, totals are kept for all
+SIDECAR_EXTENSION = ".mpk" # Binary sidecar of each asset json, <asset name>.mpk
+SIDECAR_MAGIC = b"ALM\x01" # First bytes of the sidecar files, the last one is the format version
+
+## Typed numeric fields of the assets as (json key, label). They are columns of the catalog index and the library can
+## be sorted by them. Assets saved before them get the values parsed from the legacy fields when they are read.
+NUMERIC_FIELDS = [
+    ("faces", "Faces"),
+    ("triangles", "Triangles"),
+    ("textureCount", "Texture Count"),
+    ("textureBytes", "Texture Size"),
+    ("boundingBoxSize", "Bounding Box Size"),
+    ("exportTime", "Export Time"),
+]
+
+## Short names of the fields for the search queries, ex. "tex:wood", "tri:<50000". Any json key works as a field too
+SEARCH_FIELDS = {
+    "name": "assetname",
+    "tex": "texturefiles",
+    "texture": "texturefiles",
+    "src": "sourceproject",
+    "project": "sourceproject",
+    "tag": "tags",
+    "face": "faces",
+    "tri": "triangles",
+    "tris": "triangles",
+    "texcount": "texturecount",
+    "texbytes": "texturebytes",
+    "size": "boundingboxsize",
+    "time": "exporttime",
+}
+
+## Defaults of the options in the assetLibrarySettings.json file of each library
+LIBRARY_DEFAULTS = {
+    # Keep the textures in a content addressed pool on the library root instead of each asset folder.
+    # Same texture used by many assets is stored once.
+    "textureStore": False,
+    # Name of one of the PREVIEW_PROFILES, or a dictionary overriding the values of the "base" profile
+    # ex. {"base": "fast", "shotSize": 2048}
+    "previewProfile": "full",
+}
+
+
+def find(pattern, path):
+    result = []
+    for root, dirs, files in os.walk(path):
+        for name in files:
+            if fnmatch.fnmatch(name, pattern):
+                result.append(os.path.join(root, name))
+    return result
+
+
+def listDirectory(path, extension=None, threads=1):
+    """
+    Lists the sub folders and files of the given path with their stats. Uses scandir where it is available, which
+    gets the stats together with the listing on Windows shares instead of an extra round trip for every entry.
+    Args:
+        path: (Unicode) Absolute path of the folder
+        extension: (String or Tuple) If given, only the files ending with it (or one of them) are listed
+        threads: (Int) Number of workers for the stat calls. Not used on Windows, where scandir has the stats
+
+    Returns:
+        (List) [(folder name, stat), ...], (List) [(file name, stat), ...]
+
+    """
+    dirs = []
+    files = []
+    if scandir is not None:
+        iterator = scandir(path)
+        try:
+            entries = [(entry, entry.is_dir()) for entry in iterator]
+        finally:
+            # releases the directory handle now instead of at the garbage collection
+            if hasattr(iterator, "close"):
+                iterator.close()
+        entries = [(entry, isDir) for entry, isDir in entries
+                   if isDir or extension is None or entry.name.endswith(extension)]
+        # stats come with the listing on Windows, elsewhere each one is a call of its own
+        stats = parallelMap(lambda item: item[0].stat(), entries, 1 if os.name == "nt" else threads)
+        for (entry, isDir), st in zip(entries, stats):
+            (dirs if isDir else files).append((entry.name, st))
+        return dirs, files
+    names = os.listdir(path)
+    stats = parallelMap(lambda name: os.stat(os.path.join(path, name)), names, threads)
+    for name, st in zip(names, stats):
+        if stat.S_ISDIR(st.st_mode):
+            dirs.append((name, st))
+        elif extension is None or name.endswith(extension):
+            files.append((name, st))
+    return dirs, files
+
+
+def parallelIter(function, items, threads):
+    """
+    Same as parallelMap but yields the results as they are ready, still in the same order with the items.
+    Remaining work is cancelled if the caller stops iterating.
+    Args:
+        function: (Function) Function to call with each item
+        items: (List) Items to process
+        threads: (Int) Number of workers. 1 or less runs serially on the calling thread
+
+    Returns:
+        (Generator) Results
+
+    """
+    if threads <= 1 or len(items) < 2:
+        for item in items:
+            yield function(item)
+        return
+    pool = ThreadPool(min(threads, len(items)))
+    try:
+        for result in pool.imap(function, items):
+            yield result
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def parallelMap(function, items, threads):
+    """
+    Same as map() but runs on a thread pool. Results are in the same order with the items.
+    Args:
+        function: (Function) Function to call with each item
+        items: (List) Items to process
+        threads: (Int) Number of workers. 1 or less runs serially on the calling thread
+
+    Returns:
+        (List) Results
+
+    """
+    if threads <= 1 or len(items) < 2:
+        return [function(item) for item in items]
+    pool = ThreadPool(min(threads, len(items)))
+    try:
+        return pool.map(function, items)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def numericFields(info):
+    """
+    Reads the typed numeric fields of an asset. Values missing in older assets are worked out from the legacy
+    fields where possible ('Faces/Trianges' string, textureFiles list, boundingBox).
+    Args:
+        info: (Dictionary) Json data of the asset
+
+    Returns:
+        (Dictionary) {json key of NUMERIC_FIELDS: number or None}
+
+    """
+    values = dict((key, info.get(key)) for key, label in NUMERIC_FIELDS)
+    if values["faces"] is None or values["triangles"] is None:
+        faces, slash, triangles = (u"%s" % info.get('Faces/Trianges', "")).partition("/")
+        if faces.strip().isdigit() and triangles.strip().isdigit():
+            values["faces"] = int(faces)
+            values["triangles"] = int(triangles)
+    if values["textureCount"] is None and isinstance(info.get('textureFiles'), list):
+        values["textureCount"] = len(info['textureFiles'])
+    if values["boundingBoxSize"] is None and info.get('boundingBox'):
+        values["boundingBoxSize"] = max(info['boundingBox'])
+    for key, value in values.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            values[key] = None
+    return values
+
+
+def replaceFile(source, destination):
+    """
+    Renames the source over the destination. Windows does not let rename overwrite an existing file.
+    Args:
+        source: (Unicode) Path of the new file
+        destination: (Unicode) Path to replace
+
+    Returns:
+        None
+
+    """
+    try:
+        os.rename(source, destination)
+    except OSError:
+        if not os.path.exists(destination):
+            raise
+        os.remove(destination)
+        os.rename(source, destination)
+
+
+def hashFile(path, chunkSize=1048576):
+    """
+    Args:
+        path: (Unicode) Absolute path of the file
+        chunkSize: (Int) Read size in bytes
+
+    Returns:
+        (String) sha1 hex digest of the file content
+
+    """
+    sha = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunkSize), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def textureBlobKey(path, digest):
+    """
+    Args:
+        path: (Unicode) Path of the texture
+        digest: (String) sha1 hex digest of the texture content
+
+    Returns:
+        (String) Key of the texture in the texture store, "<first 2 digits>/<rest of the digest><extension>"
+
+    """
+    return "%s/%s%s" % (digest[:2], digest[2:], os.path.splitext(path)[1].lower())
+
+
+## METADATA CODECS
+## json files are always written by the json module, indented and human readable. Reads go through decodeJson which
+## uses the fastest installed json backend. Next to each json file a binary sidecar (msgpack format behind a small
+## header holding the mtime and size of the json it was made from) is written, scans read it instead of the json
+## while it is fresh.
+_TEXT_TYPES = (type(u""), type(""))
+_INTEGER_TYPES = (int, type(2 ** 64))
+_SIDECAR_HEADER = struct.Struct(">4sdQ")
+_SIDECAR_STRINGS = {0xd9: struct.Struct(">B"), 0xda: struct.Struct(">H"), 0xdb: struct.Struct(">I")}
+_SIDECAR_BINARIES = {0xc4: struct.Struct(">B"), 0xc5: struct.Struct(">H"), 0xc6: struct.Struct(">I")}
+_SIDECAR_ARRAYS = {0xdc: struct.Struct(">H"), 0xdd: struct.Struct(">I")}
+_SIDECAR_MAPS = {0xde: struct.Struct(">H"), 0xdf: struct.Struct(">I")}
+_SIDECAR_NUMBERS = {
+    0xca: struct.Struct(">f"), 0xcb: struct.Struct(">d"),
+    0xcc: struct.Struct(">B"), 0xcd: struct.Struct(">H"), 0xce: struct.Struct(">I"), 0xcf: struct.Struct(">Q"),
+    0xd0: struct.Struct(">b"), 0xd1: struct.Struct(">h"), 0xd2: struct.Struct(">i"), 0xd3: struct.Struct(">q"),
+}
+## smallest integer formats of the encoder, (minimum, maximum, type byte, struct)
+_SIDECAR_INTEGERS = [
+    (0, 0xff, 0xcc, _SIDECAR_NUMBERS[0xcc]),
+    (0, 0xffff, 0xcd, _SIDECAR_NUMBERS[0xcd]),
+    (0, 0xffffffff, 0xce, _SIDECAR_NUMBERS[0xce]),
+    (0, 0xffffffffffffffff, 0xcf, _SIDECAR_NUMBERS[0xcf]),
+    (-0x80, 0x7f, 0xd0, _SIDECAR_NUMBERS[0xd0]),
+    (-0x8000, 0x7fff, 0xd1, _SIDECAR_NUMBERS[0xd1]),
+    (-0x80000000, 0x7fffffff, 0xd2, _SIDECAR_NUMBERS[0xd2]),
+    (-0x8000000000000000, 0x7fffffffffffffff, 0xd3, _SIDECAR_NUMBERS[0xd3]),
+]
+
+JSON_BACKENDS = collections.OrderedDict()
+if orjson is not None:
+    JSON_BACKENDS["orjson"] = orjson.loads
+if ujson is not None:
+    JSON_BACKENDS["ujson"] = ujson.loads
+JSON_BACKENDS["json"] = json.loads
+_jsonLoads = json.loads
+
+
+def setJsonBackend(name=None):
+    """
+    Selects the json backend of decodeJson
+    Args:
+        name: (String) One of the JSON_BACKENDS. If None, the ASSETLIBRARY_JSON environment variable or the fastest
+            installed one
+
+    Returns:
+        (String) Name of the selected backend
+
+    """
+    global _jsonLoads
+    name = name or os.getenv("ASSETLIBRARY_JSON") or list(JSON_BACKENDS)[0]
+    if name not in JSON_BACKENDS:
+        logger.warning("json backend %s is not installed, using %s" % (name, list(JSON_BACKENDS)[0]))
+        name = list(JSON_BACKENDS)[0]
+    _jsonLoads = JSON_BACKENDS[name]
+    return name
+
+
+def decodeJson(text):
+    """
+    Parses json text with the selected backend. Falls back to the json module for the values the accelerated
+    backends refuse (NaN, very large integers), which json.dump writes.
+    Args:
+        text: (Unicode) json text
+
+    Returns:
+        (Any) Parsed data
+
+    """
+    try:
+        return _jsonLoads(text)
+    except ValueError:
+        if _jsonLoads is json.loads:
+            raise
+        return json.loads(text)
+
+
+def sidecarPath(jsonPath):
+    """
+    Args:
+        jsonPath: (Unicode) Path or name of the json file of an asset
+
+    Returns:
+        (Unicode) Path or name of its binary sidecar
+
+    """
+    return os.path.splitext(jsonPath)[0] + SIDECAR_EXTENSION
+
+
+def isSidecarData(data):
+    """
+    Args:
+        data: (Unicode or Bytes) json text or the content of a sidecar file
+
+    Returns:
+        (Bool) True if it is the content of a sidecar file
+
+    """
+    return isinstance(data, bytes) and data[:4] == SIDECAR_MAGIC
+
+
+def _packValue(value, out):
+    if value is None:
+        out.append(0xc0)
+    elif value is True or value is False:
+        out.append(0xc3 if value else 0xc2)
+    elif isinstance(value, _INTEGER_TYPES):
+        if 0 <= value <= 0x7f or -0x20 <= value < 0:
+            out.append(value & 0xff)
+        else:
+            for minimum, maximum, code, packer in _SIDECAR_INTEGERS:
+                if minimum <= value <= maximum:
+                    out.append(code)
+                    out += packer.pack(value)
+                    break
+            else:
+                raise ValueError("Integer is too large for the sidecar: %s" % value)
+    elif isinstance(value, float):
+        out.append(0xcb)
+        out += _SIDECAR_NUMBERS[0xcb].pack(value)
+    elif isinstance(value, _TEXT_TYPES):
+        encoded = value.encode("utf-8") if isinstance(value, type(u"")) else value
+        if len(encoded) < 32:
+            out.append(0xa0 | len(encoded))
+        else:
+            for code, packer in sorted(_SIDECAR_STRINGS.items()):
+                if len(encoded) < 1 << (8 * packer.size):
+                    out.append(code)
+                    out += packer.pack(len(encoded))
+                    break
+        out += encoded
+    elif isinstance(value, (list, tuple)):
+        if len(value) < 16:
+            out.append(0x90 | len(value))
+        else:
+            code = 0xdc if len(value) <= 0xffff else 0xdd
+            out.append(code)
+            out += _SIDECAR_ARRAYS[code].pack(len(value))
+        for item in value:
+            _packValue(item, out)
+    elif isinstance(value, dict):
+        if len(value) < 16:
+            out.append(0x80 | len(value))
+        else:
+            code = 0xde if len(value) <= 0xffff else 0xdf
+            out.append(code)
+            out += _SIDECAR_MAPS[code].pack(len(value))
+        for key, item in value.items():
+            # keys become strings, the same way json.dump writes them
+            _packValue(key if isinstance(key, _TEXT_TYPES) else json.dumps(key), out)
+            _packValue(item, out)
+    else:
+        raise TypeError("%r cannot be written to the sidecar" % (value,))
+
+
+def _unpackValue(data, offset):
+    code = data[offset]
+    offset += 1
+    if code <= 0x7f:
+        return code, offset
+    if code >= 0xe0:
+        return code - 0x100, offset
+    if code >= 0xa0 and code <= 0xbf:
+        end = offset + (code & 0x1f)
+        return data[offset:end].decode("utf-8"), end
+    if code <= 0x9f:
+        length = code & 0x0f
+        if code >= 0x90:
+            value = []
+            for _ in range(length):
+                item, offset = _unpackValue(data, offset)
+                value.append(item)
+            return value, offset
+        value = {}
+        for _ in range(length):
+            key, offset = _unpackValue(data, offset)
+            value[key], offset = _unpackValue(data, offset)
+        return value, offset
+    if code == 0xc0:
+        return None, offset
+    if code == 0xc2 or code == 0xc3:
+        return code == 0xc3, offset
+    if code in _SIDECAR_NUMBERS:
+        packer = _SIDECAR_NUMBERS[code]
+        return packer.unpack_from(data, offset)[0], offset + packer.size
+    if code in _SIDECAR_STRINGS or code in _SIDECAR_BINARIES:
+        packer = _SIDECAR_STRINGS.get(code) or _SIDECAR_BINARIES[code]
+        start = offset + packer.size
+        end = start + packer.unpack_from(data, offset)[0]
+        if code in _SIDECAR_STRINGS:
+            return data[start:end].decode("utf-8"), end
+        return bytes(data[start:end]), end
+    if code in _SIDECAR_ARRAYS:
+        packer = _SIDECAR_ARRAYS[code]
+        length = packer.unpack_from(data, offset)[0]
+        offset += packer.size
+        value = []
+        for _ in range(length):
+            item, offset = _unpackValue(data, offset)
+            value.append(item)
+        return value, offset
+    if code in _SIDECAR_MAPS:
+        packer = _SIDECAR_MAPS[code]
+        length = packer.unpack_from(data, offset)[0]
+        offset += packer.size
+        value = {}
+        for _ in range(length):
+            key, offset = _unpackValue(data, offset)
+            value[key], offset = _unpackValue(data, offset)
+        return value, offset
+    raise ValueError("Unsupported type 0x%02x in the sidecar" % code)
+
+
+def encodeSidecar(info, jsonStat):
+    """
+    Packs the json data of an asset into the sidecar format. Encoded here instead of the msgpack package, so the
+    str values of Python 2 are written as text and the keys as strings, same as json.dump does.
+    Args:
+        info: (Dictionary) json data of the asset
+        jsonStat: (stat_result) Stat of the json file the data is written to
+
+    Returns:
+        (Bytes) Content of the sidecar file
+
+    """
+    out = bytearray(_SIDECAR_HEADER.pack(SIDECAR_MAGIC, jsonStat.st_mtime, jsonStat.st_size))
+    _packValue(info, out)
+    return bytes(out)
+
+
+def decodeSidecar(data):
+    """
+    Unpacks the content of a sidecar file, with the msgpack package if it is installed
+    Args:
+        data: (Bytes) Content of the sidecar file
+
+    Returns:
+        (Dictionary) json data of the asset
+
+    """
+    if not isSidecarData(data):
+        raise ValueError("Not a sidecar")
+    if msgpack is not None:
+        return msgpack.unpackb(data[_SIDECAR_HEADER.size:], raw=False)
+    try:
+        value, offset = _unpackValue(bytearray(data), _SIDECAR_HEADER.size)
+    except (IndexError, struct.error):
+        raise ValueError("Sidecar is truncated")
+    if offset != len(data):
+        raise ValueError("Sidecar has extra data")
+    return value
+
+
+def decodeMetadata(data):
+    """
+    Args:
+        data: (Unicode or Bytes) json text or the content of a sidecar file, as they are kept in the catalog index
+
+    Returns:
+        (Dictionary) json data of the asset
+
+    """
+    if isSidecarData(data):
+        return decodeSidecar(data)
+    return decodeJson(data)
+
+
+def readSidecar(path, jsonStat):
+    """
+    Reads a sidecar file if it is made from the current version of its json file
+    Args:
+        path: (Unicode) Path of the sidecar file
+        jsonStat: (stat_result) Current stat of the json file
+
+    Returns:
+        (Bytes) Content of the sidecar file, None if it is missing, unreadable or stale
+
+    """
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except (IOError, OSError):
+        return None
+    if len(data) < _SIDECAR_HEADER.size:
+        return None
+    magic, mtime, size = _SIDECAR_HEADER.unpack_from(data)
+    if magic != SIDECAR_MAGIC or mtime != jsonStat.st_mtime or size != jsonStat.st_size:
+        return None
+    return data
+
+
+def writeSidecar(jsonPath, info):
+    """
+    Writes the sidecar of a json file. The json file must be written first, the sidecar holds its mtime and size.
+    Args:
+        jsonPath: (Unicode) Path of the json file
+        info: (Dictionary) json data of the asset, as written to the json file
+
+    Returns:
+        (Unicode) Path of the sidecar file
+
+    """
+    path = sidecarPath(jsonPath)
+    tempPath = "%s.%s.tmp" % (path, uuid.uuid4().hex[:8])
+    with open(tempPath, 'wb') as f:
+        f.write(encodeSidecar(info, os.stat(jsonPath)))
+    replaceFile(tempPath, path)
+    return path
+
+
+setJsonBackend()
+
+
+## high resolution clock of the profiler spans
+if hasattr(time, "perf_counter"):
+    clock = time.perf_counter
+elif sys.platform == "win32":
+    clock = time.clock
+else:
+    clock = time.time
+
+
+class _nullSpan(object):
+    """Span handed out while the profiler is disabled, does nothing"""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def add(self, size=0, count=0):
+        pass
+
+
+_NULL_SPAN = _nullSpan()
+
+
+class _span(object):
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.size = 0
+        self.count = 0
+        self.start = None
+
+    def __enter__(self):
+        self.start = clock()
+        return self
+
+    def __exit__(self, *args):
+        self.profiler.record(self.name, self.start, clock() - self.start, self.size, self.count)
+        return False
+
+    def add(self, size=0, count=0):
+        """
+        Args:
+            size: (Int) Bytes moved by the operation
+            count: (Int) Number of the items (files, assets, nodes) processed by the operation
+        """
+        self.size += size
+        self.count += count
+
+
+class profiler(object):
+    """
+    Records the durations, moved bytes and item counts of the library operations. Totals are kept per operation
+    name, the last PROFILE_EVENTS spans are kept for the Chrome trace export. Thread safe.
+    Use the module level PROFILER through span() and profiled().
+    """
+    def __init__(self, enabled=False, maxEvents=PROFILE_EVENTS):
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.origin = clock()
+        ## (name, start, duration, size, count, thread id, thread name)
+        self.events = collections.deque(maxlen=maxEvents)
+        ## {name: [calls, total seconds, max seconds, size, count]}
+        self.totals = {}
+
+    def span(self, name):
+        """
+        Args:
+            name: (String) Operation name, "<category>.<operation>" ex. "json.parse"
+
+        Returns:
+            (Context Manager) Times the block. add() of it records the bytes and the item counts
+
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _span(self, name)
+
+    def record(self, name, start, duration, size=0, count=0):
+        thread = threading.current_thread()
+        with self.lock:
+            self.events.append((name, start, duration, size, count, thread.ident, thread.name))
+            totals = self.totals.get(name)
+            if totals is None:
+                totals = self.totals[name] = [0, 0.0, 0.0, 0, 0]
+            totals[0] += 1
+            totals[1] += duration
+            totals[2] = max(totals[2], duration)
+            totals[3] += size
+            totals[4] += count
+
+    def reset(self):
+        with self.lock:
+            self.origin = clock()
+            self.events.clear()
+            self.totals = {}
+
+    def summary(self):
+        """
+        Returns:
+            (List) [(name, calls, total seconds, max seconds, bytes, count), ...] longest total first
+
+        """
+        with self.lock:
+            rows = [(name,) + tuple(totals) for name, totals in self.totals.items()]
+        return sorted(rows, key=lambda row: (-row[2], row[0]))
+
+    def summaryText(self):
+        """
+        Returns:
+            (String) Summary as a plain text table
+
+        """
+        lines = ["%-28s %8s %12s %10s %10s %10s %8s" % ("Operation", "Calls", "Total ms", "Mean ms", "Max ms",
+                                                        "MB", "Count")]
+        for name, calls, total, longest, size, count in self.summary():
+            lines.append("%-28s %8d %12.1f %10.2f %10.2f %10.1f %8d" % (
+                name, calls, total * 1000, total * 1000 / calls, longest * 1000, size / 1048576.0, count))
+        return "\n".join(lines)
+
+    def chromeTrace(self):
+        """
+        Returns:
+            (Dictionary) Recorded spans in the Chrome trace event format
+
+        """
+        pid = os.getpid()
+        with self.lock:
+            events = list(self.events)
+            origin = self.origin
+        trace = []
+        threads = {}
+        for name, start, duration, size, count, threadId, threadName in events:
+            threads[threadId] = threadName
+            trace.append({
+                "name": name,
+                "cat": name.split(".")[0],
+                "ph": "X",
+                "ts": round((start - origin) * 1000000, 1),
+                "dur": round(duration * 1000000, 1),
+                "pid": pid,
+                "tid": threadId,
+                "args": {"bytes": size, "count": count},
+            })
+        for threadId, threadName in threads.items():
+            trace.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": threadId, "args": {"name": threadName}})
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def exportChromeTrace(self, path):
+        """
+        Writes the recorded spans as a Chrome trace, for chrome://tracing or ui.perfetto.dev
+        Args:
+            path: (Unicode) Path of the json file
+
+        Returns:
+            (Int) Number of the written spans
+
+        """
+        trace = self.chromeTrace()
+        with open(path, "w") as f:
+            json.dump(trace, f)
+        return len([event for event in trace["traceEvents"] if event["ph"] == "X"])
+
+
+PROFILER = profiler(enabled=bool(os.getenv("ASSETLIBRARY_PROFILE")))
+
+
+def span(name):
+    """
+    Times a block with the PROFILER, ex.
+        with span("json.read") as s:
+            s.add(size=len(data), count=1)
+    Args:
+        name: (String) Operation name
+
+    Returns:
+        (Context Manager) Span, or a shared no-op span if the profiler is disabled
+
+    """
+    return PROFILER.span(name)
+
+
+def profiled(name):
+    """
+    Decorator timing each call of the function with the PROFILER. Not for the generators, they return before
+    their work is done.
+    Args:
+        name: (String) Operation name
+
+    Returns:
+        (Function) Decorator
+
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not PROFILER.enabled:
+                return function(*args, **kwargs)
+            with PROFILER.span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class copyEngine(object):
+    """
+    Copies files on a bounded thread pool. Destinations which already have the same size and mtime with the
+    source are skipped, copied files get the mtime of the source (see keepMtime) so the next transfer can skip them.
+    """
+    def __init__(self, threads=COPY_THREADS, progress=None, keepMtime=True):
+        """
+        Args:
+            threads: (Int) Number of parallel transfers. Default is COPY_THREADS
+            progress: (Function) Called on the calling thread after each file with
+                (done count, total count, copied bytes, elapsed seconds)
+            keepMtime: (Bool) If False, copies keep the time they are written instead of the mtime of the source.
+                Default True
+        """
+        self.threads = threads
+        self.progress = progress
+        self.keepMtime = keepMtime
+        self.copiedFiles = 0
+        self.skippedFiles = 0
+        self.copiedBytes = 0
+        self.elapsed = 0.0
+
+    def run(self, jobs):
+        """
+        Copies the files. Results are yielded on the calling thread as each transfer is done, which makes it safe
+        to update the Maya scene in the loop. Each destination is written once, the jobs copying another source
+        onto a destination which is already taken are dropped with a warning.
+        Args:
+            jobs: (List) [(source path, destination path), ...]
+
+        Returns:
+            (Generator) (source path, destination path, copied) for each kept job. copied is False if it is skipped
+
+        """
+        unique = collections.OrderedDict()
+        for source, destination in jobs:
+            key = os.path.normcase(os.path.normpath(destination))
+            if key not in unique:
+                unique[key] = (source, destination)
+            elif os.path.normcase(os.path.normpath(unique[key][0])) != os.path.normcase(os.path.normpath(source)):
+                logger.warning("%s is not copied, %s is copied to the same destination %s" % (
+                    source, unique[key][0], destination))
+        jobs = list(unique.values())
+        start = time.time()
+        if self.threads <= 1 or len(jobs) < 2:
+            results = (self._copy(job) for job in jobs)
+            pool = None
+        else:
+            pool = ThreadPool(min(self.threads, len(jobs)))
+            results = pool.imap_unordered(self._copy, jobs)
+        try:
+            for done, (source, destination, size) in enumerate(results, 1):
+                if size is None:
+                    self.skippedFiles += 1
+                else:
+                    self.copiedFiles += 1
+                    self.copiedBytes += size
+                self.elapsed = time.time() - start
+                if self.progress is not None:
+                    self.progress(done, len(jobs), self.copiedBytes, self.elapsed)
+                yield source, destination, size is not None
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+        if jobs:
+            logger.info("Copied %s files (%.1f MB, %.1f MB/s), skipped %s up to date files" % (
+                self.copiedFiles, self.copiedBytes / 1048576.0, self.throughput() / 1048576.0, self.skippedFiles))
+
+    def throughput(self):
+        """
+        Returns:
+            (Float) Copied bytes per second
+
+        """
+        if not self.elapsed:
+            return 0.0
+        return self.copiedBytes / self.elapsed
+
+    def _copy(self, job):
+        source, destination = job
+        sourceStat = os.stat(source)
+        if self.isUpToDate(sourceStat, destination):
+            return source, destination, None
+        with span("copy.file") as s:
+            copyfile(source, destination)
+            if self.keepMtime:
+                os.utime(destination, (sourceStat.st_atime, sourceStat.st_mtime))
+            s.add(size=sourceStat.st_size, count=1)
+        return source, destination, sourceStat.st_size
+
+    @staticmethod
+    def isUpToDate(sourceStat, destination):
+        """
+        Args:
+            sourceStat: (stat_result) Stat of the source file
+            destination: (Unicode) Destination path
+
+        Returns:
+            (Bool) True if the destination has the same size and mtime with the source
+
+        """
+        try:
+            destinationStat = os.stat(destination)
+        except OSError:
+            return False
+        return destinationStat.st_size == sourceStat.st_size and \
+               abs(destinationStat.st_mtime - sourceStat.st_mtime) < MTIME_TOLERANCE
+
+
+class mirrorCache(object):
+    """
+    Local read-through copy of a library which lives on a network share. Files are checked against the library by
+    size and mtime before they are used and fetched again if they are changed. The mirror is kept under its size
+    limit by removing the least recently used files.
+    """
+    def __init__(self, directory, libraryDirectory, limit=MIRROR_SIZE_LIMIT):
+        """
+        Args:
+            directory: (Unicode) Local folder for the mirrors. Each library gets its own sub folder in it
+            libraryDirectory: (Unicode) Root of the library
+            limit: (Int) Size cap of the mirror in bytes
+        """
+        self.libraryDirectory = libraryDirectory
+        libraryKey = os.path.normcase(os.path.abspath(libraryDirectory))
+        if not isinstance(libraryKey, bytes):
+            libraryKey = libraryKey.encode("utf-8")
+        folderName = "%s_%s" % (os.path.basename(os.path.normpath(libraryDirectory)),
+                                hashlib.sha1(libraryKey).hexdigest()[:8])
+        self.directory = os.path.join(directory, folderName)
+        self.limit = limit
+        self.manifestPath = os.path.join(self.directory, MIRROR_MANIFEST)
+        self.lock = threading.Lock()
+        ## {"assetName/file.ext": [size, last access time]}
+        self.entries = {}
+        self.load()
+
+    def load(self):
+        self.entries = {}
+        if not os.path.isfile(self.manifestPath):
+            return
+        try:
+            with open(self.manifestPath, 'r') as f:
+                self.entries = json.load(f)
+        except (IOError, ValueError) as e:
+            logger.warning("Cannot read the mirror manifest %s, starting over (%s)" % (self.manifestPath, e))
+
+    def save(self):
+        with self.lock:
+            entries = dict(self.entries)
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        tempPath = "%s.%s.tmp" % (self.manifestPath, uuid.uuid4().hex[:8])
+        with open(tempPath, "w") as f:
+            json.dump(entries, f)
+        replaceFile(tempPath, self.manifestPath)
+
+    def localPath(self, relative):
+        return os.path.join(self.directory, *relative.split("/"))
+
+    def remotePath(self, relative):
+        return os.path.join(self.libraryDirectory, *relative.split("/"))
+
+    def cached(self, relative):
+        """
+        Args:
+            relative: (Unicode) Path relative to the library root, separated with "/"
+
+        Returns:
+            (Unicode) Path of the mirrored copy without checking it against the library, None if it is not mirrored
+
+        """
+        if relative not in self.entries:
+            return None
+        return self.localPath(relative)
+
+    def fetch(self, relatives, threads=COPY_THREADS):
+        """
+        Brings the files up to date in the mirror and marks them as used. If the library cannot be reached the last
+        mirrored copies are used.
+        Args:
+            relatives: (List) Paths relative to the library root, separated with "/"
+            threads: (Int) Number of parallel transfers
+
+        Returns:
+            (List) Local paths in the same order, None for the files which are neither in the library nor mirrored
+
+        """
+        paths = parallelMap(self._fetch, list(relatives), threads)
+        self.evict(keep=set(relative for relative, path in zip(relatives, paths) if path))
+        try:
+            self.save()
+        except (IOError, OSError) as e:
+            logger.warning("Cannot write the mirror manifest %s (%s)" % (self.manifestPath, e))
+        return paths
+
+    def invalidate(self, relatives):
+        """
+        Drops the mirrored copies of the files, or of everything under the folders, so they are read from the
+        library until they are fetched again
+        Args:
+            relatives: (List) Paths of files or folders relative to the library root, separated with "/"
+
+        Returns:
+            (Int) Number of dropped files
+
+        """
+        files = set(relatives)
+        folders = tuple("%s/" % relative.rstrip("/") for relative in relatives)
+        with self.lock:
+            dropped = [relative for relative in self.entries if relative in files or relative.startswith(folders)]
+            for relative in dropped:
+                del self.entries[relative]
+        if not dropped:
+            return 0
+        for relative in dropped:
+            try:
+                os.remove(self.localPath(relative))
+            except OSError:
+                pass
+        try:
+            self.save()
+        except (IOError, OSError) as e:
+            logger.warning("Cannot write the mirror manifest %s (%s)" % (self.manifestPath, e))
+        return len(dropped)
+
+    def evict(self, keep=()):
+        """
+        Removes the least recently used files until the mirror is under its size limit
+        Args:
+            keep: (Set) Relative paths which must stay, ex. the files which are just fetched
+
+        Returns:
+            (Int) Number of removed files
+
+        """
+        removed = 0
+        with self.lock:
+            total = sum(size for size, accessed in self.entries.values())
+            if total <= self.limit:
+                return 0
+            for relative, (size, accessed) in sorted(self.entries.items(), key=lambda item: item[1][1]):
+                if total <= self.limit:
+                    break
+                if relative in keep:
+                    continue
+                try:
+                    os.remove(self.localPath(relative))
+                except OSError:
+                    pass
+                del self.entries[relative]
+                total -= size
+                removed += 1
+        if removed:
+            logger.info("Removed %s least recently used files from the mirror %s" % (removed, self.directory))
+        return removed
+
+    def usage(self):
+        """
+        Returns:
+            (Int) Total size of the mirrored files in bytes
+
+        """
+        with self.lock:
+            return sum(size for size, accessed in self.entries.values())
+
+    def _fetch(self, relative):
+        localPath = self.localPath(relative)
+        try:
+            remoteStat = os.stat(self.remotePath(relative))
+        except OSError:
+            if relative in self.entries and os.path.isfile(localPath):
+                # library is not reachable, last copy is better than nothing
+                self._touch(relative, self.entries[relative][0])
+                return localPath
+            return None
+        if not copyEngine.isUpToDate(remoteStat, localPath):
+            try:
+                self._download(relative, remoteStat)
+            except (IOError, OSError) as e:
+                logger.warning("Cannot mirror %s (%s)" % (self.remotePath(relative), e))
+                return None
+        self._touch(relative, remoteStat.st_size)
+        return localPath
+
+    def _download(self, relative, remoteStat):
+        localPath = self.localPath(relative)
+        folder = os.path.dirname(localPath)
+        if not os.path.isdir(folder):
+            try:
+                os.makedirs(folder)
+            except OSError:
+                # made by another worker in the meantime
+                if not os.path.isdir(folder):
+                    raise
+        # readers never see a half copied file
+        tempPath = "%s.%s.tmp" % (localPath, uuid.uuid4().hex[:8])
+        try:
+            with span("mirror.download") as s:
+                copyfile(self.remotePath(relative), tempPath)
+                os.utime(tempPath, (remoteStat.st_atime, remoteStat.st_mtime))
+                replaceFile(tempPath, localPath)
+                s.add(size=remoteStat.st_size, count=1)
+        except:
+            if os.path.exists(tempPath):
+                os.remove(tempPath)
+            raise
+
+    def _touch(self, relative, size):
+        with self.lock:
+            self.entries[relative] = [size, time.time()]
+
+
+class catalogIndex(object):
+    """
+    Persistent index of the asset json files which lives on the library root (assetLibraryCatalog.db).
+    Entries are keyed by the asset folder and hold the folder mtime and the mtime, size and content of every
+    json file inside, so a warm scan only needs to stat the files instead of reading them over the network.
+    """
+    def __init__(self, directory):
+        self.path = os.path.join(directory, CATALOG_FILE)
+        self.connection = None
+
+    def open(self):
+        """
+        Opens (and creates if necessary) the index database. If the database cannot be used (read-only share,
+        locked or corrupted file) the index is disabled and scan falls back to reading the json files.
+
+        Returns:
+            (Bool) True if the index is usable
+
+        """
+        try:
+            self.connection = sqlite3.connect(self.path, timeout=10)
+            cursor = self.connection.cursor()
+            cursor.execute("PRAGMA user_version")
+            version = cursor.fetchone()[0]
+            if version != CATALOG_VERSION:
+                cursor.execute("DROP TABLE IF EXISTS folders")
+                cursor.execute("DROP TABLE IF EXISTS assets")
+                cursor.execute("CREATE TABLE folders (folder TEXT PRIMARY KEY, mtime REAL)")
+                ## data is the json text, or the sidecar content (blob) if the asset was read from its sidecar
+                cursor.execute("CREATE TABLE assets (folder TEXT, jsonFile TEXT, mtime REAL, size INTEGER, data TEXT, "
+                               "PRIMARY KEY (folder, jsonFile))")
+                cursor.execute("PRAGMA user_version = %s" % CATALOG_VERSION)
+                self.connection.commit()
+            return True
+        except sqlite3.Error as e:
+            logger.warning("Catalog index is not available, scanning without it: %s (%s)" % (self.path, e))
+            self.close()
+            return False
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    @profiled("catalog.load")
+    def load(self):
+        """
+        Reads the whole index. If it cannot be read (corrupted pages, locked for longer than the timeout) the index
+        is disabled and nothing is returned, so scan reads all the json files.
+        Returns:
+            (Dictionary) {folder: (folderMtime, [(jsonFile, mtime, size, data), ...])}
+
+        """
+        entries = {}
+        if self.connection is None:
+            return entries
+        try:
+            cursor = self.connection.cursor()
+            for folder, mtime in cursor.execute("SELECT folder, mtime FROM folders"):
+                entries[folder] = (mtime, [])
+            for folder, jsonFile, mtime, size, data in cursor.execute(
+                    "SELECT folder, jsonFile, mtime, size, data FROM assets ORDER BY rowid"):
+                if folder in entries:
+                    if not isinstance(data, (bytes, type(u""))):
+                        # blobs come as buffer on Python 2
+                        data = bytes(data)
+                    entries[folder][1].append((jsonFile, mtime, size, data))
+        except sqlite3.Error as e:
+            logger.warning("Catalog index cannot be read, scanning without it: %s (%s)" % (self.path, e))
+            self.close()
+            return {}
+        return entries
+
+    @profiled("catalog.update")
+    def update(self, changed, removed):
+        """
+        Writes the changed folders and drops the removed ones in a single transaction
+        Args:
+            changed: (Dictionary) {folder: (folderMtime, [(jsonFile, mtime, size, data), ...])}
+            removed: (List) folder names which are not in the library anymore
+
+        Returns:
+            None
+
+        """
+        if self.connection is None or not (changed or removed):
+            return
+        try:
+            with self.connection:
+                for folder in list(changed) + list(removed):
+                    self.connection.execute("DELETE FROM folders WHERE folder=?", (folder,))
+                    self.connection.execute("DELETE FROM assets WHERE folder=?", (folder,))
+                for folder, (folderMtime, jsonEntries) in changed.items():
+                    self.connection.execute("INSERT INTO folders VALUES (?, ?)", (folder, folderMtime))
+                    for jsonFile, mtime, size, data in jsonEntries:
+                        if isinstance(data, bytes):
+                            data = sqlite3.Binary(data)
+                        self.connection.execute("INSERT INTO assets VALUES (?, ?, ?, ?, ?)",
+                                                (folder, jsonFile, mtime, size, data))
+        except sqlite3.Error as e:
+            logger.warning("Catalog index could not be updated: %s (%s)" % (self.path, e))
+            self.close()
+
+
+class searchIndex(object):
+    """
+    In memory inverted index over all the json fields of the assets. Words are indexed for the prefix and fuzzy
+    lookups, numbers are kept sorted per field for the range queries. Assets are added and removed one by one
+    as the library changes. See the MAIN MENU notes for the query syntax.
+    """
+    WORD_PATTERN = re.compile(r"[^\W_]+", re.UNICODE)
+    CAMEL_PATTERN = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|[0-9]+")
+    NUMBER_PATTERN = re.compile(r"^(<=|>=|<|>|=)?(-?[0-9]+(?:\.[0-9]+)?)$")
+    RANGE_PATTERN = re.compile(r"^(-?[0-9]+(?:\.[0-9]+)?)\.\.(-?[0-9]+(?:\.[0-9]+)?)$")
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            ## {word: asset id, or sorted array(asset ids) if more than one asset has the word} of all fields, and of
+            ## each field. Most words are in many assets, an array of ids is a fraction of a set of names
+            self.postings = {}
+            self.fieldPostings = {}
+            ## sorted words for the prefix lookups
+            self.words = []
+            self.fieldWords = {}
+            ## {field: ([sorted values], [asset ids in the same order])}
+            self.numbers = {}
+            ## single copy of each word and field name, shared by the postings, the sorted lists and the documents
+            self.interned = {}
+            ## {name: (asset id, (field, word count, word, ..., field, word count, word, ...), (field, value, ...))}
+            ## to remove an asset. One flat tuple of the interned words instead of a set for each field
+            self.documents = {}
+            ## name of each asset id, None for the ids of the removed assets, they are given again
+            self.names = []
+            self.freeIds = []
+            ## new words and numbers are sorted in when the index is used, keeps adding many assets fast.
+            ## {id(sorted words): (sorted words, [new words])}, {field: ([new values], [asset ids])}
+            self.pendingWords = {}
+            self.pendingNumbers = {}
+
+    def add(self, name, info):
+        """
+        Indexes the asset, replacing the previous entry of the same name
+        Args:
+            name: (Unicode) Name of the asset
+            info: (Dictionary) Json data of the asset
+
+        Returns:
+            None
+
+        """
+        texts = {}
+        numbers = set()
+        for field, value in self.fields(info):
+            if isinstance(value, bool):
+                continue
+            if isinstance(value, (int, float)):
+                numbers.add((field, value))
+                value = str(value)
+            texts.setdefault(field, []).append(value)
+        # one tokenize call per field, the words of a field are indexed once however many values it has
+        words = dict((field, self.tokenize(u" ".join(values))) for field, values in texts.items())
+        with self.lock:
+            self.remove(name)
+            if self.freeIds:
+                assetId = self.freeIds.pop()
+                self.names[assetId] = name
+            else:
+                assetId = len(self.names)
+                self.names.append(name)
+            intern = self.interned.setdefault
+            document = []
+            allWords = set()
+            for field, fieldWords in words.items():
+                field = intern(field, field)
+                fieldWords = [intern(word, word) for word in fieldWords]
+                allWords.update(fieldWords)
+                self._post(self.fieldPostings.setdefault(field, {}), self.fieldWords.setdefault(field, []),
+                           fieldWords, assetId)
+                document += [field, len(fieldWords)] + fieldWords
+            self._post(self.postings, self.words, allWords, assetId)
+            documentNumbers = []
+            for field, value in numbers:
+                field = intern(field, field)
+                values, ids = self.pendingNumbers.setdefault(field, ([], []))
+                values.append(value)
+                ids.append(assetId)
+                documentNumbers += [field, value]
+            self.documents[name] = (assetId, tuple(document), tuple(documentNumbers))
+
+    def remove(self, name):
+        """
+        Drops the asset from the index. Does nothing if it is not indexed.
+        Args:
+            name: (Unicode) Name of the asset
+
+        Returns:
+            None
+
+        """
+        with self.lock:
+            document = self.documents.pop(name, None)
+            if document is None:
+                return
+            self._flush()
+            assetId, words, numbers = document
+            allWords = set()
+            row = 0
+            while row < len(words):
+                field, count = words[row], words[row + 1]
+                fieldWords = words[row + 2:row + 2 + count]
+                allWords.update(fieldWords)
+                self._unpost(self.fieldPostings[field], self.fieldWords[field], fieldWords, assetId)
+                row += 2 + count
+            self._unpost(self.postings, self.words, allWords, assetId)
+            for word in allWords:
+                if word not in self.postings and word not in self.fieldPostings:
+                    del self.interned[word]
+            for row in range(0, len(numbers), 2):
+                field, value = numbers[row], numbers[row + 1]
+                values, ids = self.numbers[field]
+                row = bisect.bisect_left(values, value)
+                row = bisect.bisect_left(ids, assetId, row, bisect.bisect_right(values, value))
+                del values[row]
+                del ids[row]
+            self.names[assetId] = None
+            self.freeIds.append(assetId)
+
+    def search(self, query):
+        """
+        Args:
+            query: (Unicode) Search query. Every word of it must match
+
+        Returns:
+            (Set) Names of the matching assets
+
+        """
+        with self.lock:
+            self._flush()
+            result = None
+            for term in query.split():
+                matches = self._match(term)
+                result = matches if result is None else result & matches
+                if not result:
+                    break
+            if result is None:
+                return set(self.documents)
+            return set(map(self.names.__getitem__, result))
+
+    def fields(self, info):
+        """
+        Flattens the json data of an asset. Nested values are listed under their top level key.
+        Args:
+            info: (Dictionary) Json data of the asset
+
+        Returns:
+            (List) [(lower case field name, value), ...]
+
+        """
+        items = []
+        for key, value in info.items():
+            field = key.lower()
+            stack = [value]
+            while stack:
+                value = stack.pop()
+                if isinstance(value, dict):
+                    stack.extend(value.keys())
+                    stack.extend(value.values())
+                elif isinstance(value, (list, tuple)):
+                    stack.extend(value)
+                elif value is not None:
+                    items.append((field, value))
+        ## typed fields worked out from the legacy ones
+        for key, value in numericFields(info).items():
+            if value is not None and key not in info:
+                items.append((key.lower(), value))
+        return items
+
+    def tokenize(self, text, parts=True):
+        """
+        Splits the text into lower case words
+        Args:
+            text: (Unicode) Text to split
+            parts: (Bool) If True, camelCase and letter/digit mixed words are listed in parts too ("woodPlank01" is
+                also "wood", "plank" and "01"). Queries are not split, "asset04" must not match every "asset"
+
+        Returns:
+            (Set) Words
+
+        """
+        lowered = text.lower()
+        words = set(self.WORD_PATTERN.findall(lowered))
+        if parts:
+            if lowered == text:
+                words.update(self.CAMEL_PATTERN.findall(text))
+            else:
+                words.update(piece.lower() for piece in self.CAMEL_PATTERN.findall(text))
+        return words
+
+    def _match(self, term):
+        field, colon, value = term.partition(":")
+        if colon:
+            field = field.lower()
+            field = SEARCH_FIELDS.get(field, field)
+        else:
+            field, value = None, term
+        if field is not None and field in self.numbers:
+            matches = self._matchNumber(field, value)
+            if matches is not None:
+                return matches
+        if field is None:
+            postings, words = self.postings, self.words
+        elif field in self.fieldPostings:
+            postings, words = self.fieldPostings[field], self.fieldWords[field]
+        else:
+            return set()
+
+        fuzzy = value.endswith("~")
+        result = None
+        for word in self.tokenize(value.rstrip("~"), parts=False):
+            if fuzzy:
+                matches = self._matchFuzzy(postings, words, word)
+            else:
+                matches = self._matchPrefix(postings, words, word)
+            result = matches if result is None else result & matches
+        return result if result is not None else set()
+
+    def _matchPrefix(self, postings, words, prefix):
+        matches = set()
+        row = bisect.bisect_left(words, prefix)
+        while row < len(words) and words[row].startswith(prefix):
+            matches.update(self._ids(postings[words[row]]))
+            row += 1
+        return matches
+
+    def _matchFuzzy(self, postings, words, word):
+        distance = 1 if len(word) <= 4 else 2
+        matches = set()
+        ## typos on the first letter are rare, it keeps the candidates few
+        start = bisect.bisect_left(words, word[0])
+        end = bisect.bisect_left(words, word[0] + u"\uffff")
+        for candidate in words[start:end]:
+            if abs(len(candidate) - len(word)) <= distance and \
+                    self._editDistance(word, candidate, distance) <= distance:
+                matches.update(self._ids(postings[candidate]))
+        return matches
+
+    def _matchNumber(self, field, value):
+        values, ids = self.numbers[field]
+        match = self.RANGE_PATTERN.match(value)
+        if match:
+            start = bisect.bisect_left(values, float(match.group(1)))
+            end = bisect.bisect_right(values, float(match.group(2)))
+            return set(ids[start:end])
+        match = self.NUMBER_PATTERN.match(value)
+        if not match:
+            return None
+        operator, number = match.group(1) or "=", float(match.group(2))
+        if operator == "<":
+            return set(ids[:bisect.bisect_left(values, number)])
+        if operator == "<=":
+            return set(ids[:bisect.bisect_right(values, number)])
+        if operator == ">":
+            return set(ids[bisect.bisect_right(values, number):])
+        if operator == ">=":
+            return set(ids[bisect.bisect_left(values, number):])
+        return set(ids[bisect.bisect_left(values, number):bisect.bisect_right(values, number)])
+
+    @staticmethod
+    def _editDistance(a, b, limit):
+        previous = list(range(len(b) + 1))
+        for i, charA in enumerate(a, 1):
+            current = [i]
+            for j, charB in enumerate(b, 1):
+                current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (charA != charB)))
+            if min(current) > limit:
+                return limit + 1
+            previous = current
+        return previous[-1]
+
+    def _flush(self):
+        for words, newWords in self.pendingWords.values():
+            if len(newWords) < 64:
+                for word in newWords:
+                    bisect.insort(words, word)
+            else:
+                words += newWords
+                words.sort()
+        self.pendingWords = {}
+
+        for field, (newValues, newIds) in self.pendingNumbers.items():
+            values, ids = self.numbers.setdefault(field, ([], []))
+            if len(newValues) < 64:
+                for value, assetId in zip(newValues, newIds):
+                    row = bisect.bisect_left(values, value)
+                    row = bisect.bisect_left(ids, assetId, row, bisect.bisect_right(values, value))
+                    values.insert(row, value)
+                    ids.insert(row, assetId)
+            else:
+                items = sorted(list(zip(values, ids)) + list(zip(newValues, newIds)))
+                values[:] = [value for value, assetId in items]
+                ids[:] = [assetId for value, assetId in items]
+        self.pendingNumbers = {}
+
+    @staticmethod
+    def _ids(posting):
+        return posting if isinstance(posting, array.array) else (posting,)
+
+    def _post(self, postings, sortedWords, words, assetId):
+        newWords = None
+        for word in words:
+            ids = postings.get(word)
+            if ids is None:
+                # words of a single asset (its name, numbers...) keep the id itself instead of an array
+                postings[word] = assetId
+                if newWords is None:
+                    newWords = self.pendingWords.setdefault(id(sortedWords), (sortedWords, []))[1]
+                newWords.append(word)
+            elif isinstance(ids, array.array):
+                if ids[-1] < assetId:
+                    ids.append(assetId)
+                else:
+                    bisect.insort(ids, assetId)
+            elif ids != assetId:
+                postings[word] = array.array("i", sorted((ids, assetId)))
+
+    @staticmethod
+    def _unpost(postings, sortedWords, words, assetId):
+        for word in words:
+            ids = postings[word]
+            if isinstance(ids, array.array):
+                del ids[bisect.bisect_left(ids, assetId)]
+                if len(ids) == 1:
+                    postings[word] = ids[0]
+                continue
+            del postings[word]
+            del sortedWords[bisect.bisect_left(sortedWords, word)]
+
+
+## marks a light field which is not in the json of the asset
+_MISSING = object()
+## shared tuples of the heavy field names, most assets have the same ones
+_HEAVY_KEYS = {}
+
+
+class assetRecord(object):
+    """
+    Compact read only stand-in for the json data of an asset. The fields the view needs (names of the asset files
+    and the numeric fields) are kept in slots, the rest of the json (textureFiles, sourceProject, extra info...) is
+    read back from the json file on the first access to one of them. Works like the json dictionary otherwise.
+    """
+    LIGHT_FIELDS = ("assetName", "objPath", "maPath", "thumbPath", "ssPath", "swPath") + \
+                   tuple(key for key, label in NUMERIC_FIELDS)
+    __slots__ = LIGHT_FIELDS + ("_library", "_path", "_heavyKeys", "_heavy")
+
+    def __init__(self, library, path, data):
+        """
+        Args:
+            library: (libraryCore) Library of the asset, the json file is read from the library itself, not from
+                the local mirror, so the fields are as fresh as the light ones
+            path: (Unicode) Path of the json file relative to the library root, "<folder>/<json file>"
+            data: (Dictionary) Json data of the asset
+        """
+        for key in self.LIGHT_FIELDS:
+            setattr(self, key, data.get(key, _MISSING))
+        heavyKeys = tuple(sorted(key for key in data if key not in self.LIGHT_FIELDS))
+        self._heavyKeys = _HEAVY_KEYS.setdefault(heavyKeys, heavyKeys)
+        self._library = library
+        self._path = path
+        self._heavy = None
+
+    def __getitem__(self, key):
+        if key in self.LIGHT_FIELDS:
+            value = getattr(self, key)
+            if value is _MISSING:
+                raise KeyError(key)
+            return value
+        if key not in self._heavyKeys:
+            raise KeyError(key)
+        return self._load()[key]
+
+    def __setitem__(self, key, value):
+        if key in self.LIGHT_FIELDS:
+            setattr(self, key, value)
+            return
+        heavy = self._load()
+        heavy[key] = value
+        if key not in self._heavyKeys:
+            self._heavyKeys = tuple(sorted(self._heavyKeys + (key,)))
+
+    def __contains__(self, key):
+        if key in self.LIGHT_FIELDS:
+            return getattr(self, key) is not _MISSING
+        return key in self._heavyKeys
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return [key for key in self.LIGHT_FIELDS if getattr(self, key) is not _MISSING] + list(self._heavyKeys)
+
+    def values(self):
+        return [self[key] for key in self.keys()]
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def loaded(self):
+        """
+        Returns:
+            (Dictionary) Fields which are in the memory, without reading the json file
+
+        """
+        data = dict((key, getattr(self, key)) for key in self.LIGHT_FIELDS if getattr(self, key) is not _MISSING)
+        data.update(self._heavy or {})
+        return data
+
+    def _load(self):
+        heavy = self._heavy
+        if heavy is None:
+            with span("json.reload") as s:
+                path = os.path.join(self._library.directory, *self._path.split("/"))
+                try:
+                    data = self._library.readMetadata(path)
+                except (IOError, OSError, ValueError) as e:
+                    # nothing is cached, the next access tries again
+                    raise IOError("Cannot read the json file %s (%s)" % (path, e))
+                s.add(count=1)
+            heavy = dict((key, data[key]) for key in self._heavyKeys if key in data)
+            self._heavy = heavy
+        return heavy
+
+
+class libraryCore(dict):
+    """
+    File system side of an asset library: scanning, indexes, texture store, local mirror and maintenance.
+    Holds {asset name: json data} of the scanned assets, as assetRecords if compactRecords is True.
+    """
+    ## keep the assets as compact assetRecords instead of the whole json data. The maintenance tools read every
+    ## field anyway, the Maya UI only needs a few of them for most of the assets.
+    compactRecords = False
+    ## write the binary sidecars on export and read them instead of the json files while they are fresh. Only pays off
+    ## with the C extension of the msgpack package, the pure python decoder is slower than the json module.
+    useSidecars = msgpack is not None
+
+    def __init__(self, directory, mirror=None, mirrorLimit=MIRROR_SIZE_LIMIT):
+        self.directory=directory
+        self.scanned = False
+        self.options = self.loadOptions()
+        ## {folder: (folderMtime, [(jsonFile, mtime, size), ...], [asset names])} as of the last scan / update
+        self.folderState = {}
+        ## asset folders which could not be read on the last scan
+        self.scanErrors = []
+        ## inverted index over the json fields of the assets for the search filter
+        self.searchIndex = searchIndex()
+        ## local read-through copy of the library, None if it is not enabled
+        self.mirror = None
+        self.setMirror(mirror, mirrorLimit)
+        if not os.path.exists(directory):
+            logger.error("Cannot reach the library directory: \n" + directory)
+
+    def setMirror(self, directory, limit=MIRROR_SIZE_LIMIT):
+        """
+        Enables or disables the local mirror of the library
+        Args:
+            directory: (Unicode) Local folder for the mirrors. None disables the mirror
+            limit: (Int) Size cap of the mirror in bytes
+
+        Returns:
+            None
+
+        """
+        self.mirror = mirrorCache(directory, self.directory, limit) if directory else None
+
+    def readPath(self, relative):
+        """
+        Path to read a library file from without touching the library if the file is mirrored (thumbnails). Mirrored
+        copies are dropped when updateFolders() re-reads their asset folder, so the changes of this session and
+        the ones picked up by the watcher are read from the library. Anything else is refreshed by syncMirror().
+        Args:
+            relative: (Unicode) Path relative to the library root, separated with "/"
+
+        Returns:
+            (Unicode) Absolute path of the mirrored copy if there is one, or the file in the library
+
+        """
+        if self.mirror is not None:
+            localPath = self.mirror.cached(relative)
+            if localPath is not None:
+                return localPath
+        return os.path.join(self.directory, *relative.split("/"))
+
+    def localFiles(self, paths, threads=COPY_THREADS):
+        """
+        Fetches the library files into the local mirror. Without a mirror, the paths are returned as they are.
+        Args:
+            paths: (List) Absolute paths of the files in the library
+            threads: (Int) Number of parallel transfers
+
+        Returns:
+            (List) Paths to read the files from, in the same order. Up to date mirrored copies where possible
+
+        """
+        if self.mirror is None:
+            return list(paths)
+        relatives = []
+        for path in paths:
+            try:
+                relative = os.path.relpath(path, self.directory)
+            except ValueError:
+                # on another drive
+                relative = os.pardir
+            relatives.append(None if relative.startswith(os.pardir) else relative.replace(os.sep, "/"))
+        mirrored = self.mirror.fetch([relative for relative in relatives if relative], threads=threads)
+        mirrored.reverse()
+        return [(mirrored.pop() or path) if relative else path for path, relative in zip(paths, relatives)]
+
+    @profiled("mirror.sync")
+    def syncMirror(self, threads=SCAN_THREADS):
+        """
+        Brings the json files and the thumbnails of the scanned assets up to date in the local mirror
+        Args:
+            threads: (Int) Number of parallel transfers
+
+        Returns:
+            (Int) Number of mirrored files
+
+        """
+        if self.mirror is None:
+            return 0
+        relatives = []
+        for folder, (folderMtime, entries, names) in list(self.folderState.items()):
+            relatives.extend("%s/%s" % (folder, entry[0]) for entry in entries)
+            for name in names:
+                thumb = self.get(name, {}).get('thumbPath')
+                if thumb:
+                    relatives.append("%s/%s" % (folder, thumb))
+        return len([path for path in self.mirror.fetch(relatives, threads=threads) if path])
+
+    @profiled("export.finalize")
+    def finalizeAsset(self, job, progress=None):
+        """
+        Second stage of saving an asset. Copies the textures and the captured files into the library and writes
+        the json file. Does not touch the Maya scene or the library itself, so it is safe to run on a background
+        thread. The caller applies the result with updateFolders() of the asset folder on its own thread.
+        Args:
+            job: (Dictionary) Export job returned by captureAsset()
+            progress: (Function) Called after each copied file with (done count, total count)
+
+        Returns:
+            (Dictionary) Info of the asset as written into its json file
+
+        """
+        assetName = job["assetName"]
+        assetDirectory = job["assetDirectory"]
+        localDirectory = job["localDirectory"]
+        info = job["info"]
+
+        ## everything goes into a hidden staging folder next to the asset folder, which is renamed into place when it
+        ## is complete. Scans never see a half written asset.
+        token = uuid.uuid4().hex[:8]
+        stagingDirectory = os.path.join(self.directory, ".staging_%s_%s" % (assetName, token))
+        os.mkdir(stagingDirectory)
+        try:
+            localFiles = sorted(os.listdir(localDirectory))
+            total = len(job["transfers"]) + len(localFiles)
+            done = [0]
+
+            def report(*args):
+                done[0] += 1
+                if progress is not None:
+                    progress(done[0], total)
+
+            # textures of the asset folder are staged too, store blobs are uploaded in place with their own renames
+            textureTransfers = [(source, self._stagedPath(destination, assetDirectory, stagingDirectory))
+                                for source, destination in job["transfers"]]
+            self.transferTextures(textureTransfers, job["renames"], progress=report)
+            transfers = [(os.path.join(localDirectory, file), os.path.join(stagingDirectory, file)) for file in localFiles]
+            for source, destination, copied in copyEngine(progress=report).run(transfers):
+                pass
+
+            # the old asset folder is only replaced when all the textures of the new one are in place
+            missing = self._missingTextures(info, stagingDirectory)
+            if missing:
+                raise IOError("Textures of %s are missing, the asset is not replaced: %s" % (
+                    assetName, ", ".join(missing)))
+
+            # json and its sidecar are the last files written
+            propFile = os.path.join(stagingDirectory, "%s.json" % assetName)
+            with open(propFile, "w") as f:
+                json.dump(info, f, indent=4)
+            if self.useSidecars:
+                # only worth writing where it is read
+                writeSidecar(propFile, info)
+
+            self._promote(stagingDirectory, assetDirectory, token)
+        except:
+            shutil.rmtree(stagingDirectory, ignore_errors=True)
+            raise
+        finally:
+            shutil.rmtree(localDirectory, ignore_errors=True)
+        return info
+
+    def _missingTextures(self, info, stagingDirectory):
+        """
+        Returns:
+            (List) Textures of the asset info which are neither in the staging folder nor in the texture store
+
+        """
+        blobs = info.get("textureBlobs")
+        if blobs:
+            return [texture for texture, blobKey in sorted(blobs.items())
+                    if not os.path.isfile(self.texturePath(blobKey))]
+        return [texture for texture in info.get("textureFiles", [])
+                if not os.path.isfile(os.path.join(stagingDirectory, texture))]
+
+    def _stagedPath(self, path, assetDirectory, stagingDirectory):
+        """
+        Returns:
+            (Unicode) Path inside the staging folder if the path is in the asset folder, otherwise the path itself
+
+        """
+        relative = os.path.relpath(os.path.normpath(path), os.path.normpath(assetDirectory))
+        if relative.startswith(os.pardir):
+            return path
+        return os.path.join(stagingDirectory, relative)
+
+    def _promote(self, stagingDirectory, assetDirectory, token):
+        """
+        Renames the complete staging folder into the asset folder. An existing asset folder is moved aside first and
+        removed after, or put back if the promotion fails.
+        """
+        if not os.path.exists(assetDirectory):
+            os.rename(stagingDirectory, assetDirectory)
+            return
+        trashDirectory = os.path.join(self.directory, ".trash_%s_%s" % (os.path.basename(assetDirectory), token))
+        os.rename(assetDirectory, trashDirectory)
+        try:
+            os.rename(stagingDirectory, assetDirectory)
+        except OSError:
+            os.rename(trashDirectory, assetDirectory)
+            raise
+        shutil.rmtree(trashDirectory, ignore_errors=True)
+
+    @profiled("scan")
+    def scan(self, threads=SCAN_THREADS):
+        """
+        Scans the directory for .json files, and gather info.
+        Json files are only read for the asset folders which are changed since the last scan, the rest comes
+        from the catalog index (assetLibraryCatalog.db) on the library root. Asset folders are processed on a
+        thread pool, results are merged in the folder name order.
+        Args:
+            threads: (Int) Number of workers. Default is SCAN_THREADS
+
+        Returns:
+            None
+
+        """
+        for name, info in self.iterScan(threads=threads):
+            pass
+
+    def iterScan(self, threads=SCAN_THREADS):
+        """
+        Same as scan() but yields each asset as soon as it is read, so the callers can show the library
+        progressively. The library is cleared when the iteration starts and the catalog index is updated when
+        it is finished.
+        Args:
+            threads: (Int) Number of workers. Default is SCAN_THREADS
+
+        Returns:
+            (Generator) (name, info) of each asset
+
+        """
+        if not os.path.exists(self.directory):
+            return
+        self.clear()
+        self.folderState = {}
+        self.scanErrors = []
+        self.searchIndex.clear()
+        # first collect all the asset folders together with their stats
+        with span("scan.listFolders") as s:
+            subDirs = self._listAssetFolders(threads)
+            s.add(count=len(subDirs))
+
+        index = catalogIndex(self.directory)
+        index.open()
+        cached = index.load()
+
+        def scanFolder(item):
+            folder, folderStat = item
+            entry = cached.get(folder)
+            if entry is not None and self._isFresh(folder, folderStat, entry):
+                return entry, False
+            try:
+                return self._readFolder(folder), True
+            except (IOError, OSError) as e:
+                logger.warning("Cannot read the asset folder %s (%s)" % (folder, e))
+                return None, False
+
+        changed = {}
+        try:
+            for i, (entry, isChanged) in enumerate(parallelIter(scanFolder, subDirs, threads)):
+                folder = subDirs[i][0]
+                if entry is None:
+                    self.scanErrors.append(folder)
+                    continue
+                try:
+                    names = self._addEntry(folder, entry)
+                except (ValueError, KeyError) as e:
+                    # broken json, it stays out of the index so it is read again on the next scan
+                    logger.warning("Skipping the asset folder %s, invalid json (%s)" % (folder, e))
+                    self.scanErrors.append(folder)
+                    continue
+                if isChanged:
+                    changed[folder] = entry
+                for name in names:
+                    yield name, self[name]
+
+            folderNames = set(folder for folder, folderStat in subDirs)
+            removed = [d for d in cached if d not in folderNames]
+            index.update(changed, removed)
+            self.scanned = True
+        finally:
+            index.close()
+
+    @profiled("search")
+    def search(self, query):
+        """
+        Searches all the fields of the scanned assets. See the MAIN MENU notes for the query syntax.
+        Args:
+            query: (Unicode) Search query, ex. "wood tex:oak tri:<50000"
+
+        Returns:
+            (Set) Names of the matching assets. All assets for an empty query
+
+        """
+        return self.searchIndex.search(query)
+
+    @profiled("scan.detectChanges")
+    def detectChanges(self, deep=True, threads=SCAN_THREADS):
+        """
+        Compares the library folder with the last scan without reading any json file
+        Args:
+            deep: (Bool) If True, json files are checked too. Otherwise only the folder mtimes are compared which
+                catches the added and removed files but not the ones overwritten in place.
+            threads: (Int) Number of workers. Default is SCAN_THREADS
+
+        Returns:
+            (List) Names of the asset folders which are added, removed or changed
+
+        """
+        state = dict(self.folderState)
+        subDirs = self._listAssetFolders(threads)
+
+        def isChanged(item):
+            folder, folderStat = item
+            entry = state.get(folder)
+            if entry is None:
+                return True
+            if not deep:
+                return folderStat.st_mtime != entry[0]
+            return not self._isFresh(folder, folderStat, entry)
+
+        flags = parallelMap(isChanged, subDirs, threads)
+        folders = [folder for (folder, folderStat), flag in zip(subDirs, flags) if flag]
+        current = set(folder for folder, folderStat in subDirs)
+        folders += [folder for folder in state if folder not in current]
+        return sorted(folders)
+
+    @profiled("scan.updateFolders")
+    def updateFolders(self, folders):
+        """
+        Re-reads the given asset folders and patches the library and the catalog index instead of a full rescan
+        Args:
+            folders: (List) Names of the asset folders
+
+        Returns:
+            (Tuple) Lists of added, changed and removed asset names
+
+        """
+        added = []
+        changed = []
+        removed = []
+        indexChanged = {}
+        indexRemoved = []
+        if self.mirror is not None:
+            self.mirror.invalidate(folders)
+        for folder in folders:
+            old = self.folderState.pop(folder, None)
+            oldNames = old[2] if old else []
+            for name in oldNames:
+                self.pop(name, None)
+                self.searchIndex.remove(name)
+            names = []
+            if os.path.isdir(os.path.join(self.directory, folder)):
+                try:
+                    entry = self._readFolder(folder)
+                    names = self._addEntry(folder, entry)
+                except (IOError, OSError, ValueError, KeyError) as e:
+                    # probably in the middle of an export. It stays out of the state so it will be picked up again
+                    logger.warning("Cannot read the asset folder %s (%s)" % (folder, e))
+                else:
+                    indexChanged[folder] = entry
+            else:
+                indexRemoved.append(folder)
+            for name in names:
+                if name in oldNames:
+                    changed.append(name)
+                else:
+                    added.append(name)
+            removed += [name for name in oldNames if name not in names]
+
+        index = catalogIndex(self.directory)
+        if index.open():
+            index.update(indexChanged, indexRemoved)
+            index.close()
+        return added, changed, removed
+
+    def _addEntry(self, folder, entry):
+        """
+        Adds the assets of a catalog entry into the library
+        Args:
+            folder: (Unicode) Name of the asset folder
+            entry: (Tuple) folderMtime, [(jsonFile, mtime, size, data), ...]
+
+        Returns:
+            (List) Names of the added assets
+
+        """
+        folderMtime, jsonEntries = entry
+        names = []
+        for jsonFile, mtime, size, data in jsonEntries:
+            with span("sidecar.parse" if isSidecarData(data) else "json.parse") as s:
+                s.add(size=len(data), count=1)
+                data = decodeMetadata(data)
+            name = data["assetName"]
+            # older assets get the typed fields from the legacy ones
+            for key, value in numericFields(data).items():
+                if value is not None:
+                    data.setdefault(key, value)
+            with span("search.add"):
+                self.searchIndex.add(name, data)
+            if self.compactRecords:
+                data = assetRecord(self, "%s/%s" % (folder, jsonFile), data)
+            self[name] = data
+            names.append(name)
+        self.folderState[folder] = (folderMtime, [jsonEntry[:3] for jsonEntry in jsonEntries], names)
+        return names
+
+    def _listAssetFolders(self, threads):
+        """
+        Lists the asset folders of the library. Folders starting with a dot (texture store etc.) are not assets.
+        Returns:
+            (List) Sorted [(folder name, stat), ...]
+
+        """
+        subDirs = listDirectory(self.directory, threads=threads)[0]
+        return sorted(item for item in subDirs if not item[0].startswith("."))
+
+    def _isFresh(self, folder, folderStat, entry):
+        """
+        Checks the cached catalog entry of the folder against the file system
+        Args:
+            folder: (Unicode) Name of the asset folder
+            folderStat: (stat_result) Current stat of the asset folder
+            entry: (Tuple) Cached (folderMtime, jsonEntries, ...) of the folder
+
+        Returns:
+            (Bool) True if the folder and none of its json files are changed
+
+        """
+        folderMtime, jsonEntries = entry[:2]
+        if folderStat.st_mtime != folderMtime:
+            return False
+        dir = os.path.join(self.directory, folder)
+        try:
+            for jsonEntry in jsonEntries:
+                jsonFile, mtime, size = jsonEntry[:3]
+                st = os.stat(os.path.join(dir, jsonFile))
+                if st.st_mtime != mtime or st.st_size != size:
+                    return False
+        except OSError:
+            return False
+        return True
+
+    def _readFolder(self, folder):
+        """
+        Reads all json files of the asset folder
+        Args:
+            folder: (Unicode) Name of the asset folder
+
+        Returns:
+            (Tuple) folderMtime, [(jsonFile, mtime, size, data), ...]
+
+        """
+        dir = os.path.join(self.directory, folder)
+        folderMtime = os.stat(dir).st_mtime
+        jsonEntries = []
+        files = listDirectory(dir, (".json", SIDECAR_EXTENSION) if self.useSidecars else ".json")[1]
+        sidecars = set(file for file, st in files if file.endswith(SIDECAR_EXTENSION))
+        for file, st in sorted(files):
+            if not file.endswith(".json"):
+                continue
+            data = None
+            if sidecarPath(file) in sidecars:
+                with span("sidecar.read") as s:
+                    data = readSidecar(os.path.join(dir, sidecarPath(file)), st)
+                    if data is not None:
+                        s.add(size=len(data), count=1)
+            if data is None:
+                with span("json.read") as s:
+                    with io.open(os.path.join(dir, file), 'r', encoding='utf-8') as f:
+                        data = f.read()
+                    s.add(size=st.st_size, count=1)
+            jsonEntries.append((file, st.st_mtime, st.st_size, data))
+        return folderMtime, jsonEntries
+
+    def readMetadata(self, path):
+        """
+        Reads the json data of an asset, from its sidecar if it is fresh
+        Args:
+            path: (Unicode) Absolute path of the json file
+
+        Returns:
+            (Dictionary) json data of the asset
+
+        """
+        if self.useSidecars:
+            data = readSidecar(sidecarPath(path), os.stat(path))
+            if data is not None:
+                return decodeSidecar(data)
+        with io.open(path, 'r', encoding='utf-8') as f:
+            return decodeJson(f.read())
+
+    @profiled("maintenance.sidecars")
+    def updateSidecars(self, threads=SCAN_THREADS):
+        """
+        Writes the missing and stale sidecars of the scanned library, ex. for the assets saved before the sidecars
+        or the json files edited by hand. Needs a scan first.
+        Args:
+            threads: (Int) Number of workers
+
+        Returns:
+            (List) Paths of the written sidecars
+
+        """
+        jsonPaths = [os.path.join(self.directory, folder, jsonEntry[0])
+                     for folder, entry in sorted(self.folderState.items()) for jsonEntry in entry[1]]
+
+        def update(jsonPath):
+            try:
+                if readSidecar(sidecarPath(jsonPath), os.stat(jsonPath)) is not None:
+                    return None
+                with io.open(jsonPath, 'r', encoding='utf-8') as f:
+                    info = decodeJson(f.read())
+                return writeSidecar(jsonPath, info)
+            except (IOError, OSError, ValueError, TypeError) as e:
+                logger.warning("Cannot write the sidecar of %s (%s)" % (jsonPath, e))
+                return None
+
+        written = [path for path in parallelMap(update, jsonPaths, threads) if path is not None]
+        # new files change the folder mtimes, the catalog index takes the sidecars in instead of reading them again
+        self.updateFolders(sorted(set(os.path.basename(os.path.dirname(path)) for path in written)))
+        return written
+
+    @profiled("texture.transfer")
+    def transferTextures(self, transfers, renames=(), progress=None):
+        """
+        Copies the textures with the copyEngine, then renames the uploaded blobs into place
+        Args:
+            transfers: (List) [(source, destination), ...]
+            renames: (List) [(temporary path, final path), ...]
+            progress: (Function) Progress callback of the copyEngine
+
+        Returns:
+            None
+
+        """
+        for folder in set(os.path.dirname(destination) for source, destination in transfers):
+            if not os.path.isdir(folder):
+                os.makedirs(folder)
+        # store uploads keep their upload time, prune() tells the blobs of a running export by it
+        for source, destination, copied in copyEngine(progress=progress, keepMtime=not renames).run(transfers):
+            pass
+        for tempPath, blobPath in renames:
+            try:
+                os.rename(tempPath, blobPath)
+            except OSError:
+                # someone else uploaded the same blob in the meantime
+                os.remove(tempPath)
+
+    def texturePath(self, blobKey):
+        """
+        Args:
+            blobKey: (String) Key of the texture in the texture store (as written to the textureBlobs of the json)
+
+        Returns:
+            (Unicode) Absolute path of the stored texture
+
+        """
+        return os.path.normpath(os.path.join(self.directory, TEXTURE_STORE_FOLDER, *blobKey.split("/")))
+
+    def resolveTexture(self, name, texture):
+        """
+        Finds the texture file of an asset. Assets saved with the texture store refer the textures by their
+        blob key, others keep them in the asset folder.
+        Args:
+            name: (Unicode) Name of the asset
+            texture: (Unicode) Base name of the texture as listed in the textureFiles of the asset
+
+        Returns:
+            (Unicode) Absolute path of the texture
+
+        """
+        blobKey = self[name].get('textureBlobs', {}).get(texture)
+        if blobKey:
+            return self.texturePath(blobKey)
+        return os.path.normpath(os.path.join(self.directory, self[name]['assetName'], texture))
+
+    def loadOptions(self):
+        """
+        Reads the options of the library from the assetLibrarySettings.json on the library root
+        Returns:
+            (Dictionary) LIBRARY_DEFAULTS updated with the options of the library
+
+        """
+        options = dict(LIBRARY_DEFAULTS)
+        settingsFile = os.path.join(self.directory, LIBRARY_SETTINGS_FILE)
+        if os.path.isfile(settingsFile):
+            try:
+                with open(settingsFile, 'r') as f:
+                    options.update(json.load(f))
+            except (IOError, ValueError) as e:
+                logger.warning("Cannot read the library settings %s (%s)" % (settingsFile, e))
+        return options
+
+    def reindex(self, threads=SCAN_THREADS):
+        """
+        Drops the catalog index and scans the library again, reading every json file
+        Args:
+            threads: (Int) Number of workers. Default is SCAN_THREADS
+
+        Returns:
+            None
+
+        """
+        catalogPath = os.path.join(self.directory, CATALOG_FILE)
+        if os.path.exists(catalogPath):
+            os.remove(catalogPath)
+        self.scan(threads=threads)
+
+    @profiled("maintenance.verify")
+    def verify(self, hashes=False, threads=SCAN_THREADS):
+        """
+        Checks the scanned library: unreadable asset folders, missing asset files and textures. Needs a scan first.
+        Args:
+            hashes: (Bool) If True, content of the texture store files are checked against their keys too
+            threads: (Int) Number of workers
+
+        Returns:
+            (List) [(asset name or folder, problem), ...]
+
+        """
+        problems = [(folder, "cannot read the json file") for folder in self.scanErrors]
+        blobs = set()
+        checks = []
+        for name, info in sorted(self.items()):
+            folder = os.path.join(self.directory, info.get('assetName', name))
+            for key in ('maPath', 'objPath', 'thumbPath', 'ssPath', 'swPath'):
+                if info.get(key):
+                    checks.append((name, key, os.path.join(folder, info[key])))
+            for key in ('maPath', 'objPath'):
+                if not info.get(key):
+                    problems.append((name, "no %s in the json file" % key))
+            for texture in info.get('textureFiles', []):
+                checks.append((name, "texture", self.resolveTexture(name, texture)))
+            blobs.update(info.get('textureBlobs', {}).values())
+
+        exists = parallelMap(lambda check: os.path.isfile(check[2]), checks, threads)
+        for (name, key, path), found in zip(checks, exists):
+            if not found:
+                problems.append((name, "missing %s %s" % (key, path)))
+
+        if hashes:
+            def checkBlob(blobKey):
+                path = self.texturePath(blobKey)
+                try:
+                    return textureBlobKey(path, hashFile(path)) == blobKey
+                except (IOError, OSError):
+                    # reported as missing already
+                    return True
+
+            blobs = sorted(blobs)
+            for blobKey, valid in zip(blobs, parallelMap(checkBlob, blobs, threads)):
+                if not valid:
+                    problems.append((blobKey, "content of the stored texture does not match its key"))
+        return problems
+
+    @profiled("maintenance.stats")
+    def stats(self, threads=SCAN_THREADS):
+        """
+        Counts the assets, textures and the disk usage of the scanned library. Needs a scan first.
+        Args:
+            threads: (Int) Number of workers listing the folders
+
+        Returns:
+            (Dictionary) Numbers of the library
+
+        """
+        totals = dict((key, 0) for key, label in NUMERIC_FIELDS if key not in ('boundingBoxSize', 'exportTime'))
+        references = 0
+        blobs = set()
+        exportTimes = []
+        for info in self.values():
+            for key, value in numericFields(info).items():
+                if value is not None and key in totals:
+                    totals[key] += value
+            if info.get('exportTime'):
+                exportTimes.append(info['exportTime'])
+            references += len(info.get('textureBlobs', {}))
+            blobs.update(info.get('textureBlobs', {}).values())
+
+        def folderBytes(folder):
+            total = 0
+            for root, dirs, files in os.walk(os.path.join(self.directory, folder)):
+                for file in files:
+                    try:
+                        total += os.path.getsize(os.path.join(root, file))
+                    except OSError:
+                        pass
+            return total
+
+        folders = sorted(self.folderState)
+        storeFolder = os.path.join(self.directory, TEXTURE_STORE_FOLDER)
+        sizes = parallelMap(folderBytes, folders + [TEXTURE_STORE_FOLDER], threads)
+        return {
+            "assets": len(self),
+            "assetFolders": len(folders),
+            "unreadableFolders": len(self.scanErrors),
+            "totals": totals,
+            "assetBytes": sum(sizes[:-1]),
+            "textureStore": {
+                "enabled": os.path.isdir(storeFolder),
+                "bytes": sizes[-1],
+                "blobs": len(blobs),
+                "references": references,
+                # textures stored once instead of copied to each asset
+                "savedCopies": references - len(blobs),
+            },
+            "firstExport": min(exportTimes) if exportTimes else None,
+            "lastExport": max(exportTimes) if exportTimes else None,
+        }
+
+    @profiled("maintenance.prune")
+    def prune(self, age=24, dryRun=False):
+        """
+        Removes the leftovers of the failed exports (.staging_*, .trash_* folders), the temporary uploads and the
+        texture store files which are not used by any asset. Files and folders younger than the age are kept, they
+        may belong to an export which is still running. Needs a scan first.
+        Args:
+            age: (Float) Minimum age in hours
+            dryRun: (Bool) If True, nothing is removed
+
+        Returns:
+            (List) Removed (or to be removed) paths
+
+        """
+        # nothing written after the prune is started is removed, whatever the age is
+        limit = time.time() - max(age, 0) * 3600
+        removed = []
+
+        def isOld(st):
+            # store blobs and uploads are stamped with the upload time, not the mtime of their source
+            return st.st_mtime < limit
+
+        folders, files = listDirectory(self.directory)
+        for folder, st in folders:
+            if (folder.startswith(".staging_") or folder.startswith(".trash_")) and isOld(st):
+                removed.append(os.path.join(self.directory, folder))
+                if not dryRun:
+                    shutil.rmtree(removed[-1], ignore_errors=True)
+
+        storeFolder = os.path.join(self.directory, TEXTURE_STORE_FOLDER)
+        if os.path.isdir(storeFolder):
+            if self.scanErrors:
+                # an unreadable json may be using any of the stored textures
+                logger.warning("Texture store is not pruned, %s asset folders could not be read" % len(self.scanErrors))
+            else:
+                used = set()
+                for info in self.values():
+                    used.update(self.texturePath(blobKey) for blobKey in info.get('textureBlobs', {}).values())
+                for folder, st in listDirectory(storeFolder)[0]:
+                    for file, fileStat in listDirectory(os.path.join(storeFolder, folder))[1]:
+                        path = os.path.normpath(os.path.join(storeFolder, folder, file))
+                        if path not in used and isOld(fileStat):
+                            removed.append(path)
+                            if not dryRun:
+                                os.remove(path)
+        for path in removed:
+            logger.info("%s %s" % ("Would remove" if dryRun else "Removed", path))
+        return removed
+
+
+def main(argv=None):
+    """
+    Command line entry point, see the COMMAND LINE notes
+    Args:
+        argv: (List) Arguments, sys.argv[1:] if not given
+
+    Returns:
+        (Int) Exit code
+
+    """
+    parser = argparse.ArgumentParser(prog="assetLibraryCore", description="Asset Library maintenance")
+    parser.add_argument("command", choices=["scan", "reindex", "verify", "stats", "prune", "sidecars"])
+    parser.add_argument("library", help="root folder of the library")
+    parser.add_argument("--threads", type=int, default=SCAN_THREADS, help="number of workers")
+    parser.add_argument("--hashes", action="store_true", help="verify: check the content of the texture store")
+    parser.add_argument("--json", action="store_true", help="stats: print as json")
+    parser.add_argument("--age", type=float, default=24, help="prune: minimum age in hours (default 24)")
+    parser.add_argument("--dry-run", action="store_true", help="prune: list without removing")
+    parser.add_argument("--trace", metavar="FILE", help="write the timings as a Chrome trace json file")
+    parser.add_argument("--profile", action="store_true", help="print the timings summary")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(format="%(levelname)s: %(message)s")
+    logger.setLevel(logging.DEBUG if args.verbose else logging.INFO)
+    if not os.path.isdir(args.library):
+        logger.error("Cannot reach the library directory: %s" % args.library)
+        return 2
+
+    if args.trace or args.profile:
+        PROFILER.enabled = True
+    try:
+        return _runCommand(args)
+    finally:
+        if args.profile:
+            sys.stderr.write(PROFILER.summaryText() + "\n")
+        if args.trace:
+            logger.info("%s spans written to %s" % (PROFILER.exportChromeTrace(args.trace), args.trace))
+
+
+def _runCommand(args):
+    library = libraryCore(args.library)
+    start = time.time()
+    if args.command == "reindex":
+        library.reindex(threads=args.threads)
+    else:
+        library.scan(threads=args.threads)
+    logger.info("Scanned %s assets in %.2f seconds" % (len(library), time.time() - start))
+
+    if args.command == "verify":
+        problems = library.verify(hashes=args.hashes, threads=args.threads)
+        for name, problem in problems:
+            print("%s: %s" % (name, problem))
+        logger.info("%s problems found" % len(problems))
+        return 1 if problems else 0
+    if args.command == "stats":
+        stats = library.stats(threads=args.threads)
+        if args.json:
+            print(json.dumps(stats, indent=4, sort_keys=True))
+        else:
+            print("Assets: %(assets)s in %(assetFolders)s folders (%(unreadableFolders)s unreadable)" % stats)
+            for key, label in NUMERIC_FIELDS:
+                if key in stats["totals"]:
+                    print("%s: %s" % (label, stats["totals"][key]))
+            print("Asset folders: %.1f MB" % (stats["assetBytes"] / 1048576.0))
+            store = stats["textureStore"]
+            print("Texture store: %.1f MB, %s textures used %s times" % (
+                store["bytes"] / 1048576.0, store["blobs"], store["references"]))
+        return 0
+    if args.command == "prune":
+        removed = library.prune(age=args.age, dryRun=args.dry_run)
+        logger.info("%s %s files and folders" % ("Would remove" if args.dry_run else "Removed", len(removed)))
+    if args.command == "sidecars":
+        written = library.updateSidecars(threads=args.threads)
+        logger.info("%s sidecars written" % len(written))
+    return 1 if library.scanErrors and args.command in ("scan", "reindex") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
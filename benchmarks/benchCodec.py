@@ -0,0 +1,84 @@
+"""
+Benchmarks the metadata codecs of assetLibraryCore: parsing the asset json text with each installed json backend and
+the binary sidecars with the msgpack package (if it is installed) and the pure python decoder, scaled to the time per
+10k assets. Cold scans (no catalog index) reading the json files and the sidecars are timed too.
+
+Usage:
+    python benchmarks/benchCodec.py --assets 10000
+    ASSETLIBRARY_JSON=json python benchmarks/benchCodec.py
+"""
+
+import argparse
+import io
+import os
+import shutil
+import tempfile
+import time
+
+import benchUtils
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--assets", type=int, default=10000)
+    parser.add_argument("--textures", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    benchUtils.addRepositoryPath()
+    import assetLibraryCore
+
+    directory = tempfile.mkdtemp(prefix="assetLibraryBench")
+    try:
+        benchUtils.makeLibrary(directory, args.assets, textures=args.textures)
+        library = assetLibraryCore.libraryCore(directory)
+        library.scan()
+        library.updateSidecars()
+        texts = []
+        sidecars = []
+        for folder in sorted(library.folderState):
+            jsonPath = os.path.join(directory, folder, "%s.json" % folder)
+            with io.open(jsonPath, 'r', encoding='utf-8') as f:
+                texts.append(f.read())
+            with open(assetLibraryCore.sidecarPath(jsonPath), 'rb') as f:
+                sidecars.append(f.read())
+
+        scale = 10000.0 / args.assets
+        print("%d assets, json %.0f bytes, sidecar %.0f bytes on average" % (
+            args.assets, sum(len(text.encode("utf-8")) for text in texts) / float(len(texts)),
+            sum(len(data) for data in sidecars) / float(len(sidecars))))
+        print("%-28s %14s" % ("parse", "ms per 10k"))
+        for name in assetLibraryCore.JSON_BACKENDS:
+            assetLibraryCore.setJsonBackend(name)
+            elapsed = benchUtils.timeit(lambda: [assetLibraryCore.decodeJson(text) for text in texts], args.repeat)
+            print("%-28s %14.1f" % ("json (%s)" % name, elapsed * scale * 1000))
+        assetLibraryCore.setJsonBackend()
+
+        msgpack = assetLibraryCore.msgpack
+        decoders = [("sidecar (msgpack)", msgpack)] if msgpack is not None else []
+        decoders.append(("sidecar (pure python)", None))
+        for name, module in decoders:
+            assetLibraryCore.msgpack = module
+            elapsed = benchUtils.timeit(lambda: [assetLibraryCore.decodeSidecar(data) for data in sidecars],
+                                        args.repeat)
+            print("%-28s %14.1f" % (name, elapsed * scale * 1000))
+        assetLibraryCore.msgpack = msgpack
+
+        print("%-28s %14s" % ("cold scan", "ms per 10k"))
+        catalogPath = os.path.join(directory, assetLibraryCore.CATALOG_FILE)
+        for useSidecars in (False, True):
+            times = []
+            for _ in range(args.repeat):
+                os.remove(catalogPath)
+                library = assetLibraryCore.libraryCore(directory)
+                library.useSidecars = useSidecars
+                start = time.time()
+                library.scan()
+                times.append(time.time() - start)
+            print("%-28s %14.1f" % ("sidecars" if useSidecars else "json files", min(times) * scale * 1000))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmarks the texture remapping of assetLibrary.importAsset() with a stubbed pymel against scenes with an
+increasing number of file nodes. The previous algorithm (every texture against every file node in the scene)
+is timed on the same stub for comparison.
+
+Usage:
+    python benchmarks/benchImport.py --textures 100 --scene 0 1000 5000
+"""
+
+import argparse
+import logging
+import os
+import shutil
+import tempfile
+from shutil import copyfile
+
+import benchUtils
+
+
+def legacyRemap(pm, library, name, sourceImagesPath):
+    """Texture remapping of importAsset before the file node index"""
+    fileNodes = pm.ls(type="file")
+    for texture in library[name]['textureFiles']:
+        path = os.path.join(library.directory, library[name]['assetName'], texture)
+        for file in fileNodes:
+            if os.path.normpath(pm.getAttr(file.fileTextureName)) == path:
+                newLocation = os.path.join(sourceImagesPath, name)
+                if not os.path.exists(newLocation):
+                    os.mkdir(newLocation)
+                newPath = os.path.normpath(os.path.join(newLocation, os.path.basename(path)))
+                copyfile(path, newPath)
+                pm.setAttr(file.fileTextureName, newPath)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--textures", type=int, default=100)
+    parser.add_argument("--scene", type=int, nargs="+", default=[0, 1000, 5000],
+                        help="number of file nodes already in the scene")
+    parser.add_argument("--attr-latency", type=float, default=0.0, help="seconds added to every getAttr")
+    args = parser.parse_args()
+
+    benchUtils.installStubs()
+    import assetLibrary
+    assetLibrary.logger.setLevel(logging.WARNING)
+
+    root = tempfile.mkdtemp(prefix="assetLibraryBench")
+    try:
+        directory = os.path.join(root, "library")
+        benchUtils.makeLibrary(directory, 1, textures=args.textures)
+        library = assetLibrary.assetLibrary(directory)
+        library.scan()
+        name = sorted(library.keys())[0]
+        for texture in library[name]["textureFiles"]:
+            with open(os.path.join(directory, name, texture), "wb") as f:
+                f.write(b"\0" * 1024)
+
+        print("%d textures" % args.textures)
+        print("%-12s %-8s %10s %10s" % ("scene nodes", "method", "seconds", "getAttr"))
+        for sceneNodes in args.scene:
+            for method in ("legacy", "indexed"):
+                pm = benchUtils.stubPymel(attrLatency=args.attr_latency)
+                for i in range(sceneNodes):
+                    pm.createNode("file", texture="/show/textures/existing_%05d.tif" % i)
+                pm.importer = lambda path: [
+                    benchUtils.stubNode(pm, "imported%d" % i, "file",
+                                        os.path.join(directory, name, texture))
+                    for i, texture in enumerate(library[name]["textureFiles"])]
+                workspace = os.path.join(root, "project_%s_%d" % (method, sceneNodes))
+                os.makedirs(os.path.join(workspace, "sourceimages"))
+                pm.workspace.path = workspace
+                assetLibrary.pm = pm
+
+                if method == "legacy":
+                    def run():
+                        pm.importFile(os.path.join(directory, name, library[name]["maPath"]))
+                        legacyRemap(pm, library, name, os.path.join(workspace, "sourceimages"))
+                else:
+                    def run():
+                        library.importAsset(name, True)
+                elapsed = benchUtils.timeit(run)
+                print("%-12d %-8s %10.4f %10d" % (sceneNodes, method, elapsed, pm.calls["getAttr"]))
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmarks the memory of the scanned library with the assets kept as the whole json data and as compact
+assetRecords, and the cost of reading their light (slots) and heavy (read back from the json file) fields. The memory
+is the whole scan, the search index included, as the Maya library keeps both. It is measured with tracemalloc, which
+needs Python 3; only the timings are printed on Python 2.
+
+Usage:
+    python benchmarks/benchRecords.py --assets 50000
+"""
+
+import argparse
+import gc
+import shutil
+import tempfile
+import time
+
+import benchUtils
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--assets", type=int, default=10000)
+    parser.add_argument("--textures", type=int, default=8)
+    args = parser.parse_args()
+
+    benchUtils.addRepositoryPath()
+    import assetLibraryCore
+
+    directory = tempfile.mkdtemp(prefix="assetLibraryBench")
+    try:
+        benchUtils.makeLibrary(directory, args.assets, textures=args.textures)
+        # catalog index is built once, both modes do a warm scan
+        assetLibraryCore.libraryCore(directory).scan()
+        print("%d assets, %d textures each" % (args.assets, args.textures))
+        print("%-8s %12s %12s %14s %14s" % ("records", "library MB", "scan s", "light field us", "heavy field us"))
+        for compact in (False, True):
+            library = assetLibraryCore.libraryCore(directory)
+            library.compactRecords = compact
+            gc.collect()
+            if tracemalloc is not None:
+                tracemalloc.start()
+            start = time.time()
+            library.scan()
+            elapsed = time.time() - start
+            gc.collect()
+            memory = tracemalloc.get_traced_memory()[0] / 1048576.0 if tracemalloc is not None else float("nan")
+            if tracemalloc is not None:
+                tracemalloc.stop()
+
+            names = sorted(library)
+            start = time.time()
+            for name in names:
+                library[name].get("thumbPath")
+                library[name].get("triangles")
+            light = (time.time() - start) / len(names) / 2
+            start = time.time()
+            for name in names[:1000]:
+                library[name]["textureFiles"]
+            heavy = (time.time() - start) / min(len(names), 1000)
+            print("%-8s %12.1f %12.3f %14.2f %14.2f" % ("compact" if compact else "json", memory, elapsed,
+                                                         light * 1000000, heavy * 1000000))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
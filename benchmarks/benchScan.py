@@ -0,0 +1,46 @@
+"""
+Benchmarks libraryCore.scan() serially and on the thread pool against a synthetic library with injected
+per call latency.
+
+Usage:
+    python benchmarks/benchScan.py --assets 10000 --latency 0.002 --threads 8
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+
+import benchUtils
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--assets", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.002, help="seconds added to every file system call")
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    benchUtils.addRepositoryPath()
+    import assetLibraryCore
+
+    directory = tempfile.mkdtemp(prefix="assetLibraryBench")
+    try:
+        benchUtils.makeLibrary(directory, args.assets)
+        catalog = os.path.join(directory, assetLibraryCore.CATALOG_FILE)
+        print("%d assets, %.1f ms latency per call" % (args.assets, args.latency * 1000))
+        for label, threads in (("serial", 1), ("%d threads" % args.threads, args.threads)):
+            for mode in ("cold", "warm"):
+                if mode == "cold" and os.path.exists(catalog):
+                    os.remove(catalog)
+                library = assetLibraryCore.libraryCore(directory)
+                with benchUtils.latency(args.latency, assetLibraryCore):
+                    elapsed = benchUtils.timeit(lambda: library.scan(threads=threads))
+                assert len(library) == args.assets
+                print("%-12s %-5s %8.3f s" % (label, mode, elapsed))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmarks the search index of assetLibraryCore: building it for a synthetic library, the queries of the search
+filter, the incremental update of a single asset and the memory of the index. Memory is measured with tracemalloc,
+which needs Python 3; it is printed as nan on Python 2.
+
+Usage:
+    python benchmarks/benchSearch.py --assets 50000
+"""
+
+import argparse
+import gc
+import random
+
+import benchUtils
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+QUERIES = [
+    "asset04",
+    "tex:asset012",
+    "diffuse",
+    "tri:<50000",
+    "face:1000..2000",
+    "synthetic tri:>=100000",
+    "difuse~",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--assets", type=int, default=50000)
+    parser.add_argument("--textures", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    benchUtils.addRepositoryPath()
+    import assetLibraryCore
+
+    assets = {}
+    for i in range(args.assets):
+        name = "asset%05d" % i
+        assets[name] = {
+            "assetName": name,
+            "textureFiles": ["%s_tex%02d_diffuse.1001.tif" % (name, t) for t in range(args.textures)],
+            "Faces/Trianges": "%s/%s" % (i * 10, i * 20),
+            "sourceProject": "M:/Projects/synthetic/scenes/%s_v001.ma" % name,
+        }
+
+    index = assetLibraryCore.searchIndex()
+
+    def build():
+        index.clear()
+        for name, info in assets.items():
+            index.add(name, info)
+        index.search("")
+
+    print("%d assets" % args.assets)
+    print("%-28s %10.1f ms" % ("build", benchUtils.timeit(build) * 1000))
+    for query in QUERIES:
+        elapsed = benchUtils.timeit(lambda: index.search(query), repeat=args.repeat)
+        print("%-28s %10.3f ms %8d matches" % (query, elapsed * 1000, len(index.search(query))))
+
+    name = random.choice(sorted(assets))
+
+    def update():
+        index.add(name, dict(assets[name], textureFiles=["oak_planks.tif"]))
+        index.search("oak")
+
+    print("%-28s %10.3f ms" % ("update one asset", benchUtils.timeit(update, repeat=args.repeat) * 1000))
+
+    # a fresh index, the json data of the assets is allocated before the measure
+    index = None
+    gc.collect()
+    if tracemalloc is not None:
+        tracemalloc.start()
+    index = assetLibraryCore.searchIndex()
+    build()
+    gc.collect()
+    memory = tracemalloc.get_traced_memory()[0] if tracemalloc is not None else float("nan")
+    if tracemalloc is not None:
+        tracemalloc.stop()
+    print("%-28s %10.1f MB %8.2f KB/asset" % ("index memory", memory / 1048576.0, memory / 1024.0 / args.assets))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmarks the startup of assetLibrary: wall time of "import assetLibrary" in a fresh interpreter and the modules it
+loads, with and without the lazy submodules of Qt.py (QT_LAZY=1). Maya is stubbed, Qt has to be a real binding.
+
+Usage:
+    python benchmarks/benchStartup.py --repeat 10
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import benchUtils
+
+BINDINGS = ("PySide2", "PyQt5", "PySide", "PyQt4", "shiboken", "sip")
+
+
+def child():
+    """Imports assetLibrary once and prints the measurements as json"""
+    benchUtils.installStubs(qt=False)
+    before = set(sys.modules)
+    start = time.time()
+    import assetLibrary
+    elapsed = time.time() - start
+    loaded = [name for name in set(sys.modules) - before if sys.modules[name] is not None]
+    print(json.dumps({
+        "seconds": elapsed,
+        "modules": len(loaded),
+        "binding": sorted(name for name in loaded if name.split(".")[0] in BINDINGS),
+    }))
+
+
+def measure(lazy, repeat):
+    env = dict(os.environ)
+    env.pop("QT_LAZY", None)
+    if lazy:
+        env["QT_LAZY"] = "1"
+    results = []
+    for _ in range(repeat):
+        output = subprocess.check_output([sys.executable, os.path.abspath(__file__), "--child"], env=env)
+        results.append(json.loads(output.decode("utf-8").strip().splitlines()[-1]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child()
+        return
+
+    benchUtils.addRepositoryPath()
+    try:
+        import Qt
+    except ImportError:
+        sys.exit("No Qt binding found, startup can only be measured against a real binding")
+    print("%s %s" % (Qt.__binding__, Qt.__binding_version__))
+
+    for lazy in (False, True):
+        results = measure(lazy, args.repeat)
+        best = min(result["seconds"] for result in results)
+        print("%-8s %10.1f ms %6d modules %4d binding modules: %s" % (
+            "lazy" if lazy else "eager", best * 1000, results[0]["modules"], len(results[0]["binding"]),
+            ", ".join(results[0]["binding"])))
+
+
+if __name__ == "__main__":
+    main()
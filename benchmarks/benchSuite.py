@@ -0,0 +1,336 @@
+"""
+Benchmark suite of the asset library. Builds a synthetic library (json files, thumbnail jpegs, textures and scene
+files) and times the main operations headless, optionally behind the emulated latency of a network share. Maya is
+a stubbed pymel; populate and the thumbnail atlas need a real Qt binding and run on the offscreen platform, they are
+skipped if there is none. Results are printed as a table and written as json with --json to track them over time.
+
+Cases:
+    scan        cold (no catalog index) and warm scans
+    search      word, field, numeric and fuzzy queries of the search index
+    populate    libraryTab filling its view from a fresh scan (Qt)
+    atlas       building and reading the thumbnail atlas (Qt)
+    export      saving an asset from the stub scene, previews must be taken with the original textures, then
+                saving it again with the file nodes on the textures of the asset folder
+    importAsset importing an asset and copying its textures into the project
+    filePass    copying the textures of file nodes and repointing them
+    settings    add, load and remove round trips of the library config file
+
+Needs the Python version of Maya (2.7), same as assetLibrary.
+
+Usage:
+    python benchmarks/benchSuite.py --assets 2000 --latency 0.002 --json results.json
+    python benchmarks/benchSuite.py --cases scan importAsset --json -
+"""
+
+import argparse
+import collections
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+import benchUtils
+
+SEARCH_QUERIES = [
+    ("search.word", "asset001"),
+    ("search.field", "tex:asset0012"),
+    ("search.numeric", "tri:<20000"),
+    ("search.fuzzy", "difuse~"),
+]
+
+
+class benchSuite(object):
+    """
+    Runs the cases against one synthetic library and collects the results
+    """
+    def __init__(self, args, directory, root, hasQt):
+        import assetLibrary
+        import assetLibraryCore
+        self.args = args
+        self.directory = directory
+        self.root = root
+        self.hasQt = hasQt
+        self.assetLibrary = assetLibrary
+        self.core = assetLibraryCore
+        self.results = []
+
+    def measure(self, name, function, setup=None, repeat=None, **params):
+        """
+        Times the function behind the emulated share latency and records the result
+        Args:
+            name: (String) Result name
+            function: (Function) Timed function
+            setup: (Function) Called before each run, not timed
+            repeat: (Int) Number of runs, --repeat if not given
+            **params: (Any) Parameters of the case, written with the result
+
+        Returns:
+            (Dictionary) Result
+
+        """
+        profiler = self.core.PROFILER
+        times = []
+        for _ in range(repeat or self.args.repeat):
+            if setup is not None:
+                setup()
+            profiler.reset()
+            profiler.enabled = self.args.spans
+            with benchUtils.latency(self.args.latency, self.core):
+                start = time.time()
+                function()
+                times.append(time.time() - start)
+            profiler.enabled = False
+        result = {
+            "name": name,
+            "seconds": min(times),
+            "mean": sum(times) / len(times),
+            "repeat": len(times),
+            "params": params,
+        }
+        if self.args.spans:
+            result["spans"] = dict((span, {"calls": calls, "seconds": total, "bytes": size, "count": count})
+                                   for span, calls, total, longest, size, count in profiler.summary())
+        self.results.append(result)
+        print("%-24s %10.2f ms %10.2f ms  %s" % (name, result["seconds"] * 1000, result["mean"] * 1000,
+                                                 " ".join("%s=%s" % item for item in sorted(params.items()))))
+        return result
+
+    def skip(self, name, reason):
+        self.results.append({"name": name, "skipped": reason})
+        print("%-24s skipped (%s)" % (name, reason))
+
+    def library(self):
+        library = self.assetLibrary.assetLibrary(self.directory)
+        library.scan()
+        return library
+
+    def workspace(self, prefix):
+        return tempfile.mkdtemp(prefix=prefix, dir=self.root)
+
+    def scan(self):
+        catalog = os.path.join(self.directory, self.core.CATALOG_FILE)
+
+        def removeCatalog():
+            if os.path.exists(catalog):
+                os.remove(catalog)
+
+        def run():
+            library = self.assetLibrary.assetLibrary(self.directory)
+            library.scan(threads=self.args.threads)
+            assert len(library) == self.args.assets
+
+        self.measure("scan.cold", run, setup=removeCatalog, assets=self.args.assets, threads=self.args.threads)
+        self.measure("scan.warm", run, assets=self.args.assets, threads=self.args.threads)
+
+    def search(self):
+        library = self.library()
+        for name, query in SEARCH_QUERIES:
+            self.measure(name, lambda: library.search(query), repeat=self.args.repeat * 10, query=query,
+                         matches=len(library.search(query)))
+
+    def populate(self):
+        app = benchUtils.qtApplication() if self.hasQt else None
+        if app is None:
+            self.skip("populate", "no Qt binding")
+            return
+        tab = self.assetLibrary.libraryTab(self.directory)
+
+        def run():
+            if tab.built:
+                tab.populate()
+            else:
+                tab.buildTabUI()
+            deadline = time.time() + 600
+            while tab.streamQueue is not None and time.time() < deadline:
+                app.processEvents()
+                time.sleep(0.001)
+            assert tab.model.rowCount() == self.args.assets
+
+        self.measure("populate", run, assets=self.args.assets)
+        # atlas and mirror updates started by the stream
+        self.assetLibrary.QtCore.QThreadPool.globalInstance().waitForDone()
+        tab.watcher.stop()
+        tab.deleteLater()
+        app.processEvents()
+
+    def atlas(self):
+        if not self.hasQt or benchUtils.qtApplication() is None:
+            self.skip("atlas", "no Qt binding")
+            return
+        library = self.library()
+        keys = ["%s/%s" % (info["assetName"], info["thumbPath"]) for info in library.values()]
+        atlas = self.assetLibrary.thumbnailAtlas(self.directory)
+
+        def removeAtlas():
+            atlas.load()
+            for page in range(atlas.pages):
+                if os.path.exists(atlas.pagePath(page)):
+                    os.remove(atlas.pagePath(page))
+            if os.path.exists(atlas.indexPath):
+                os.remove(atlas.indexPath)
+
+        def read():
+            atlas.load()
+            assert len(atlas.read()) == len(keys)
+
+        self.measure("atlas.build", lambda: atlas.update(keys), setup=removeAtlas, thumbnails=len(keys))
+        self.measure("atlas.read", read, thumbnails=len(keys))
+
+    def export(self):
+        library = self.assetLibrary.assetLibrary(self.directory)
+        pm = benchUtils.stubPymel()
+        self.assetLibrary.pm = pm
+        source = self.workspace("exportSource")
+        textures = []
+        for i in range(self.args.textures):
+            textures.append(os.path.join(source, "export_tex%02d.tif" % i))
+            with open(textures[-1], "wb") as f:
+                f.write(b"\0" * self.args.texture_bytes)
+        name = "benchExport"
+        assetDirectory = os.path.join(self.directory, name)
+
+        def newScene():
+            pm.scene = []
+            pm.playblasts = []
+            pm.createNode("transform", name=name)
+            pm.createNode("mesh", name="%sShape" % name)
+            pm.createNode("shadingEngine")
+            for texture in textures:
+                pm.createNode("file", texture=texture)
+            if os.path.isdir(assetDirectory):
+                shutil.rmtree(assetDirectory)
+
+        def run():
+            library.saveAsset(name)
+            # file nodes are left on the library copies, the previews must not have been taken with them
+            assert all(texture in textures for _, shotTextures in pm.playblasts for texture in shotTextures)
+            assert all(texture not in textures for texture in pm.textures())
+            assert library[name]["textureCount"] == len(textures)
+
+        def exported():
+            # file nodes are left on the library copies by the first export
+            newScene()
+            library.saveAsset(name)
+
+        def reexport():
+            library.saveAsset(name)
+            # textures of the old asset folder are carried over into the new one
+            assert all(os.path.isfile(texture) for texture in pm.textures())
+            assert all(os.path.isfile(library.resolveTexture(name, texture))
+                       for texture in library[name]["textureFiles"])
+
+        self.measure("export", run, setup=newScene, textures=len(textures), textureBytes=self.args.texture_bytes)
+        self.measure("export.again", reexport, setup=exported, textures=len(textures),
+                     textureBytes=self.args.texture_bytes)
+        newScene()
+
+    def importAsset(self):
+        library = self.library()
+        name = sorted(library)[0]
+        textures = [library.resolveTexture(name, texture) for texture in library[name]["textureFiles"]]
+        pm = benchUtils.stubPymel()
+        pm.importer = lambda path: [benchUtils.stubNode(pm, "imported%d" % i, "file", texture)
+                                    for i, texture in enumerate(textures)]
+        self.assetLibrary.pm = pm
+
+        def newProject():
+            pm.scene = []
+            pm.workspace.path = self.workspace("project")
+
+        self.measure("importAsset", lambda: library.importAsset(name, True), setup=newProject,
+                     textures=len(textures), textureBytes=self.args.texture_bytes)
+
+    def filePass(self):
+        library = self.library()
+        pm = benchUtils.stubPymel()
+        self.assetLibrary.pm = pm
+        fileNodes = []
+        for name in sorted(library)[:self.args.file_pass_assets]:
+            for texture in library[name]["textureFiles"]:
+                fileNodes.append(pm.createNode("file", texture=library.resolveTexture(name, texture)))
+        originals = [(node, node.fileTextureName.value) for node in fileNodes]
+        destination = []
+
+        def resetNodes():
+            # file nodes are pointed back to the library, textures go to an empty folder
+            for node, original in originals:
+                node.fileTextureName.value = original
+            destination[:] = [self.workspace("filePass")]
+
+        self.measure("filePass", lambda: library.filePass(fileNodes, destination[0]), setup=resetNodes,
+                     fileNodes=len(fileNodes), textureBytes=self.args.texture_bytes)
+
+    def settings(self):
+        assetLibrary = self.assetLibrary
+        assetLibrary.CONFIG_FILE = os.path.join(self.root, "assetLibraryConfig.json")
+        # settings() of the tab widget works on the config file only for these modes
+        host = type("settingsHost", (object,), {"settings": assetLibrary.AssetLibraryUI.__dict__["settings"]})()
+        count = self.args.libraries
+
+        def run():
+            for i in range(count):
+                host.settings(mode="add", name="library%03d" % i, path=os.path.join(self.root, "library%03d" % i))
+            assert len(host.settings(mode="load")) == count
+            for i in range(count):
+                host.settings(mode="remove", itemIndex=0)
+
+        self.measure("settings", run, libraries=count)
+
+
+CASES = collections.OrderedDict([
+    ("scan", benchSuite.scan),
+    ("search", benchSuite.search),
+    ("populate", benchSuite.populate),
+    ("atlas", benchSuite.atlas),
+    ("export", benchSuite.export),
+    ("importAsset", benchSuite.importAsset),
+    ("filePass", benchSuite.filePass),
+    ("settings", benchSuite.settings),
+])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--assets", type=int, default=1000)
+    parser.add_argument("--textures", type=int, default=8, help="textures per asset")
+    parser.add_argument("--texture-bytes", type=int, default=256 * 1024, help="size of each texture file")
+    parser.add_argument("--scene-bytes", type=int, default=64 * 1024, help="size of each .ma and .obj file")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every file system call")
+    parser.add_argument("--threads", type=int, default=8, help="scan workers")
+    parser.add_argument("--file-pass-assets", type=int, default=4, help="assets whose textures filePass copies")
+    parser.add_argument("--libraries", type=int, default=20, help="libraries in the settings round trips")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--spans", action="store_true", help="record the profiler spans of each case")
+    parser.add_argument("--json", metavar="FILE", help="write the results as json, - for stdout")
+    parser.add_argument("--keep", action="store_true", help="keep the synthetic library")
+    args = parser.parse_args()
+
+    hasQt = benchUtils.installStubs()
+    import assetLibrary
+    assetLibrary.logger.setLevel(logging.WARNING)
+
+    root = tempfile.mkdtemp(prefix="assetLibraryBench")
+    directory = os.path.join(root, "library")
+    try:
+        start = time.time()
+        benchUtils.makeLibrary(directory, args.assets, textures=args.textures, thumbnails=True,
+                               textureBytes=args.texture_bytes, sceneBytes=args.scene_bytes)
+        print("%d assets generated in %.1f s, %.1f ms latency per call" % (
+            args.assets, time.time() - start, args.latency * 1000))
+        print("%-24s %13s %13s" % ("case", "best", "mean"))
+        suite = benchSuite(args, directory, root, hasQt)
+        for name in args.cases:
+            CASES[name](suite)
+        if args.json:
+            benchUtils.writeResults(args.json, suite.results, arguments=vars(args))
+    finally:
+        if args.keep:
+            print("Library kept at %s" % directory)
+        else:
+            shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
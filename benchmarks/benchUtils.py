@@ -0,0 +1,435 @@
+"""
+Helpers for the asset library benchmarks. Lets assetLibrary be imported outside of Maya, builds synthetic
+libraries and emulates the latency of a network share.
+"""
+
+import collections
+import contextlib
+import io
+import json
+import os
+import platform
+import struct
+import subprocess
+import sys
+import time
+import types
+
+try:
+    import __builtin__ as builtins
+except ImportError:
+    import builtins
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class _Stub(object):
+    """Stand-in for any Maya or Qt object. Every attribute and call returns another stub."""
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        return _Stub()
+
+    def __call__(self, *args, **kwargs):
+        return _Stub()
+
+
+class _StubMeta(type):
+    def __getattr__(cls, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return _Stub
+
+
+_StubClass = _StubMeta("_StubClass", (_Stub,), {})
+
+
+class _StubModule(types.ModuleType):
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return _StubMeta(name, (_StubClass,), {})
+
+
+def addRepositoryPath():
+    """
+    Makes the modules of the repository importable. assetLibraryCore needs nothing else.
+    """
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+
+
+def installStubs(qt=True):
+    """
+    Puts stand-ins of pymel, maya and (if no Qt binding is installed) Qt into sys.modules so assetLibrary
+    can be imported without Maya. pymel.core is a stubPymel, replace assetLibrary.pm for a fresh scene.
+
+    Args:
+        qt: (Bool) If False Qt is left alone, it is neither imported nor stubbed
+
+    Returns:
+        (Bool) True if a real Qt binding is used
+
+    """
+    addRepositoryPath()
+    for name in ("pymel", "maya", "maya.OpenMayaUI"):
+        sys.modules.setdefault(name, _StubModule(name))
+    sys.modules.setdefault("pymel.core", stubPymel())
+    if not qt:
+        return False
+    try:
+        import Qt
+        return not isinstance(Qt, _StubModule)
+    except ImportError:
+        for name in ("Qt", "Qt.QtCore", "Qt.QtGui", "Qt.QtWidgets", "shiboken2"):
+            sys.modules[name] = _StubModule(name)
+        qt = sys.modules["Qt"]
+        qt.__binding__ = "PySide2"
+        qt.QtCore = sys.modules["Qt.QtCore"]
+        qt.QtGui = sys.modules["Qt.QtGui"]
+        qt.QtWidgets = sys.modules["Qt.QtWidgets"]
+        qt.QtCore.Signal = lambda *args: _Stub()
+        return False
+
+
+def qtApplication():
+    """
+    Returns:
+        (QApplication) Running application, created on the offscreen platform if there is none. None if Qt is
+        stubbed
+
+    """
+    import Qt
+    if isinstance(Qt, _StubModule):
+        return None
+    from Qt import QtWidgets
+    app = QtWidgets.QApplication.instance()
+    if app is None:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        app = QtWidgets.QApplication([])
+    return app
+
+
+class stubAttribute(object):
+    def __init__(self, node, name, value=None):
+        self.node = node
+        self.attrName = name
+        self.value = value
+
+    def get(self):
+        return self.node.pm.getAttr(self)
+
+    def set(self, value):
+        self.node.pm.setAttr(self, value)
+
+
+class stubNode(object):
+    """Minimal PyNode. File nodes carry a fileTextureName attribute."""
+    def __init__(self, pm, name, nodeType, texture=None):
+        self.pm = pm
+        self.nodeName = name
+        self.nodeType = nodeType
+        self.fileTextureName = stubAttribute(self, "fileTextureName", texture)
+
+    def name(self):
+        return self.nodeName
+
+    def type(self):
+        return self.nodeType
+
+    def __repr__(self):
+        return "stubNode(%r)" % self.nodeName
+
+
+class stubPymel(types.ModuleType):
+    """
+    Stand-in for pymel.core holding a flat list of nodes as the scene. Counts the calls so the benchmarks
+    can report the number of Maya queries, and can add a delay to each getAttr to emulate their cost.
+    Commands it does not implement are counted and return a stub. Exports write the texture paths of the file
+    nodes into the exported file, playblasts write a jpeg and record the texture paths they are taken with.
+    """
+    def __init__(self, attrLatency=0.0):
+        super(stubPymel, self).__init__("pymel.core")
+        self.scene = []
+        self.calls = collections.Counter()
+        self.attrLatency = attrLatency
+        ## called by importFile with the path, returns the imported nodes
+        self.importer = lambda path: []
+        self.workspace = types.ModuleType("workspace")
+        self.workspace.path = ""
+        self.mel = _Stub()
+        ## {"node.attribute": value} of the setAttr calls on the attributes given by name
+        self.globals = {}
+        ## [(image path, [texture paths of the file nodes]), ...]
+        self.playblasts = []
+
+    def createNode(self, nodeType, name=None, texture=None):
+        node = stubNode(self, name or "%s%d" % (nodeType, len(self.scene)), nodeType, texture)
+        self.scene.append(node)
+        return node
+
+    def ls(self, *nodes, **kwargs):
+        self.calls["ls"] += 1
+        nodeType = kwargs.get("type")
+        pool = self.scene
+        if nodes:
+            pool = nodes[0] if isinstance(nodes[0], (list, tuple)) else list(nodes)
+        if nodeType is None:
+            return list(pool)
+        return [node for node in pool if node.type() == nodeType]
+
+    def getAttr(self, attr):
+        self.calls["getAttr"] += 1
+        if self.attrLatency:
+            time.sleep(self.attrLatency)
+        return attr.value
+
+    def setAttr(self, attr, value):
+        self.calls["setAttr"] += 1
+        if isinstance(attr, str):
+            self.globals[attr] = value
+            return
+        attr.value = value
+
+    def textures(self):
+        return [node.fileTextureName.value for node in self.scene if node.type() == "file"]
+
+    def sceneName(self):
+        return ""
+
+    def listRelatives(self, nodes, **kwargs):
+        return [node for node in self.scene if node.type() in ("mesh", "nurbsSurface")]
+
+    def listConnections(self, nodes, type=None, **kwargs):
+        return [node for node in self.scene if type is None or node.type() == type]
+
+    def listHistory(self, node, **kwargs):
+        # the scene is a single shading network
+        return list(self.scene)
+
+    def exactWorldBoundingBox(self, *args, **kwargs):
+        return [0.0, 0.0, 0.0, 1.0, 2.0, 3.0]
+
+    def polyEvaluate(self, *args, **kwargs):
+        return 100
+
+    def getPanel(self, **kwargs):
+        return "modelPanel" if "to" in kwargs else "modelPanel4"
+
+    def exportSelected(self, path, type=None, **kwargs):
+        self.calls["exportSelected"] += 1
+        path += ".obj" if type == "OBJexport" else ".ma"
+        with open(path, "w") as f:
+            f.write("\n".join(self.textures()))
+        return path
+
+    def playblast(self, completeFilename=None, width=200, **kwargs):
+        self.calls["playblast"] += 1
+        with open(completeFilename, "wb") as f:
+            f.write(jpegBytes(min(width, 256)))
+        self.playblasts.append((completeFilename, self.textures()))
+
+    def importFile(self, path, returnNewNodes=False, **kwargs):
+        self.calls["importFile"] += 1
+        nodes = self.importer(path)
+        self.scene += nodes
+        if returnNewNodes:
+            return list(nodes)
+
+    def warning(self, *args):
+        pass
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+
+        def command(*args, **kwargs):
+            self.calls[name] += 1
+            return _Stub()
+        return command
+
+
+def jpegBytes(size=200, fileBytes=0):
+    """
+    Makes a valid baseline JPEG of a flat grey square without any imaging library. Decoding it costs about the
+    same as a real thumbnail of the same resolution.
+    Args:
+        size: (Int) Width and height in pixels, rounded up to a multiple of 8
+        fileBytes: (Int) File size to pad the image to with comment segments, 0 for the smallest file
+
+    Returns:
+        (Bytes) JPEG file content
+
+    """
+    size = (size + 7) // 8 * 8
+
+    def segment(marker, payload):
+        return struct.pack(">BBH", 0xFF, marker, len(payload) + 2) + payload
+
+    header = segment(0xDB, b"\x00" + b"\x01" * 64)
+    header += segment(0xC0, struct.pack(">BHHB", 8, size, size, 1) + b"\x01\x11\x00")
+    # a single code of one bit in both tables: DC difference 0 and end of block
+    for tableClass in (b"\x00", b"\x10"):
+        header += segment(0xC4, tableClass + b"\x01" + b"\x00" * 15 + b"\x00")
+    header += segment(0xDA, b"\x01\x01\x00\x00\x3f\x00")
+    bits = (size // 8) ** 2 * 2
+    data = b"\x00" * (bits // 8)
+    if bits % 8:
+        data += struct.pack(">B", (1 << (8 - bits % 8)) - 1)
+    padding = b""
+    remaining = fileBytes - (len(header) + len(data) + 4)
+    while remaining > 4:
+        chunk = min(remaining - 4, 65533)
+        padding += segment(0xFE, b" " * chunk)
+        remaining -= chunk + 4
+    return b"\xff\xd8" + padding + header + data + b"\xff\xd9"
+
+
+def makeLibrary(directory, count, textures=8, thumbnails=False, textureBytes=0, sceneBytes=0):
+    """
+    Creates a synthetic library with the given number of assets. Json files have the same fields and about the
+    same size as the ones written by captureAsset.
+    Args:
+        directory: (String) Library root, created if missing
+        count: (Int) Number of assets
+        textures: (Int) Number of texture names written to each json
+        thumbnails: (Bool) If True, writes 200px thumbnail, screenshot and wireframe jpegs for each asset
+        textureBytes: (Int) If not 0, writes the texture files of each asset with this size
+        sceneBytes: (Int) If not 0, writes the .ma and .obj files of each asset with this size
+
+    Returns:
+        None
+
+    """
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+    thumbnail = jpegBytes(200, 12000)
+    screenshot = jpegBytes(200, 60000)
+    for i in range(count):
+        name = "asset%05d" % i
+        assetDir = os.path.join(directory, name)
+        os.mkdir(assetDir)
+        textureFiles = ["%s_tex%02d_diffuse.1001.tif" % (name, t) for t in range(textures)]
+        boundingBox = [round(1 + (i % 97) * 0.25, 4), round(1 + (i % 89) * 0.5, 4), round(1 + (i % 83) * 0.125, 4)]
+        info = {
+            "assetName": name,
+            "objPath": "%s.obj" % name,
+            "maPath": "%s.ma" % name,
+            "thumbPath": "%s_thumb.jpg" % name,
+            "ssPath": "%s_s.jpg" % name,
+            "swPath": "%s_w.jpg" % name,
+            "textureFiles": textureFiles,
+            "sourceProject": "M:/Projects/synthetic/scenes/%s_v001.ma" % name,
+            "faces": i * 10,
+            "triangles": i * 20,
+            "textureCount": textures,
+            "textureBytes": textureBytes * textures,
+            "boundingBox": boundingBox,
+            "boundingBoxSize": max(boundingBox),
+            "exportTime": 1500000000 + i * 60,
+        }
+        with open(os.path.join(assetDir, "%s.json" % name), "w") as f:
+            json.dump(info, f, indent=4)
+        files = []
+        if thumbnails:
+            files += [(info["thumbPath"], thumbnail), (info["ssPath"], screenshot), (info["swPath"], screenshot)]
+        if textureBytes:
+            files += [(texture, b"\0" * textureBytes) for texture in textureFiles]
+        if sceneBytes:
+            files += [(info["maPath"], b"//Maya ASCII\n".ljust(sceneBytes, b" ")),
+                      (info["objPath"], b"# obj\n".ljust(sceneBytes, b" "))]
+        for fileName, data in files:
+            with open(os.path.join(assetDir, fileName), "wb") as f:
+                f.write(data)
+
+
+@contextlib.contextmanager
+def latency(seconds, module=None):
+    """
+    Adds a sleep to every file system call (stat, listdir, scandir, open, rename, remove) to emulate a network
+    share
+    Args:
+        seconds: (Float) Delay per call, 0 does nothing
+        module: (Module) Module whose own scandir reference should be delayed too
+
+    """
+    def delayed(function):
+        def wrapper(*args, **kwargs):
+            time.sleep(seconds)
+            return function(*args, **kwargs)
+        return wrapper
+
+    if not seconds:
+        yield
+        return
+    originals = [(os, "stat", os.stat), (os, "listdir", os.listdir), (io, "open", io.open),
+                 (builtins, "open", builtins.open), (os, "rename", os.rename), (os, "remove", os.remove)]
+    if getattr(os, "scandir", None) is not None:
+        originals.append((os, "scandir", os.scandir))
+    if module is not None and getattr(module, "scandir", None) is not None:
+        originals.append((module, "scandir", module.scandir))
+    for owner, attr, function in originals:
+        setattr(owner, attr, delayed(function))
+    try:
+        yield
+    finally:
+        for owner, attr, function in originals:
+            setattr(owner, attr, function)
+
+
+def timeit(function, repeat=1):
+    """
+    Returns:
+        (Float) Best wall time of the calls in seconds
+
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        function()
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def environment():
+    """
+    Returns:
+        (Dictionary) Python, platform, Qt binding and repository revision the results are measured with
+
+    """
+    try:
+        revision = subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=ROOT,
+                                           stderr=subprocess.STDOUT).decode("ascii").strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    qt = sys.modules.get("Qt")
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "qtBinding": None if qt is None or isinstance(qt, _StubModule) else getattr(qt, "__binding__", None),
+        "revision": revision,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def writeResults(path, results, arguments=None):
+    """
+    Writes the results as json with the environment, "-" writes to stdout
+    Args:
+        path: (String) Path of the json file
+        results: (List) Result dictionaries
+        arguments: (Dictionary) Arguments of the benchmark
+
+    Returns:
+        None
+
+    """
+    data = json.dumps({"environment": environment(), "arguments": arguments or {}, "results": results}, indent=4,
+                      sort_keys=True)
+    if path == "-":
+        sys.stdout.write(data + "\n")
+        return
+    with open(path, "w") as f:
+        f.write(data)